@@ -0,0 +1,350 @@
+"""
+Elo Rating Engine
+=================
+
+Team Elo ratings stored in a compact team-indexed array.
+
+Games are processed in date order. A team plays at most once per date,
+so every game on a date is independent of the others: the engine
+updates a whole date in one vectorized step and only loops over dates.
+State (ratings, last season per team, last processed date and the
+GAME_IDs applied on it) persists between calls, so nightly runs call
+update() with the new games only instead of replaying all history.
+Each game is applied once: re-running the last night raises instead of
+counting its games twice, while late games of that night are accepted.
+
+Features produced (pre-game, no leakage):
+1. ELO_HOME_PRE - home team rating before tipoff
+2. ELO_AWAY_PRE - away team rating before tipoff
+
+USAGE:
+    elo = EloRatings(k=20)
+    history_elo = elo.update(all_games)      # full history once
+    elo.save('data/processed/nba/elo_state.json')
+
+    elo = EloRatings.load('data/processed/nba/elo_state.json')
+    tonight_elo = elo.update(new_games)      # only the new games
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+MARGIN_MULTIPLIERS = ('possessions', 'autocorrelation', None)
+
+
+class EloRatings:
+    """
+    Incremental Elo ratings keyed by team id.
+
+    Args:
+        k (float): K-factor (rating points per unit of surprise)
+        initial_rating (float): Rating for a team's first game
+        home_advantage (float): Rating points added to the home side when
+                                computing the expected result
+        margin_multiplier (str or None): How the margin of victory scales K
+            - 'possessions': log(|margin| + 1) * 2.2 / ((POSS + 1) * 0.001 + 2.2),
+              POSS from HOME_POSS (100 if missing); the original
+              test_model_v.0.1 compute_elo formula
+            - 'autocorrelation': log(|margin| + 1) * 2.2 / (winner_elo_diff * 0.001 + 2.2)
+            - None: plain Elo (multiplier 1)
+        season_carryover (float): Share of a team's distance from
+            initial_rating kept when a new season starts
+            (0 = reset every season, 1 = no regression)
+        registry (TeamRegistry): Optional; pre-assigns every registered team
+            its dense registry code, so rating arrays are indexed the same
+            way as the rest of the pipeline (unregistered teams are appended)
+    """
+
+    def __init__(self, k=20, initial_rating=1500.0, home_advantage=0.0,
+                 margin_multiplier='possessions', season_carryover=0.0, registry=None):
+        if margin_multiplier not in MARGIN_MULTIPLIERS:
+            raise ValueError(f"margin_multiplier must be one of {MARGIN_MULTIPLIERS}, got {margin_multiplier!r}")
+        if not 0.0 <= season_carryover <= 1.0:
+            raise ValueError(f"season_carryover must be in [0, 1], got {season_carryover}")
+
+        self.k = k
+        self.initial_rating = initial_rating
+        self.home_advantage = home_advantage
+        self.margin_multiplier = margin_multiplier
+        self.season_carryover = season_carryover
+
+        self.team_ids = []            # code -> team id
+        self._team_codes = {}         # team id -> code
+        self.ratings = np.empty(0)    # code -> current rating
+        self.team_season = np.empty(0, dtype=np.int64)  # code -> season code of last game (-1 = none)
+        self.seasons = []             # season code -> season label
+        self._season_codes = {}
+        self.last_date = None
+        self.last_date_game_ids = set()   # GAME_IDs already processed on last_date
+
+        if registry is not None:
+            self._encode_teams(registry.ids)
+
+    # --------------------------------------------------------
+    # State
+    # --------------------------------------------------------
+
+    def _encode_teams(self, team_ids):
+        """Map team ids to dense codes, growing the arrays for new teams."""
+        for team_id in pd.unique(team_ids):
+            if team_id not in self._team_codes:
+                self._team_codes[team_id] = len(self.team_ids)
+                self.team_ids.append(team_id)
+
+        n_new = len(self.team_ids) - len(self.ratings)
+        if n_new:
+            self.ratings = np.concatenate([self.ratings, np.full(n_new, float(self.initial_rating))])
+            self.team_season = np.concatenate([self.team_season, np.full(n_new, -1, dtype=np.int64)])
+
+        return pd.Index(self.team_ids).get_indexer(team_ids).astype(np.int64)
+
+    def _encode_seasons(self, seasons):
+        for season in pd.unique(seasons):
+            if season not in self._season_codes:
+                self._season_codes[season] = len(self.seasons)
+                self.seasons.append(season)
+        return pd.Index(self.seasons).get_indexer(seasons).astype(np.int64)
+
+    def get_rating(self, team_id):
+        """Current rating for a team (initial_rating if never seen)."""
+        code = self._team_codes.get(team_id)
+        return self.initial_rating if code is None else float(self.ratings[code])
+
+    def ratings_frame(self):
+        """
+        Current ratings as a DataFrame.
+
+        Returns:
+            pd.DataFrame: TEAM_ID, SEASON (last season played), ELO
+        """
+        return pd.DataFrame({
+            'TEAM_ID': self.team_ids,
+            'SEASON': [self.seasons[s] if s >= 0 else None for s in self.team_season],
+            'ELO': self.ratings,
+        }).sort_values('ELO', ascending=False).reset_index(drop=True)
+
+    # --------------------------------------------------------
+    # Updates
+    # --------------------------------------------------------
+
+    def _multiplier(self, margin, poss, rating_diff=None):
+        if self.margin_multiplier is None:
+            return np.ones(len(margin))
+        log_margin = np.log(np.abs(margin) + 1)
+        if self.margin_multiplier == 'possessions':
+            return log_margin * (2.2 / ((poss + 1) * 0.001 + 2.2))
+        # autocorrelation: winner's rating edge damps blowout credit
+        winner_diff = np.where(margin >= 0, rating_diff, -rating_diff)
+        return log_margin * (2.2 / (winner_diff * 0.001 + 2.2))
+
+    def _season_starts(self, home, away, season):
+        """
+        Flag team-games that open a new season for that team.
+
+        Returns:
+            tuple: (home_flags, away_flags) boolean arrays
+        """
+        n_games = len(home)
+        sides = pd.DataFrame({
+            'team': np.column_stack([home, away]).ravel(),
+            'season': np.repeat(season, 2),
+        })
+        first_team_season = ~sides.duplicated(['team', 'season']).to_numpy()
+        seen_team = sides.duplicated('team').to_numpy()
+        stored_season = self.team_season[sides['team'].to_numpy()]
+        flags = first_team_season & (seen_team | (stored_season != sides['season'].to_numpy()))
+        flags = flags.reshape(n_games, 2)
+        return flags[:, 0], flags[:, 1]
+
+    def _apply_season_carryover(self, codes, season_codes):
+        self.ratings[codes] = (
+            self.initial_rating
+            + self.season_carryover * (self.ratings[codes] - self.initial_rating)
+        )
+        self.team_season[codes] = season_codes
+
+    @staticmethod
+    def _independent_steps(dates, home, away):
+        """
+        Split sorted games into steps that share no team.
+
+        Every date is one step; a date where a team appears twice is
+        split into single games so updates stay sequential.
+        """
+        n_games = len(dates)
+        boundaries = np.flatnonzero(dates[1:] != dates[:-1]) + 1
+        starts = np.concatenate([[0], boundaries]).astype(np.int64)
+        ends = np.concatenate([boundaries, [n_games]]).astype(np.int64)
+
+        batch_id = np.repeat(np.arange(len(starts)), ends - starts)
+        teams = np.concatenate([home, away])
+        batches = np.concatenate([batch_id, batch_id])
+        key_order = np.lexsort((teams, batches))
+        repeated = (teams[key_order][1:] == teams[key_order][:-1]) & (batches[key_order][1:] == batches[key_order][:-1])
+        has_repeat = np.zeros(len(starts), dtype=bool)
+        has_repeat[batches[key_order][1:][repeated]] = True
+
+        steps = []
+        for start, end, repeat in zip(starts.tolist(), ends.tolist(), has_repeat.tolist()):
+            if repeat:
+                steps.extend((i, i + 1) for i in range(start, end))
+            else:
+                steps.append((start, end))
+        return steps
+
+    def update(self, games):
+        """
+        Process new games in date order and return pre-game ratings.
+
+        Args:
+            games (pd.DataFrame): Matchup-format games with GAME_DATE, SEASON,
+                HOME_TEAM_ID, AWAY_TEAM_ID, HOME_WIN and (optionally)
+                HOME_PTS/AWAY_PTS and HOME_POSS. Without points the margin
+                is 0 and ratings do not move.
+
+        Returns:
+            pd.DataFrame: ELO_HOME_PRE, ELO_AWAY_PRE aligned to games.index
+
+        Raises:
+            ValueError: If games are dated before the last processed date
+                        (history must be replayed with a fresh engine), or
+                        are games of the last processed date that were
+                        already applied (a game is processed once; games
+                        on that date need GAME_IDs to tell)
+        """
+        n_games = len(games)
+        dates = pd.to_datetime(games['GAME_DATE']).to_numpy('datetime64[ns]')
+        game_ids = games['GAME_ID'].astype(str).to_numpy() if 'GAME_ID' in games.columns else None
+        if n_games and self.last_date is not None:
+            last_day = pd.Timestamp(self.last_date).date()
+            if dates.min() < self.last_date:
+                raise ValueError(
+                    f"games start at {pd.Timestamp(dates.min()).date()}, before the last processed "
+                    f"date {last_day}; replay history with a new EloRatings"
+                )
+            on_last_date = dates == self.last_date
+            if on_last_date.any():
+                if game_ids is None:
+                    raise ValueError(f"games on the last processed date {last_day} need a GAME_ID column "
+                                     f"to tell them from games already applied")
+                repeated = set(game_ids[on_last_date]) & self.last_date_game_ids
+                if repeated:
+                    raise ValueError(f"{len(repeated)} games on {last_day} were already processed "
+                                     f"(e.g. {min(repeated)}); each game is applied once")
+
+        if n_games:
+            new_last_date = dates.max()
+            new_ids = set(game_ids[dates == new_last_date]) if game_ids is not None else set()
+            if self.last_date is not None and new_last_date == self.last_date:
+                new_ids |= self.last_date_game_ids
+
+        # Same ordering as the original compute_elo: (SEASON, GAME_DATE), stable
+        order = np.lexsort((np.arange(n_games), dates, pd.factorize(games['SEASON'], sort=True)[0]))
+
+        home = self._encode_teams(games['HOME_TEAM_ID'].to_numpy()[order])
+        away = self._encode_teams(games['AWAY_TEAM_ID'].to_numpy()[order])
+        season = self._encode_seasons(games['SEASON'].to_numpy()[order])
+        dates = dates[order]
+        home_win = (games['HOME_WIN'].to_numpy()[order] == 1).astype(np.float64)
+        if 'HOME_PTS' in games.columns and 'AWAY_PTS' in games.columns:
+            margin = (games['HOME_PTS'].to_numpy(np.float64) - games['AWAY_PTS'].to_numpy(np.float64))[order]
+        else:
+            margin = np.zeros(n_games)
+        if 'HOME_POSS' in games.columns:
+            poss = games['HOME_POSS'].to_numpy(np.float64)[order]
+        else:
+            poss = np.full(n_games, 100.0)
+
+        # Everything that does not depend on ratings is computed up front
+        rating_free = self.margin_multiplier != 'autocorrelation'
+        k_mult = self.k * self._multiplier(margin, poss) if rating_free else None
+        home_new_season, away_new_season = self._season_starts(home, away, season)
+
+        ratings = self.ratings
+        home_pre = np.empty(n_games)
+        away_pre = np.empty(n_games)
+
+        # One vectorized step per date (per game if a team repeats on a date)
+        steps = self._independent_steps(dates, home, away)
+        step_starts = np.array([start for start, _ in steps], dtype=np.int64)
+        if n_games:
+            step_new_season = np.logical_or.reduceat(home_new_season | away_new_season, step_starts).tolist()
+        else:
+            step_new_season = []
+
+        for (start, end), new_season in zip(steps, step_new_season):
+            h = home[start:end]
+            a = away[start:end]
+            if new_season:
+                carried_home = home_new_season[start:end]
+                carried_away = away_new_season[start:end]
+                self._apply_season_carryover(h[carried_home], season[start:end][carried_home])
+                self._apply_season_carryover(a[carried_away], season[start:end][carried_away])
+
+            rh = ratings[h]
+            ra = ratings[a]
+            rating_diff = rh + self.home_advantage - ra
+            expected_home = 1 / (1 + 10 ** (-rating_diff / 400))
+            if rating_free:
+                step_k = k_mult[start:end]
+            else:
+                step_k = self.k * self._multiplier(margin[start:end], poss[start:end], rating_diff)
+            delta = step_k * (home_win[start:end] - expected_home)
+
+            ratings[h] += delta
+            ratings[a] -= delta
+            home_pre[start:end] = rh
+            away_pre[start:end] = ra
+
+        if n_games:
+            self.last_date = new_last_date
+            self.last_date_game_ids = new_ids
+
+        result = pd.DataFrame(index=games.index, columns=['ELO_HOME_PRE', 'ELO_AWAY_PRE'], dtype=np.float64)
+        result.iloc[order, 0] = home_pre
+        result.iloc[order, 1] = away_pre
+        return result
+
+    # --------------------------------------------------------
+    # Persistence
+    # --------------------------------------------------------
+
+    def save(self, path):
+        """Save parameters and ratings state to a JSON file."""
+        state = {
+            'params': {
+                'k': self.k,
+                'initial_rating': self.initial_rating,
+                'home_advantage': self.home_advantage,
+                'margin_multiplier': self.margin_multiplier,
+                'season_carryover': self.season_carryover,
+            },
+            'team_ids': pd.Index(self.team_ids).tolist(),   # numpy scalars -> native ints / strings
+            'ratings': self.ratings.tolist(),
+            'team_season': self.team_season.tolist(),
+            'seasons': list(self.seasons),
+            'last_date': None if self.last_date is None else str(pd.Timestamp(self.last_date).date()),
+            'last_date_game_ids': pd.Index(sorted(self.last_date_game_ids)).tolist(),
+        }
+        with open(path, 'w') as f:
+            json.dump(state, f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        """Load an engine saved with save()."""
+        with open(path) as f:
+            state = json.load(f)
+
+        elo = cls(**state['params'])
+        elo.team_ids = state['team_ids']
+        elo._team_codes = {t: i for i, t in enumerate(elo.team_ids)}
+        elo.ratings = np.array(state['ratings'], dtype=np.float64)
+        elo.team_season = np.array(state['team_season'], dtype=np.int64)
+        elo.seasons = state['seasons']
+        elo._season_codes = {s: i for i, s in enumerate(elo.seasons)}
+        if state['last_date'] is not None:
+            elo.last_date = np.datetime64(pd.Timestamp(state['last_date']), 'ns')
+        elo.last_date_game_ids = set(state.get('last_date_game_ids', []))
+        return elo
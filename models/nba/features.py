@@ -21,6 +21,8 @@ import numpy as np
 import warnings
 warnings.filterwarnings('ignore')
 
+NS_PER_DAY = 86_400_000_000_000
+
 
 def calculate_rest_days(df, verbose=True):
     """
@@ -30,6 +32,9 @@ def calculate_rest_days(df, verbose=True):
     - REST is KNOWN BEFORE the game starts (pre-game knowledge)
     - We calculate: days between CURRENT game and PREVIOUS game
     - This is public information available before tipoff
+    
+    Rest is computed per team within each season: first game of a
+    season has no previous game, so its rest is NaN.
     """
     if verbose:
         print("\n" + "=" * 80)
@@ -41,39 +46,35 @@ def calculate_rest_days(df, verbose=True):
     df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'])
     df = df.sort_values(['SEASON', 'GAME_DATE']).reset_index(drop=True)
     
-    # Initialize columns
-    df['HOME_DAYS_REST'] = np.nan
-    df['AWAY_DAYS_REST'] = np.nan
+    # Stack HOME and AWAY appearances into one team-game array
+    # (rows 0..n-1 are home appearances, rows n..2n-1 are away appearances)
+    n_games = len(df)
+    season_codes = np.tile(pd.factorize(df['SEASON'])[0], 2)
+    team_codes = pd.factorize(
+        np.concatenate([df['HOME_TEAM_ID'].to_numpy(), df['AWAY_TEAM_ID'].to_numpy()])
+    )[0]
+    game_order = np.tile(np.arange(n_games), 2)
+    game_ns = np.tile(df['GAME_DATE'].to_numpy('datetime64[ns]').astype(np.int64), 2)
     
-    # Process each season separately
-    seasons = df['SEASON'].unique()
+    # Order by (season, team, game) so each team's previous game sits directly above
+    order = np.lexsort((game_order, team_codes, season_codes))
+    sorted_seasons = season_codes[order]
+    sorted_teams = team_codes[order]
+    sorted_ns = game_ns[order]
     
-    for season in seasons:
-        season_mask = df['SEASON'] == season
-        season_df = df[season_mask].copy()
-        
-        # Track last game date for each team
-        team_last_game = {}
-        
-        for idx in season_df.index:
-            row = df.loc[idx]
-            home_team = row['HOME_TEAM_ID']
-            away_team = row['AWAY_TEAM_ID']
-            game_date = row['GAME_DATE']
-            
-            # Calculate home team rest
-            if home_team in team_last_game:
-                days_rest = (game_date - team_last_game[home_team]).days
-                df.loc[idx, 'HOME_DAYS_REST'] = days_rest
-            
-            # Calculate away team rest
-            if away_team in team_last_game:
-                days_rest = (game_date - team_last_game[away_team]).days
-                df.loc[idx, 'AWAY_DAYS_REST'] = days_rest
-            
-            # Update last game dates AFTER calculating rest
-            team_last_game[home_team] = game_date
-            team_last_game[away_team] = game_date
+    same_team = np.zeros(len(order), dtype=bool)
+    same_team[1:] = (sorted_seasons[1:] == sorted_seasons[:-1]) & (sorted_teams[1:] == sorted_teams[:-1])
+    
+    # Days between CURRENT game and PREVIOUS game (floored, like Timedelta.days)
+    sorted_rest = np.full(len(order), np.nan)
+    sorted_rest[1:] = np.floor_divide(np.diff(sorted_ns), NS_PER_DAY)
+    sorted_rest[~same_team] = np.nan
+    
+    # Scatter back into game order
+    rest = np.empty(len(order))
+    rest[order] = sorted_rest
+    df['HOME_DAYS_REST'] = rest[:n_games]
+    df['AWAY_DAYS_REST'] = rest[n_games:]
     
     if verbose:
         print(f"\n✓ Calculated rest days (pre-game knowledge)")
@@ -0,0 +1,268 @@
+"""
+Benchmark: data-collection strategies against the stub stats server
+====================================================================
+
+Runs the real collection code (nba_api endpoints, TokenBucket,
+fetch_concurrently, the response cache and 01's collect_seasons) against
+a local StubStatsServer with configurable latency, jitter, 429s and 500s,
+so a change to the collection layer can be measured without the live API.
+
+Strategies:
+- sequential:        one request in flight
+- concurrent:        MAX_WORKERS requests in flight under the shared rate limit
+- cache (cold):      concurrent, through an empty response cache (records it)
+- cache (warm):      the same requests again, served from the cache
+
+Reports completed requests/s (cache hits included), HTTP requests that
+reached the server, client-side p50/p95/p99 latency, 429/500 responses
+and total wall time per strategy, for LeagueDashTeamStats (02) and
+LeagueGameFinder (01) workloads.
+
+USAGE:
+    python scripts/benchmarks/bench_collection.py
+    python scripts/benchmarks/bench_collection.py --latency 0.3 --jitter 0.1 --error-rate 0.05
+    python scripts/benchmarks/bench_collection.py --replay-dir data/cache/nba_api
+"""
+
+import argparse
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scripts.benchmarks.stub_stats_server import StubStatsServer
+from scripts.benchmarks.synthetic import make_synthetic_games
+from scripts.data_collection.fetcher import TokenBucket, fetch_concurrently
+from scripts.data_collection.http_cache import install_response_cache, uninstall_response_cache
+from scripts.data_collection.planner import plan_collection
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+N_DATES = 20
+N_SEASONS = 4
+RATE = 20.0          # client request ceiling (requests/s)
+MAX_WORKERS = 4
+LATENCY = 0.1
+JITTER = 0.05
+ERROR_RATE = 0.0     # random 429s
+SERVER_ERROR_RATE = 0.0
+
+
+def _load_script(name):
+    path = os.path.join(REPO_ROOT, 'scripts', 'data_collection', name)
+    spec = importlib.util.spec_from_file_location(name[:-3].lstrip('0123456789_'), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else float('nan')
+
+
+class Timed:
+    """Wrap a fetch function and record the latency of every attempt."""
+
+    def __init__(self, fetch_fn):
+        self.fetch_fn = fetch_fn
+        self.latencies = []
+        self._lock = threading.Lock()
+
+    def __call__(self, *args):
+        start = time.perf_counter()
+        try:
+            return self.fetch_fn(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.latencies.append(elapsed)
+
+
+def run_strategy(name, server, run):
+    """
+    Time one strategy and summarize what the server saw
+
+    Args:
+        name (str): Strategy label
+        server (StubStatsServer): Running server (its counters are read before/after)
+        run (callable): Runs the workload; returns (n_tasks, n_failed, latencies)
+
+    Returns:
+        dict: Benchmark row
+    """
+    first = len(server.status_codes)
+    start = time.perf_counter()
+    n_tasks, n_failed, latencies = run()
+    wall = time.perf_counter() - start
+    codes = server.status_codes[first:]
+    return {
+        'strategy': name,
+        'tasks': n_tasks,
+        'failed': n_failed,
+        'requests': len(codes),
+        'rps': n_tasks / wall if wall else float('nan'),
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        '429': codes.count(429),
+        '500': codes.count(500),
+        'wall': wall,
+    }
+
+
+def print_results(title, rows):
+    print("\n" + "=" * 96)
+    print(title)
+    print("=" * 96)
+    print(f"{'Strategy':<16} {'Tasks':>6} {'Failed':>7} {'HTTP':>6} {'Tasks/s':>8} "
+          f"{'p50 (s)':>8} {'p95 (s)':>8} {'p99 (s)':>8} {'429':>5} {'500':>5} {'Wall (s)':>9}")
+    for r in rows:
+        print(f"{r['strategy']:<16} {r['tasks']:>6} {r['failed']:>7} {r['requests']:>6} {r['rps']:>8.1f} "
+              f"{r['p50']:>8.3f} {r['p95']:>8.3f} {r['p99']:>8.3f} {r['429']:>5} {r['500']:>5} {r['wall']:>9.2f}")
+    print("=" * 96)
+
+# ============================================================
+# WORKLOADS
+# ============================================================
+
+def team_stats_tasks(n_dates):
+    """The first n_dates of a synthetic season's collection plan."""
+    games = make_synthetic_games(n_seasons=1, games_per_season=n_dates * 8, seed=1)
+    plan = plan_collection(games)
+    tasks = [(season, date_str, measure, team_ids) for season, date_str, measure, team_ids in plan.tasks]
+    return tasks[:n_dates * 2]
+
+
+def team_stats_runner(collect_stats, tasks, workers, rate, cache_dir=None):
+    def run():
+        timed = Timed(collect_stats.request_team_stats)
+        limiter = TokenBucket(rate=rate)
+        if cache_dir is not None:
+            # The cache takes the token on misses only, as 02 does
+            install_response_cache(cache_dir=cache_dir, limiter=limiter)
+            limiter = None
+        try:
+            failed = sum(error is not None for _, _, error in
+                         fetch_concurrently(tasks, timed, limiter, max_workers=workers, backoff=0.1))
+        finally:
+            if cache_dir is not None:
+                uninstall_response_cache()
+        return len(tasks), failed, timed.latencies
+    return run
+
+
+def games_runner(collect_games, seasons, workers, rate, output_path, cache_dir=None):
+    def run():
+        timed = Timed(collect_games.fetch_season_games)
+        original = collect_games.fetch_season_games
+        collect_games.fetch_season_games = timed
+        collect_games.MAX_WORKERS = workers
+        limiter = TokenBucket(rate=rate)
+        if cache_dir is not None:
+            install_response_cache(cache_dir=cache_dir, limiter=limiter)
+            limiter = None
+        try:
+            _, failed = collect_games.collect_seasons(seasons, output_path, limiter=limiter)
+        finally:
+            collect_games.fetch_season_games = original
+            if cache_dir is not None:
+                uninstall_response_cache()
+        return len(seasons), len(failed), timed.latencies
+    return run
+
+
+def strategies(make_runner, tmp_dir, label):
+    cache_dir = os.path.join(tmp_dir, f'cache_{label}')
+    return [
+        ('sequential', make_runner(workers=1)),
+        ('concurrent', make_runner(workers=MAX_WORKERS)),
+        ('cache (cold)', make_runner(workers=MAX_WORKERS, cache_dir=cache_dir)),
+        ('cache (warm)', make_runner(workers=MAX_WORKERS, cache_dir=cache_dir)),
+    ]
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def run_benchmark(server, n_dates=N_DATES, n_seasons=N_SEASONS, rate=RATE, verbose=True):
+    """
+    Run every strategy for both workloads against a running server
+
+    Args:
+        server (StubStatsServer): Server the nba_api requests are sent to
+        n_dates (int): Game dates in the team-stats workload (2 requests each)
+        n_seasons (int): Seasons in the game-finder workload (1 request each)
+        rate (float): Client request ceiling (requests/s)
+        verbose (bool): Print the result tables
+
+    Returns:
+        dict: {'team_stats': [rows], 'games': [rows]}
+    """
+    collect_stats = _load_script('02_collect_team_stats.py')
+    collect_games = _load_script('01_collect_nba_games.py')
+    collect_games.print_save_summary = lambda *args, **kwargs: None
+
+    from nba_api.stats.library.http import NBAStatsHTTP
+    original_url = NBAStatsHTTP.base_url
+    collect_stats.set_stats_base_url(server.base_url)
+
+    tmp_dir = tempfile.mkdtemp()
+    results = {}
+    try:
+        tasks = team_stats_tasks(n_dates)
+        results['team_stats'] = [
+            run_strategy(name, server, run) for name, run in strategies(
+                lambda **kw: team_stats_runner(collect_stats, tasks, rate=rate, **kw), tmp_dir, 'stats')
+        ]
+
+        seasons = [f'{2000 + i}-{(2001 + i) % 100:02d}' for i in range(n_seasons)]
+        output = os.path.join(tmp_dir, 'games.csv')
+        results['games'] = [
+            run_strategy(name, server, run) for name, run in strategies(
+                lambda **kw: games_runner(collect_games, seasons, rate=rate, output_path=output, **kw),
+                tmp_dir, 'games')
+        ]
+    finally:
+        collect_stats.set_stats_base_url(original_url)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if verbose:
+        print_results(f"BENCHMARK: LeagueDashTeamStats ({len(tasks)} requests, "
+                      f"{rate:.0f} req/s ceiling, {MAX_WORKERS} workers)", results['team_stats'])
+        print_results(f"BENCHMARK: LeagueGameFinder ({n_seasons} seasons, "
+                      f"{rate:.0f} req/s ceiling, {MAX_WORKERS} workers)", results['games'])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark collection strategies against a local stub server.")
+    parser.add_argument('--latency', type=float, default=LATENCY)
+    parser.add_argument('--jitter', type=float, default=JITTER)
+    parser.add_argument('--error-rate', type=float, default=ERROR_RATE, help="Probability of a random 429")
+    parser.add_argument('--server-error-rate', type=float, default=SERVER_ERROR_RATE,
+                        help="Probability of a 500")
+    parser.add_argument('--max-rate', type=float, default=None, help="Server-side rate limit (429 above it)")
+    parser.add_argument('--rate', type=float, default=RATE, help="Client request ceiling")
+    parser.add_argument('--dates', type=int, default=N_DATES)
+    parser.add_argument('--seasons', type=int, default=N_SEASONS)
+    parser.add_argument('--replay-dir', default=None, help="Replay responses recorded in this cache directory")
+    args = parser.parse_args()
+
+    server = StubStatsServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                             server_error_rate=args.server_error_rate, max_rate=args.max_rate,
+                             replay_dir=args.replay_dir, games_per_season=1230)
+    with server:
+        run_benchmark(server, n_dates=args.dates, n_seasons=args.seasons, rate=args.rate)
+        if args.replay_dir:
+            print(f"Replayed {server.replayed:,} recorded responses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: create_differentials
+================================
+
+Compares adding {f}_DIFF columns one at a time (original
+create_differentials loop) with the block build_differentials kernel
+in feature_utils. Reports runtime, peak traced memory, the number of
+pandas PerformanceWarnings raised and the number of internal blocks left
+in the result (the loop defers its consolidation copy to whatever
+operation touches the frame next).
+
+USAGE:
+    python scripts/benchmarks/bench_differentials.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scripts.benchmarks.synthetic import add_synthetic_stats, make_synthetic_games
+from scripts.feature_engineering.feature_utils import build_differentials
+
+SEASON_COUNTS = [6, 20]
+N_FEATURES = 120
+
+
+def differentials_loop(df, features):
+    """Original approach: one column insertion per feature."""
+    for f in features:
+        df[f'{f}_DIFF'] = (df[f'HOME_{f}'] - df[f'AWAY_{f}']).fillna(0)
+    return df
+
+
+def differentials_block(df, features):
+    diffs = build_differentials(df, features, variants=('DIFF',))
+    return pd.concat([df, diffs], axis=1)
+
+
+def measure(func, df, features):
+    """Runtime, peak traced memory (MB) and PerformanceWarning count."""
+    df = df.copy()
+    tracemalloc.start()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always', pd.errors.PerformanceWarning)
+        start = time.perf_counter()
+        result = func(df, features)
+        elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    n_warnings = sum(issubclass(w.category, pd.errors.PerformanceWarning) for w in caught)
+    return result, elapsed, peak / 1024 ** 2, n_warnings
+
+
+def main():
+    features = [f'FEATURE_{i:03d}' for i in range(N_FEATURES)]
+
+    print("\n" + "=" * 82)
+    print(f"BENCHMARK: create_differentials ({N_FEATURES} features, loop vs block)")
+    print("=" * 82)
+    print(f"{'Seasons':>8} {'Method':>7} {'Time (s)':>9} {'Peak (MB)':>10} {'PerfWarnings':>13} "
+          f"{'Blocks':>7}  Identical")
+
+    for n_seasons in SEASON_COUNTS:
+        games = add_synthetic_stats(make_synthetic_games(n_seasons), features)
+
+        loop_df, loop_time, loop_peak, loop_warn = measure(differentials_loop, games, features)
+        block_df, block_time, block_peak, block_warn = measure(differentials_block, games, features)
+        identical = loop_df.equals(block_df)
+
+        print(f"{n_seasons:>8} {'loop':>7} {loop_time:>9.3f} {loop_peak:>10.1f} {loop_warn:>13} {loop_df._mgr.nblocks:>7}")
+        print(f"{n_seasons:>8} {'block':>7} {block_time:>9.3f} {block_peak:>10.1f} {block_warn:>13} {block_df._mgr.nblocks:>7}  "
+              f"{'✓' if identical else '✗'}")
+
+    print("=" * 82)
+
+
+if __name__ == "__main__":
+    main()
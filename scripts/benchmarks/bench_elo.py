@@ -0,0 +1,93 @@
+"""
+Benchmark: Elo ratings
+=======================
+
+Compares the array-based EloRatings engine (models/nba/elo.py) with the
+original iterrows compute_elo from test_model_v.0.1.py, and shows the
+cost of a nightly incremental update versus replaying all history.
+
+USAGE:
+    python scripts/benchmarks/bench_elo.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from models.nba.elo import EloRatings
+from scripts.benchmarks.synthetic import make_synthetic_games
+
+SEASON_COUNTS = [6, 20]
+
+
+def compute_elo_iterrows(df, k=20):
+    """Original compute_elo from test_model_v.0.1.py (reference)."""
+    df = df.sort_values(['SEASON', 'GAME_DATE']).copy()
+    elo = {}
+    elo_home = []
+    elo_away = []
+    for _, row in df.iterrows():
+        season = row['SEASON']
+        key_h = (row['HOME_TEAM_ID'], season)
+        key_a = (row['AWAY_TEAM_ID'], season)
+        if key_h not in elo:
+            elo[key_h] = 1500.0
+        if key_a not in elo:
+            elo[key_a] = 1500.0
+        Eh = 1 / (1 + 10 ** ((elo[key_a] - elo[key_h]) / 400))
+        Ea = 1 - Eh
+        elo_home.append(elo[key_h])
+        elo_away.append(elo[key_a])
+        margin = row['HOME_PTS'] - row['AWAY_PTS'] if 'HOME_PTS' in row else 0
+        mult = np.log(abs(margin) + 1) * (2.2 / ((row.get('HOME_POSS', 100) + 1) * 0.001 + 2.2))
+        S_h = 1.0 if row['HOME_WIN'] == 1 else 0.0
+        elo[key_h] += k * mult * (S_h - Eh)
+        elo[key_a] += k * mult * ((1 - S_h) - Ea)
+    df['ELO_HOME_PRE'] = elo_home
+    df['ELO_AWAY_PRE'] = elo_away
+    return df
+
+
+def time_call(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    print("\n" + "=" * 78)
+    print("BENCHMARK: Elo ratings (iterrows vs array engine)")
+    print("=" * 78)
+    print(f"{'Seasons':>8} {'Games':>9} {'iterrows (s)':>13} {'Engine (s)':>11} "
+          f"{'Speedup':>8} {'Nightly (ms)':>13}  Max diff")
+
+    for n_seasons in SEASON_COUNTS:
+        games = make_synthetic_games(n_seasons)
+
+        legacy, legacy_time = time_call(compute_elo_iterrows, games)
+        fast, fast_time = time_call(EloRatings(k=20).update, games)
+        fast = fast.loc[legacy.index]
+
+        max_diff = max(
+            np.abs(legacy['ELO_HOME_PRE'] - fast['ELO_HOME_PRE']).max(),
+            np.abs(legacy['ELO_AWAY_PRE'] - fast['ELO_AWAY_PRE']).max(),
+        )
+
+        # Nightly run: history already processed, only the last date is new
+        last_date = games['GAME_DATE'].max()
+        engine = EloRatings(k=20)
+        engine.update(games[games['GAME_DATE'] < last_date])
+        _, nightly_time = time_call(engine.update, games[games['GAME_DATE'] == last_date])
+
+        print(f"{n_seasons:>8} {len(games):>9,} {legacy_time:>13.2f} {fast_time:>11.4f} "
+              f"{legacy_time / fast_time:>7.0f}x {nightly_time * 1000:>13.2f}  {max_diff:.1e}")
+
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
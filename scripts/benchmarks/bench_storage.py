@@ -0,0 +1,83 @@
+"""
+Benchmark: CSV vs partitioned Parquet loads
+===========================================
+
+Writes a synthetic training-width dataset both ways and compares the
+reload pattern of the training loop: full load, a column projection and
+a two-season slice. Reports load time, on-disk size and in-memory size.
+
+USAGE:
+    python scripts/benchmarks/bench_storage.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scripts.benchmarks.synthetic import add_synthetic_stats, make_synthetic_games
+from scripts.data_collection import storage
+
+N_SEASONS = 20
+N_FEATURES = 150
+REPEATS = 5
+
+
+def dir_size_mb(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 1024 ** 2
+    return sum(os.path.getsize(os.path.join(root, f))
+               for root, _, files in os.walk(path) for f in files) / 1024 ** 2
+
+
+def best_of(func):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    features = [f'FEATURE_{i:03d}' for i in range(N_FEATURES)]
+    games = add_synthetic_stats(make_synthetic_games(N_SEASONS), features)
+    seasons = sorted(games['SEASON'].unique())[-2:]
+    columns = ['GAME_DATE', 'SEASON', 'HOME_WIN'] + [f'HOME_{f}' for f in features[:10]]
+
+    tmp_dir = tempfile.mkdtemp()
+    path = os.path.join(tmp_dir, 'train.csv')
+    try:
+        storage.save_dataset(games, path, export_csv=True, verbose=False)
+        parquet_dir, csv_path = storage.dataset_paths(path)
+
+        print("\n" + "=" * 78)
+        print(f"BENCHMARK: dataset loads ({len(games):,} rows x {games.shape[1]} columns)")
+        print("=" * 78)
+        print(f"On disk: CSV {dir_size_mb(csv_path):.1f} MB, Parquet {dir_size_mb(parquet_dir):.1f} MB\n")
+        print(f"{'Load':<22} {'CSV (s)':>9} {'Parquet (s)':>12} {'Speedup':>8} {'Memory (MB)':>12}")
+
+        cases = [
+            ('full', {}),
+            ('13 columns', {'columns': columns}),
+            ('last 2 seasons', {'seasons': seasons}),
+        ]
+        for name, kwargs in cases:
+            csv_time, csv_df = best_of(lambda: storage._read_csv(
+                csv_path, kwargs.get('columns'), kwargs.get('seasons'), None,
+                storage.PARTITION_COL, storage.DATE_COL))
+            pq_time, pq_df = best_of(lambda: storage.load_dataset(path, **kwargs))
+            assert len(csv_df) == len(pq_df)
+            memory = pq_df.memory_usage(deep=True).sum() / 1024 ** 2
+            print(f"{name:<22} {csv_time:>9.3f} {pq_time:>12.3f} {csv_time / pq_time:>7.1f}x {memory:>12.1f}")
+
+        print("=" * 78)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
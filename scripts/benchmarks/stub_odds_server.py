@@ -0,0 +1,151 @@
+"""
+Stub Odds Server
+================
+
+Local stand-in for The Odds API (v4) built on StubStatsServer, so the
+odds collector can be tested and benchmarked without an API key:
+
+- /v4/sports/basketball_nba/odds: games starting within LOOKAHEAD_DAYS
+  of the server clock (server.now, settable from tests)
+- /v4/historical/sports/basketball_nba/odds?date=...: the same payload
+  as of a past timestamp, wrapped in {timestamp, data}
+
+Events come from a matchup-format games frame (e.g. make_synthetic_games).
+Each bookmaker's moneyline, spread and total are deterministic
+piecewise-constant functions of time: a line holds for a few
+MOVE_MINUTES buckets and then moves, and its last_update is the time of
+the last move. Latency, 429s and 500s work as in StubStatsServer, and
+the server speaks HTTP/1.1 keep-alive and records client connections.
+
+USAGE:
+    games = make_synthetic_games(n_seasons=1)
+    with StubOddsServer(games, latency=0.05) as server:
+        server.now = pd.Timestamp('2000-11-01 12:00', tz='UTC')
+        print(server.base_url)   # http://127.0.0.1:<port>
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scripts.benchmarks.stub_stats_server import StubStatsServer
+from scripts.data_collection.helpers import get_team_registry
+
+BOOKMAKERS = ['draftkings', 'fanduel', 'betmgm', 'caesars', 'pointsbetus', 'bovada',
+              'betrivers', 'wynnbet', 'unibet_us', 'betonlineag', 'lowvig', 'mybookieag']
+LOOKAHEAD_DAYS = 2
+MOVE_MINUTES = 15        # a line can move once per bucket
+TIPOFF_ET = '19:30'
+
+
+def _unit(*key):
+    """Deterministic float in [0, 1) for a key."""
+    digest = hashlib.md5('|'.join(map(str, key)).encode()).digest()
+    return int.from_bytes(digest[:8], 'little') / 2 ** 64
+
+
+def _iso(ts):
+    return ts.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def probability_to_american(p):
+    """Fair win probability -> American odds."""
+    return int(-round(100 * p / (1 - p))) if p >= 0.5 else int(round(100 * (1 - p) / p))
+
+
+class StubOddsServer(StubStatsServer):
+    """
+    Threaded stub of The Odds API
+
+    Args:
+        games_df (pd.DataFrame): Matchup-format games (GAME_ID, GAME_DATE,
+            HOME_TEAM_ID, AWAY_TEAM_ID) to serve events for
+        bookmakers (list): Bookmaker keys quoted for every event
+        now (pd.Timestamp): Server clock for the live endpoint (None = real time)
+        **kwargs: Passed to StubStatsServer (latency, jitter, error_rate, ...)
+    """
+
+    def __init__(self, games_df, bookmakers=BOOKMAKERS, now=None, **kwargs):
+        super().__init__(**kwargs)
+        self.bookmakers = list(bookmakers)
+        self.now = now
+        registry = get_team_registry()
+        tipoff = (pd.to_datetime(games_df['GAME_DATE']).dt.strftime('%Y-%m-%d') + ' ' + TIPOFF_ET)
+        self.events = pd.DataFrame({
+            'id': games_df['GAME_ID'].astype(str).map(lambda g: hashlib.md5(g.encode()).hexdigest()),
+            'game_id': games_df['GAME_ID'].astype(str),
+            'commence_time': pd.to_datetime(tipoff).dt.tz_localize('America/New_York').dt.tz_convert('UTC'),
+            'home_team': games_df['HOME_TEAM_ID'].map(lambda t: registry.by_id(int(t))['full_name']),
+            'away_team': games_df['AWAY_TEAM_ID'].map(lambda t: registry.by_id(int(t))['full_name']),
+        }).sort_values('commence_time', kind='stable').reset_index(drop=True)
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def _clock(self):
+        return self.now if self.now is not None else pd.Timestamp.now(tz='UTC')
+
+    def bookmaker_lines(self, event, book, at):
+        """A bookmaker's quote for an event at a time (JSON-ready dict)."""
+        bucket = int((at - event['commence_time'] + pd.Timedelta(days=7)) / pd.Timedelta(minutes=MOVE_MINUTES))
+        # Lines hold for 1-4 buckets; the move happens at the start of a block
+        block = bucket // (1 + int(_unit(event['id'], book) * 4))
+        updated = event['commence_time'] - pd.Timedelta(days=7) + pd.Timedelta(
+            minutes=MOVE_MINUTES * block * (1 + int(_unit(event['id'], book) * 4)))
+
+        p_home = 0.25 + 0.5 * _unit(event['id']) + 0.03 * (_unit(event['id'], book, block) - 0.5)
+        spread = -round((p_home - 0.5) * 28 * 2) / 2
+        total = 205 + round(30 * _unit(event['id'], 'total') * 2) / 2 + (round(_unit(event['id'], book, block, 't')) - 0.5)
+        home, away = event['home_team'], event['away_team']
+        markets = [
+            {'key': 'h2h', 'outcomes': [
+                {'name': home, 'price': probability_to_american(min(p_home * 1.024, 0.98))},
+                {'name': away, 'price': probability_to_american(min((1 - p_home) * 1.024, 0.98))}]},
+            {'key': 'spreads', 'outcomes': [
+                {'name': home, 'price': -110, 'point': spread},
+                {'name': away, 'price': -110, 'point': -spread}]},
+            {'key': 'totals', 'outcomes': [
+                {'name': 'Over', 'price': -110, 'point': total},
+                {'name': 'Under', 'price': -110, 'point': total}]},
+        ]
+        for market in markets:
+            market['last_update'] = _iso(updated)
+        return {'key': book, 'title': book, 'last_update': _iso(updated), 'markets': markets}
+
+    def odds_payload(self, query, at):
+        """Events starting within LOOKAHEAD_DAYS of at, with every requested book and market."""
+        books = query['bookmakers'].split(',') if query.get('bookmakers') else self.bookmakers
+        markets = set(query.get('markets', 'h2h').split(','))
+        window = self.events[(self.events['commence_time'] > at)
+                             & (self.events['commence_time'] <= at + pd.Timedelta(days=LOOKAHEAD_DAYS))]
+        payload = []
+        for event in window.to_dict('records'):
+            bookmakers = []
+            for book in books:
+                if book not in self.bookmakers:
+                    continue
+                quote = self.bookmaker_lines(event, book, at)
+                quote['markets'] = [m for m in quote['markets'] if m['key'] in markets]
+                bookmakers.append(quote)
+            payload.append({'id': event['id'], 'sport_key': 'basketball_nba',
+                            'commence_time': _iso(event['commence_time']),
+                            'home_team': event['home_team'], 'away_team': event['away_team'],
+                            'bookmakers': bookmakers})
+        return payload
+
+    def _body(self, endpoint, query, path=None):
+        if not query.get('apiKey'):
+            return 401, b'{"message": "API key is missing"}'
+        if path and path.startswith('/v4/historical/'):
+            at = pd.Timestamp(query['date'])
+            body = {'timestamp': _iso(at), 'data': self.odds_payload(query, at)}
+        else:
+            body = self.odds_payload(query, self._clock())
+        return 200, json.dumps(body).encode()
@@ -0,0 +1,282 @@
+"""
+Stub NBA Stats Server (record / replay)
+=======================================
+
+Local HTTP server that mimics the stats.nba.com endpoints the collection
+scripts use, so collection can be benchmarked and regression-tested
+without the live API:
+
+- leaguegamefinder: synthetic team-game rows per season (Season,
+  DateFrom/DateTo and TeamID filters applied)
+- leaguedashteamstats: deterministic per-date stats payloads
+- replay: responses recorded by the on-disk response cache
+  (install_response_cache(cache_dir=...) during a live run records them);
+  requests that were not recorded fall back to the synthetic payloads,
+  or get 404 with fallback=False
+
+Latency is configurable per request (base + uniform jitter + an
+occasional tail delay), and the server injects 429s (random, or when
+clients exceed max_rate) and 500s. Point nba_api at it with
+set_stats_base_url() from 02_collect_team_stats (or NBAStatsHTTP.base_url).
+
+USAGE:
+    with StubStatsServer(latency=0.2, jitter=0.05, max_rate=5.0) as server:
+        print(server.base_url)   # http://127.0.0.1:<port>/stats/{endpoint}
+        ...
+        print(server.request_times, server.status_codes)
+
+    # Replay a recorded run
+    with StubStatsServer(latency=0.1, replay_dir='data/cache/nba_api') as server:
+        ...
+
+    # Standalone (e.g. for 01/02 with STATS_BASE_URL pointed at it)
+    python scripts/benchmarks/stub_stats_server.py --port 8000 --latency 0.2
+"""
+
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scripts.benchmarks.synthetic import make_synthetic_games, to_team_game_rows
+
+STUB_TEAM_IDS = list(range(1610612737, 1610612767))
+
+# Like the real endpoint, both measure types return EFG_PCT, TM_TOV_PCT and OREB_PCT
+MEASURE_COLUMNS = {
+    'Advanced': ['OFF_RATING', 'DEF_RATING', 'NET_RATING', 'PACE', 'EFG_PCT', 'TM_TOV_PCT', 'OREB_PCT'],
+    'Four Factors': ['EFG_PCT', 'FTA_RATE', 'TM_TOV_PCT', 'OREB_PCT',
+                     'OPP_EFG_PCT', 'OPP_FTA_RATE', 'OPP_TOV_PCT', 'DREB_PCT'],
+}
+
+
+def team_stats_payload(params):
+    """Deterministic LeagueDashTeamStats-style payload for a query."""
+    measure = params.get('MeasureType', 'Advanced')
+    key = f"{params.get('Season')}|{params.get('DateTo')}|{measure}"
+    rng = random.Random(hashlib.md5(key.encode()).hexdigest())
+    stat_cols = MEASURE_COLUMNS.get(measure, MEASURE_COLUMNS['Advanced'])
+    headers = ['TEAM_ID', 'TEAM_NAME', 'GP', 'W', 'L', 'W_PCT'] + stat_cols
+    rows = []
+    for team_id in STUB_TEAM_IDS:
+        gp = rng.randint(1, 82)
+        w = rng.randint(0, gp)
+        rows.append([team_id, f'Team {team_id}', gp, w, gp - w, round(w / gp, 3)]
+                    + [round(rng.uniform(0.1, 120), 3) for _ in stat_cols])
+    return {
+        'resource': 'leaguedashteamstats',
+        'parameters': params,
+        'resultSets': [{'name': 'LeagueDashTeamStats', 'headers': headers, 'rowSet': rows}],
+    }
+
+
+def _parse_api_date(value):
+    return pd.Timestamp(value) if value else None
+
+
+def game_finder_payload(params, season_rows):
+    """
+    LeagueGameFinder-style payload for a query
+
+    Args:
+        params (dict): Query parameters (Season, DateFrom, DateTo, TeamID)
+        season_rows (callable): season -> team-game rows (see to_team_game_rows)
+
+    Returns:
+        dict: Response body with a LeagueGameFinderResults result set
+    """
+    season = params.get('Season')
+    rows = season_rows(season) if season else season_rows(None)
+    dates = pd.to_datetime(rows['GAME_DATE'])
+    mask = pd.Series(True, index=rows.index)
+    date_from, date_to = _parse_api_date(params.get('DateFrom')), _parse_api_date(params.get('DateTo'))
+    if date_from is not None:
+        mask &= dates >= date_from
+    if date_to is not None:
+        mask &= dates <= date_to
+    if params.get('TeamID'):
+        mask &= rows['TEAM_ID'] == int(params['TeamID'])
+    rows = rows[mask]
+    return {
+        'resource': 'leaguegamefinder',
+        'parameters': params,
+        'resultSets': [{'name': 'LeagueGameFinderResults', 'headers': list(rows.columns),
+                        'rowSet': rows.astype(object).values.tolist()}],
+    }
+
+
+class StubStatsServer:
+    """
+    Threaded stub stats server
+
+    Args:
+        latency (float): Base seconds each response is delayed
+        max_rate (float): Requests/second above which clients get 429 (None = no limit)
+        error_rate (float): Probability of a random 429
+        seed (int): Random seed for injected errors and latency
+        jitter (float): Latency varies uniformly by ±jitter seconds
+        tail_rate (float): Probability of an extra tail_latency delay
+        tail_latency (float): Extra seconds for tail responses
+        server_error_rate (float): Probability of a 500 response
+        replay_dir (str): Response cache directory to replay recorded responses from
+        fallback (bool): Serve synthetic payloads for requests not recorded
+        games_per_season (int): Size of the synthetic leaguegamefinder seasons
+    """
+
+    def __init__(self, latency=0.2, max_rate=None, error_rate=0.0, seed=0, jitter=0.0,
+                 tail_rate=0.0, tail_latency=1.0, server_error_rate=0.0, replay_dir=None,
+                 fallback=True, games_per_season=1230):
+        self.latency = latency
+        self.max_rate = max_rate
+        self.error_rate = error_rate
+        self.jitter = jitter
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.server_error_rate = server_error_rate
+        self.fallback = fallback
+        self.games_per_season = games_per_season
+        self.request_times = []
+        self.status_codes = []
+        self.endpoints = []
+        self.connections = set()   # client (host, port) pairs; keep-alive clients reuse one
+        self.replayed = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._last_ok = None
+        self._seasons = {}
+        self._httpd = None
+        self._thread = None
+
+        self._replay = None
+        if replay_dir is not None:
+            from scripts.data_collection.http_cache import ResponseCache
+            self._replay = ResponseCache(replay_dir, offline=True)
+
+    def _status_for_request(self, endpoint):
+        with self._lock:
+            now = time.monotonic()
+            self.request_times.append(now)
+            self.endpoints.append(endpoint)
+            if self.error_rate and self._rng.random() < self.error_rate:
+                status = 429
+            elif (self.max_rate and self._last_ok is not None
+                  and now - self._last_ok < 1.0 / self.max_rate * 0.9):
+                status = 429
+            elif self.server_error_rate and self._rng.random() < self.server_error_rate:
+                status = 500
+            else:
+                status = 200
+                self._last_ok = now
+            self.status_codes.append(status)
+
+            delay = self.latency + (self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+            if self.tail_rate and self._rng.random() < self.tail_rate:
+                delay += self.tail_latency
+            return status, max(delay, 0.0)
+
+    def season_rows(self, season):
+        """Synthetic LeagueGameFinder rows for a season (built once per season)."""
+        season = season or '2024-25'
+        with self._lock:
+            if season not in self._seasons:
+                year = int(season[:4])
+                games = make_synthetic_games(n_seasons=1, games_per_season=self.games_per_season,
+                                             seed=year, first_season_year=year)
+                self._seasons[season] = to_team_game_rows(games, seed=year)
+            return self._seasons[season]
+
+    def _body(self, endpoint, query, path=None):
+        if self._replay is not None:
+            text = self._replay.get(endpoint, query)
+            if text is not None:
+                with self._lock:
+                    self.replayed += 1
+                return 200, text.encode()
+            if not self.fallback:
+                return 404, b'Not recorded'
+        if endpoint == 'leaguegamefinder':
+            return 200, json.dumps(game_finder_payload(query, self.season_rows)).encode()
+        return 200, json.dumps(team_stats_payload(query)).encode()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'   # keep-alive; every response sets Content-Length
+
+            def do_GET(self):
+                with server._lock:
+                    server.connections.add(self.client_address)
+                url = urlparse(self.path)
+                endpoint = url.path.rstrip('/').rsplit('/', 1)[-1].lower()
+                status, delay = server._status_for_request(endpoint)
+                time.sleep(delay)
+                if status == 429:
+                    body = b'Too Many Requests'
+                elif status == 500:
+                    body = b'Internal Server Error'
+                else:
+                    query = {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+                    status, body = server._body(endpoint, query, url.path)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}/stats/{{endpoint}}'
+
+    def start(self, port=0):
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve stub or replayed stats.nba.com responses locally.")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--max-rate', type=float, default=None)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--replay-dir', default=None, help="Response cache directory to replay")
+    args = parser.parse_args()
+
+    server = StubStatsServer(latency=args.latency, jitter=args.jitter, max_rate=args.max_rate,
+                             error_rate=args.error_rate, replay_dir=args.replay_dir).start(args.port)
+    print(f"✓ Serving on {server.base_url}  (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,211 @@
+"""
+Synthetic NBA Schedules for Benchmarks
+=======================================
+
+Generates matchup-format game data (1 row per game) with the same
+identifier columns the real pipeline uses, so benchmarks can scale to
+any number of seasons without touching the stats API.
+
+USAGE:
+    from scripts.benchmarks.synthetic import make_synthetic_games
+    games = make_synthetic_games(n_seasons=20)
+"""
+
+import numpy as np
+import pandas as pd
+
+N_TEAMS = 30
+GAMES_PER_SEASON = 1230
+SEASON_DAYS = 170
+FIRST_TEAM_ID = 1610612737
+FIRST_SEASON_YEAR = 2000
+
+
+def season_label(start_year):
+    """Season string like '2024-25' for a start year."""
+    return f"{start_year}-{str(start_year + 1)[-2:]}"
+
+
+def _cap_games_per_day(games_per_day, max_games):
+    """Move games from overfull days to the emptiest days."""
+    games_per_day = games_per_day.copy()
+    while games_per_day.max() > max_games:
+        full = games_per_day.argmax()
+        games_per_day[full] -= 1
+        games_per_day[games_per_day.argmin()] += 1
+    return games_per_day
+
+
+def make_synthetic_games(n_seasons=6, games_per_season=GAMES_PER_SEASON, n_teams=N_TEAMS, seed=42,
+                         first_season_year=FIRST_SEASON_YEAR):
+    """
+    Build a synthetic matchup-format schedule.
+    
+    Args:
+        n_seasons (int): Number of seasons to generate
+        games_per_season (int): Games per season (default: 1230)
+        n_teams (int): Number of teams in the league (each plays at most once per date)
+        seed (int): Random seed
+        first_season_year (int): Start year of the first season (default: 2000)
+    
+    Returns:
+        pd.DataFrame: GAME_ID, GAME_DATE, SEASON, HOME/AWAY_TEAM_ID,
+                      HOME/AWAY_PTS, HOME_WIN sorted by GAME_DATE
+    """
+    rng = np.random.default_rng(seed)
+    team_ids = FIRST_TEAM_ID + np.arange(n_teams)
+    
+    frames = []
+    for s in range(n_seasons):
+        start_year = first_season_year + s
+        opening_night = pd.Timestamp(f"{start_year}-10-20")
+        
+        # Spread games over the season; a team plays at most once per date
+        games_per_day = np.bincount(rng.integers(0, SEASON_DAYS, games_per_season), minlength=SEASON_DAYS)
+        games_per_day = _cap_games_per_day(games_per_day, n_teams // 2)
+        home_idx, away_idx, day_offsets = [], [], []
+        for day, n_games in enumerate(games_per_day):
+            playing = rng.permutation(n_teams)[:2 * n_games]
+            home_idx.append(playing[:n_games])
+            away_idx.append(playing[n_games:])
+            day_offsets.append(np.full(n_games, day))
+        home_idx = np.concatenate(home_idx)
+        away_idx = np.concatenate(away_idx)
+        day_offsets = np.concatenate(day_offsets)
+        
+        home_pts = rng.normal(113, 12, games_per_season).round().astype(int)
+        away_pts = rng.normal(111, 12, games_per_season).round().astype(int)
+        away_pts = np.where(away_pts == home_pts, away_pts - 1, away_pts)
+        
+        frames.append(pd.DataFrame({
+            'GAME_ID': [f"00{start_year % 100:02d}{s:03d}{g:05d}" for g in range(games_per_season)],
+            'GAME_DATE': opening_night + pd.to_timedelta(day_offsets, unit='D'),
+            'SEASON': season_label(start_year),
+            'HOME_TEAM_ID': team_ids[home_idx],
+            'AWAY_TEAM_ID': team_ids[away_idx],
+            'HOME_PTS': home_pts,
+            'AWAY_PTS': away_pts,
+        }))
+    
+    games = pd.concat(frames, ignore_index=True)
+    games['HOME_WIN'] = (games['HOME_PTS'] > games['AWAY_PTS']).astype(int)
+    return games.sort_values('GAME_DATE', kind='stable').reset_index(drop=True)
+
+
+def add_synthetic_stats(games, stat_cols, seed=42):
+    """
+    Attach random HOME_/AWAY_ stat columns to a synthetic schedule.
+    
+    Args:
+        games (pd.DataFrame): Output of make_synthetic_games
+        stat_cols (list): Stat names (e.g., ['OFF_RATING', 'PACE'])
+        seed (int): Random seed
+    
+    Returns:
+        pd.DataFrame: Copy of games with HOME_{stat} and AWAY_{stat} columns
+    """
+    rng = np.random.default_rng(seed)
+    games = games.copy()
+    stats = {}
+    for prefix in ['HOME', 'AWAY']:
+        for col in stat_cols:
+            stats[f'{prefix}_{col}'] = rng.normal(100, 10, len(games))
+    return pd.concat([games, pd.DataFrame(stats, index=games.index)], axis=1)
+
+
+def add_synthetic_box_scores(games, seed=42):
+    """
+    Attach random HOME_/AWAY_ box-score totals (FGM, FGA, ..., TOV, STL, BLK, PF, MIN).
+    
+    Args:
+        games (pd.DataFrame): Output of make_synthetic_games
+        seed (int): Random seed
+    
+    Returns:
+        pd.DataFrame: Copy of games with box-score columns for both sides
+    """
+    rng = np.random.default_rng(seed)
+    n = len(games)
+    box = {}
+    for prefix in ['HOME', 'AWAY']:
+        fga = rng.integers(78, 96, n)
+        fgm = (fga * rng.uniform(0.42, 0.52, n)).round().astype(int)
+        fg3m = (fgm * rng.uniform(0.25, 0.4, n)).round().astype(int)
+        fta = rng.integers(12, 32, n)
+        oreb = rng.integers(6, 15, n)
+        dreb = rng.integers(28, 40, n)
+        box.update({
+            f'{prefix}_FGM': fgm, f'{prefix}_FGA': fga, f'{prefix}_FG3M': fg3m,
+            f'{prefix}_FTM': (fta * 0.78).round().astype(int), f'{prefix}_FTA': fta,
+            f'{prefix}_OREB': oreb, f'{prefix}_DREB': dreb, f'{prefix}_REB': oreb + dreb,
+            f'{prefix}_AST': rng.integers(18, 32, n), f'{prefix}_TOV': rng.integers(8, 19, n),
+            f'{prefix}_MIN': np.where(rng.random(n) < 0.06, 265, 240),
+        })
+    # Separate stream, so the totals above don't depend on these
+    extra = np.random.default_rng(seed + 2)
+    for prefix in ['HOME', 'AWAY']:
+        box.update({
+            f'{prefix}_STL': extra.integers(4, 12, n), f'{prefix}_BLK': extra.integers(2, 9, n),
+            f'{prefix}_PF': extra.integers(14, 26, n),
+        })
+    return pd.concat([games.copy(), pd.DataFrame(box, index=games.index)], axis=1)
+
+
+def to_team_game_rows(games, seed=42):
+    """
+    Expand a synthetic schedule into LeagueGameFinder-style team-game rows.
+    
+    Args:
+        games (pd.DataFrame): Output of make_synthetic_games (box-score
+            columns from add_synthetic_box_scores are added if missing)
+        seed (int): Random seed for the box scores
+    
+    Returns:
+        pd.DataFrame: 2 rows per game with TEAM_ID, TEAM_ABBREVIATION,
+                      TEAM_NAME, GAME_ID, GAME_DATE ('YYYY-MM-DD'),
+                      MATCHUP ('AAA vs. BBB' / 'BBB @ AAA'), WL and box-score
+                      stats, in the API's column order
+    """
+    if 'HOME_FGM' not in games.columns:
+        games = add_synthetic_box_scores(games, seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    n = len(games)
+    abbr = lambda ids: 'T' + (ids % 100).astype(str).str.zfill(2)
+    
+    frames = []
+    for side, opp, sep in (('HOME', 'AWAY', ' vs. '), ('AWAY', 'HOME', ' @ ')):
+        own = games[f'{side}_PTS'].to_numpy()
+        other = games[f'{opp}_PTS'].to_numpy()
+        fg3a = (games[f'{side}_FG3M'] / rng.uniform(0.3, 0.42, n)).round().astype(int)
+        frames.append(pd.DataFrame({
+            'SEASON_ID': '2' + games['SEASON'].str[:4],
+            'TEAM_ID': games[f'{side}_TEAM_ID'].to_numpy(),
+            'TEAM_ABBREVIATION': abbr(games[f'{side}_TEAM_ID']).to_numpy(),
+            'TEAM_NAME': ('Team ' + abbr(games[f'{side}_TEAM_ID'])).to_numpy(),
+            'GAME_ID': games['GAME_ID'].to_numpy(),
+            'GAME_DATE': games['GAME_DATE'].dt.strftime('%Y-%m-%d').to_numpy(),
+            'MATCHUP': (abbr(games[f'{side}_TEAM_ID']) + sep + abbr(games[f'{opp}_TEAM_ID'])).to_numpy(),
+            'WL': np.where(own > other, 'W', 'L'),
+            'MIN': games[f'{side}_MIN'].to_numpy(),
+            'PTS': own,
+            'FGM': games[f'{side}_FGM'].to_numpy(),
+            'FGA': games[f'{side}_FGA'].to_numpy(),
+            'FG_PCT': (games[f'{side}_FGM'] / games[f'{side}_FGA']).round(3).to_numpy(),
+            'FG3M': games[f'{side}_FG3M'].to_numpy(),
+            'FG3A': fg3a.to_numpy(),
+            'FG3_PCT': (games[f'{side}_FG3M'] / fg3a.clip(lower=1)).round(3).to_numpy(),
+            'FTM': games[f'{side}_FTM'].to_numpy(),
+            'FTA': games[f'{side}_FTA'].to_numpy(),
+            'FT_PCT': (games[f'{side}_FTM'] / games[f'{side}_FTA']).round(3).to_numpy(),
+            'OREB': games[f'{side}_OREB'].to_numpy(),
+            'DREB': games[f'{side}_DREB'].to_numpy(),
+            'REB': games[f'{side}_REB'].to_numpy(),
+            'AST': games[f'{side}_AST'].to_numpy(),
+            'STL': games[f'{side}_STL'].to_numpy(),
+            'BLK': games[f'{side}_BLK'].to_numpy(),
+            'TOV': games[f'{side}_TOV'].to_numpy(),
+            'PF': games[f'{side}_PF'].to_numpy(),
+            'PLUS_MINUS': (own - other).astype(float),
+        }))
+    return pd.concat(frames, ignore_index=True).sort_values(['GAME_DATE', 'GAME_ID'], kind='stable') \
+        .reset_index(drop=True)
@@ -9,6 +9,8 @@ Expected games: ~6,100 games (includes Game 1 of each season)
 
 USAGE:
     python collect_nba_games_improved.py
+    python collect_nba_games_improved.py --offline    # serve only from the response cache
+    python collect_nba_games_improved.py --no-cache   # always hit the API
 
 OUTPUT:
     data/raw/nba/nba_games_all_seasons_RAW.csv
@@ -17,14 +19,25 @@ KEY DIFFERENCE:
     - Gets ALL games at once (not per team)
     - No duplicates
     - Already in matchup format
+    - Seasons are fetched concurrently (MAX_WORKERS) under one rate limit;
+      each is converted and written to its own SEASON partition as soon as
+      it arrives, so memory is bounded by the seasons in flight
 """
 
 from nba_api.stats.endpoints import leaguegamefinder
 from nba_api.stats.static import teams
 import pandas as pd
-import time
+import argparse
 from datetime import datetime
 import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scripts.data_collection.fetcher import TokenBucket, fetch_concurrently
+from scripts.data_collection.http_cache import CacheMissError, install_response_cache
+from scripts.data_collection.schema import apply_schema, load_typed
+from scripts.data_collection.storage import DatasetWriter, dataset_exists
 
 # ============================================================
 # CONFIGURATION
@@ -33,12 +46,58 @@ import os
 SEASONS = ['2020-21', '2021-22', '2022-23', '2023-24', '2024-25', '2025-26']
 OUTPUT_DIR = 'data/raw/nba'
 OUTPUT_FILE = 'nba_games_all_seasons_RAW.csv'
-RATE_LIMIT_DELAY = 2.0  # Be conservative with API
+RATE_LIMIT_DELAY = 2.0  # Be conservative with API (global ceiling: 1 / RATE_LIMIT_DELAY requests per second)
+MAX_WORKERS = 3         # seasons in flight; latency overlaps, the rate ceiling still holds
+MAX_RETRIES = 3
+EXPORT_CSV = True  # also write the CSV next to the Parquet dataset
+
+# Matchup-format columns (add more if needed)
+MATCHUP_COLUMNS = [
+    'GAME_ID', 'GAME_DATE', 'SEASON',
+    'HOME_TEAM_ID', 'HOME_TEAM_ABBREVIATION', 'HOME_TEAM_NAME',
+    'AWAY_TEAM_ID', 'AWAY_TEAM_ABBREVIATION', 'AWAY_TEAM_NAME',
+    'HOME_WIN', 'HOME_WL', 'AWAY_WL',
+    'HOME_PTS', 'AWAY_PTS',
+    'HOME_FGM', 'HOME_FGA', 'HOME_FG_PCT',
+    'AWAY_FGM', 'AWAY_FGA', 'AWAY_FG_PCT',
+    'HOME_FG3M', 'HOME_FG3A', 'HOME_FG3_PCT',
+    'AWAY_FG3M', 'AWAY_FG3A', 'AWAY_FG3_PCT',
+    'HOME_FTM', 'HOME_FTA', 'HOME_FT_PCT',
+    'AWAY_FTM', 'AWAY_FTA', 'AWAY_FT_PCT',
+    'HOME_OREB', 'HOME_DREB', 'HOME_REB',
+    'AWAY_OREB', 'AWAY_DREB', 'AWAY_REB',
+    'HOME_AST', 'HOME_STL', 'HOME_BLK', 'HOME_TOV', 'HOME_PF',
+    'AWAY_AST', 'AWAY_STL', 'AWAY_BLK', 'AWAY_TOV', 'AWAY_PF',
+    'HOME_PLUS_MINUS', 'AWAY_PLUS_MINUS',
+    'HOME_MIN', 'AWAY_MIN'
+]
 
 # ============================================================
 # MAIN COLLECTION
 # ============================================================
 
+def fetch_season_games(season):
+    """
+    Fetch ALL games for a season in one request (raises on failure).
+    
+    Args:
+        season (str): Season like '2024-25'
+    
+    Returns:
+        pd.DataFrame: All team-game records (2 rows per game), compact dtypes
+    """
+    # Get ALL games for the season (not per team!)
+    gamefinder = leaguegamefinder.LeagueGameFinder(
+        season_nullable=season,
+        season_type_nullable='Regular Season',
+        league_id_nullable='00'  # NBA
+    )
+    
+    games_df = gamefinder.get_data_frames()[0]
+    games_df['SEASON'] = season
+    return apply_schema(games_df)
+
+
 def collect_all_games_for_season(season):
     """
     Collect ALL games for a season at once.
@@ -53,15 +112,7 @@ def collect_all_games_for_season(season):
     print(f"\nCollecting {season}...")
     
     try:
-        # Get ALL games for the season (not per team!)
-        gamefinder = leaguegamefinder.LeagueGameFinder(
-            season_nullable=season,
-            season_type_nullable='Regular Season',
-            league_id_nullable='00'  # NBA
-        )
-        
-        games_df = gamefinder.get_data_frames()[0]
-        games_df['SEASON'] = season
+        games_df = fetch_season_games(season)
         
         # Get unique game count
         unique_games = games_df['GAME_ID'].nunique()
@@ -81,23 +132,28 @@ def convert_to_matchup_format(games_df):
     to matchup format (1 row per game with HOME/AWAY columns).
     
     This is the format you need for feature engineering!
+    Rows are typed by the ingestion schema (categorical names, int16
+    counts, float32 percentages) before they are split, and only the
+    columns kept below are carried through the merge.
     """
     print("\nConverting to matchup format...")
     
+    games_df = apply_schema(games_df)
+    side_cols = list(dict.fromkeys(
+        ['GAME_ID', 'GAME_DATE', 'SEASON']
+        + [c[len('HOME_'):] for c in MATCHUP_COLUMNS if c.startswith('HOME_') and c != 'HOME_WIN']))
+    side_cols = [c for c in side_cols if c in games_df.columns]
+    
     # Identify home vs away games
-    games_df['IS_HOME'] = games_df['MATCHUP'].str.contains('vs.')
+    is_home = games_df['MATCHUP'].str.contains('vs.').to_numpy(dtype=bool)
     
-    # Split into home and away
-    home_games = games_df[games_df['IS_HOME'] == True].copy()
-    away_games = games_df[games_df['IS_HOME'] == False].copy()
+    # Split into home and away (prefixed on the way out, no intermediate copies)
+    home_games = games_df.loc[is_home, side_cols].add_prefix('HOME_')
+    away_games = games_df.loc[~is_home, side_cols].add_prefix('AWAY_')
     
     print(f"  Home game records: {len(home_games)}")
     print(f"  Away game records: {len(away_games)}")
     
-    # Add prefixes
-    home_games = home_games.add_prefix('HOME_')
-    away_games = away_games.add_prefix('AWAY_')
-    
     # Merge on GAME_ID
     matchups = home_games.merge(
         away_games,
@@ -112,31 +168,11 @@ def convert_to_matchup_format(games_df):
     # Add useful columns
     matchups['GAME_DATE'] = pd.to_datetime(matchups['HOME_GAME_DATE'])
     matchups['SEASON'] = matchups['HOME_SEASON']
-    matchups['HOME_WIN'] = (matchups['HOME_WL'] == 'W').astype(int)
-    
-    # Select key columns to keep (add more if needed)
-    keep_cols = [
-        'GAME_ID', 'GAME_DATE', 'SEASON',
-        'HOME_TEAM_ID', 'HOME_TEAM_ABBREVIATION', 'HOME_TEAM_NAME',
-        'AWAY_TEAM_ID', 'AWAY_TEAM_ABBREVIATION', 'AWAY_TEAM_NAME',
-        'HOME_WIN', 'HOME_WL', 'AWAY_WL',
-        'HOME_PTS', 'AWAY_PTS',
-        'HOME_FGM', 'HOME_FGA', 'HOME_FG_PCT',
-        'AWAY_FGM', 'AWAY_FGA', 'AWAY_FG_PCT',
-        'HOME_FG3M', 'HOME_FG3A', 'HOME_FG3_PCT',
-        'AWAY_FG3M', 'AWAY_FG3A', 'AWAY_FG3_PCT',
-        'HOME_FTM', 'HOME_FTA', 'HOME_FT_PCT',
-        'AWAY_FTM', 'AWAY_FTA', 'AWAY_FT_PCT',
-        'HOME_OREB', 'HOME_DREB', 'HOME_REB',
-        'AWAY_OREB', 'AWAY_DREB', 'AWAY_REB',
-        'HOME_AST', 'HOME_STL', 'HOME_BLK', 'HOME_TOV', 'HOME_PF',
-        'AWAY_AST', 'AWAY_STL', 'AWAY_BLK', 'AWAY_TOV', 'AWAY_PF',
-        'HOME_PLUS_MINUS', 'AWAY_PLUS_MINUS'
-    ]
+    matchups['HOME_WIN'] = (matchups['HOME_WL'] == 'W').astype('int8')
     
     # Keep only columns that exist
-    keep_cols = [col for col in keep_cols if col in matchups.columns]
-    matchups = matchups[keep_cols]
+    keep_cols = [col for col in MATCHUP_COLUMNS if col in matchups.columns]
+    matchups = apply_schema(matchups[keep_cols])
     
     print(f"✓ Converted to {len(matchups)} matchup records")
     print(f"  Columns: {len(matchups.columns)}")
@@ -144,72 +180,132 @@ def convert_to_matchup_format(games_df):
     return matchups
 
 
-def save_with_metadata(df, output_path):
-    """Save data with summary statistics."""
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
-    df.to_csv(output_path, index=False)
-    
+def season_summary(matchups):
+    """Per-season numbers kept for the final report (the rows themselves are not kept)."""
+    return {
+        'season': matchups['SEASON'].iloc[0],
+        'games': len(matchups),
+        'first_date': matchups['GAME_DATE'].min(),
+        'last_date': matchups['GAME_DATE'].max(),
+        'missing': matchups.isnull().sum(),
+        'columns': len(matchups.columns),
+    }
+
+
+def print_save_summary(summaries, output_path):
+    """Print the saved dataset's summary from per-season summaries."""
     print("\n" + "="*70)
     print("✓ DATA SAVED SUCCESSFULLY")
     print("="*70)
     print(f"Location: {output_path}")
-    print(f"Total games: {len(df):,}")
-    print(f"Columns: {len(df.columns)}")
-    print(f"Date range: {df['GAME_DATE'].min().date()} to {df['GAME_DATE'].max().date()}")
-    print(f"Seasons: {sorted(df['SEASON'].unique())}")
+    print(f"Total games: {sum(s['games'] for s in summaries):,}")
+    print(f"Columns: {max(s['columns'] for s in summaries)}")
+    print(f"Date range: {min(s['first_date'] for s in summaries).date()} to "
+          f"{max(s['last_date'] for s in summaries).date()}")
+    print(f"Seasons: {sorted(s['season'] for s in summaries)}")
     
     # Check for missing values
-    missing = df.isnull().sum()
+    missing = pd.concat([s['missing'] for s in summaries], axis=1).fillna(0).sum(axis=1)
     if missing.sum() > 0:
         print(f"\n⚠️  Columns with missing values:")
-        print(missing[missing > 0])
+        print(missing[missing > 0].astype(int))
     else:
         print(f"\n✓ No missing values!")
     
     print("="*70)
 
 
-def main():
-    """Main collection workflow."""
+def collect_seasons(seasons, output_path, limiter=None):
+    """
+    Fetch seasons concurrently and write each one as soon as it arrives.
+    
+    Season requests share one rate limiter and run MAX_WORKERS at a
+    time. Every completed season is converted to matchup format and
+    written to its own partition right away, so at most MAX_WORKERS
+    seasons are held in memory. A season that fails keeps its
+    previously stored partition, if there is one.
+    
+    Args:
+        seasons (list): Seasons like ['2023-24', '2024-25']
+        output_path (str): Dataset path
+        limiter (TokenBucket): Rate limiter per request; None when the
+            response cache applies the limit to network calls only
+    
+    Returns:
+        tuple: (season summaries, failed seasons as (season, error))
+    """
+    summaries, failed = [], []
+    
+    with DatasetWriter(output_path, export_csv=EXPORT_CSV) as writer:
+        for (season,), games, error in fetch_concurrently(
+                [(season,) for season in seasons], fetch_season_games, limiter,
+                max_workers=MAX_WORKERS, max_retries=MAX_RETRIES, backoff=RATE_LIMIT_DELAY,
+                no_retry=(CacheMissError,)):
+            
+            if error is not None or games.empty:
+                print(f"\n✗ Error collecting {season}: {error or 'no games returned'}")
+                failed.append((season, error or 'no games returned'))
+                continue
+            
+            print(f"\n✓ {season}: {len(games)} team-game records ({games['GAME_ID'].nunique()} unique games)")
+            matchups = convert_to_matchup_format(games)
+            writer.write(matchups)
+            summaries.append(season_summary(matchups))
+            del games, matchups
+        
+        # Keep what was stored for seasons that failed this time
+        for season, _ in failed:
+            if dataset_exists(output_path):
+                previous = load_typed(output_path, seasons=[season])
+                if not previous.empty:
+                    writer.write(previous)
+                    summaries.append(season_summary(previous))
+                    print(f"  ↺ {season}: kept {len(previous)} previously stored games")
+        
+        if not summaries:
+            writer.abort()
+    
+    return summaries, failed
+
+
+def main(offline=False, use_cache=True):
+    """
+    Main collection workflow.
+    
+    Args:
+        offline (bool): Serve responses only from the cache
+        use_cache (bool): Cache API responses on disk
+    """
     start_time = datetime.now()
     
+    # Rate limit applies to network calls only; cached seasons return at once
+    limiter = TokenBucket(rate=1.0 / RATE_LIMIT_DELAY)
+    cache = install_response_cache(limiter=limiter, offline=offline) if use_cache else None
+    
     print("\n" + "="*70)
     print("NBA GAME DATA COLLECTION (IMPROVED)")
     print("="*70)
     print(f"Start time: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"Seasons: {', '.join(SEASONS)}")
     print(f"Output: {os.path.join(OUTPUT_DIR, OUTPUT_FILE)}")
+    print(f"Workers: {MAX_WORKERS} (≤ {1 / RATE_LIMIT_DELAY:.2f} requests/s)")
     
-    # Collect all seasons
-    all_seasons = []
+    # Collect all seasons; each is written to its own partition as it arrives
+    output_path = os.path.join(OUTPUT_DIR, OUTPUT_FILE)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    summaries, failed = collect_seasons(SEASONS, output_path, limiter=None if cache else limiter)
     
-    for season in SEASONS:
-        games = collect_all_games_for_season(season)
-        
-        if not games.empty:
-            all_seasons.append(games)
-        
-        time.sleep(RATE_LIMIT_DELAY)  # Rate limiting
+    if cache is not None:
+        print(f"\n✓ Response {cache.summary()}")
     
-    if not all_seasons:
+    if not summaries:
         print("\n✗ No data collected!")
         return
     
-    # Combine all seasons
-    print("\nCombining all seasons...")
-    all_games = pd.concat(all_seasons, ignore_index=True)
-    print(f"✓ Total records: {len(all_games):,}")
-    
-    # Convert to matchup format
-    matchups = convert_to_matchup_format(all_games)
+    print_save_summary(summaries, output_path)
     
-    # Sort by date
-    matchups = matchups.sort_values('GAME_DATE').reset_index(drop=True)
-    
-    # Save
-    output_path = os.path.join(OUTPUT_DIR, OUTPUT_FILE)
-    save_with_metadata(matchups, output_path)
+    if failed:
+        print(f"\n⚠️  Failed seasons: {', '.join(season for season, _ in failed)}")
     
     # Stats
     end_time = datetime.now()
@@ -231,4 +327,9 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Collect NBA games in matchup format.")
+    parser.add_argument('--offline', action='store_true', help="Serve API responses only from the cache")
+    parser.add_argument('--no-cache', action='store_true', help="Don't read or write the response cache")
+    args = parser.parse_args()
+    
+    main(offline=args.offline, use_cache=not args.no_cache)
\ No newline at end of file
@@ -7,9 +7,17 @@ Works with matchup-format game data (1 row per game)
 Key improvements:
 - Works with HOME_TEAM_ID and AWAY_TEAM_ID format
 - Better error handling
-- Checkpoint saving
-- Resume capability
+- Append-only checkpoint journal
+- Automatic resume capability
 - Collects both Advanced Stats AND Four Factors
+- STATS_SOURCE = 'local' builds the same stats from box scores (no API calls),
+  with optional spot checks against the API (RECONCILE_SAMPLE_DATES)
+
+USAGE:
+    python 02_collect_team_stats.py
+    python 02_collect_team_stats.py --offline    # serve only from the response cache
+    python 02_collect_team_stats.py --no-cache   # always hit the API
+    python 02_collect_team_stats.py --dry-run    # print the request plan and estimated time only
 
 INPUT:
     data/raw/nba/nba_games_all_seasons_RAW.csv (from improved collection script)
@@ -19,10 +27,23 @@ OUTPUT:
 """
 
 from nba_api.stats.endpoints import leaguedashteamstats
+from nba_api.stats.library.http import NBAStatsHTTP
 import pandas as pd
+import argparse
 import time
 from datetime import datetime
 import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scripts.data_collection.fetcher import TokenBucket, fetch_concurrently
+from scripts.data_collection.http_cache import CacheMissError, install_response_cache
+from scripts.data_collection.journal import CollectionJournal
+from scripts.data_collection.local_team_stats import build_asof_team_stats, compare_team_stats
+from scripts.data_collection.planner import plan_collection
+from scripts.data_collection.schema import apply_schema, load_typed
+from scripts.data_collection.storage import dataset_exists, save_dataset
 
 # ============================================================
 # CONFIGURATION
@@ -31,22 +52,65 @@ import os
 INPUT_FILE = 'data/raw/nba/nba_games_all_seasons_RAW.csv'
 OUTPUT_DIR = 'data/raw/nba'
 OUTPUT_FILE = 'nba_team_stats_by_date.csv'
-CHECKPOINT_FILE = 'nba_team_stats_checkpoint.csv'
+JOURNAL_DIR = 'nba_team_stats_journal'  # append-only checkpoint journal
 
-RATE_LIMIT_DELAY = 1.0
-CHECKPOINT_INTERVAL = 50  # Save every 50 dates
+RATE_LIMIT_DELAY = 1.0   # seconds between requests (global ceiling: 1 / RATE_LIMIT_DELAY per second)
+MAX_WORKERS = 4          # requests in flight; latency overlaps, the rate ceiling still holds
+JOURNAL_COMPACT_AT = 2000  # compact journal segments on resume once there are this many (None = never)
 MAX_RETRIES = 3
+STATS_BASE_URL = None    # e.g., 'http://127.0.0.1:8000/stats/{endpoint}' for a local stub server
 
 # Filter to specific seasons if needed (None = all seasons)
 SEASONS_FILTER = None  # e.g., ['2024-25', '2025-26']
+EXPORT_CSV = True  # also write the CSV next to the Parquet dataset
+
+# 'local' = season-to-date stats computed from the games file's box scores
+# 'api'   = two LeagueDashTeamStats calls per game date
+STATS_SOURCE = 'local'
+RECONCILE_SAMPLE_DATES = 0   # e.g., 5 = compare local stats with the API on 5 random dates
+RECONCILE_TOLERANCE = 0.02   # max relative difference per stat
 
 # ============================================================
 # FETCH FUNCTIONS
 # ============================================================
 
+def request_team_stats(season, date_str, stat_type='Advanced', team_ids=None):
+    """
+    Single LeagueDashTeamStats request (no sleep, no retry).
+    
+    Args:
+        season (str): Season like '2024-25'
+        date_str (str): Date in 'YYYY-MM-DD' format
+        stat_type (str): 'Advanced' or 'Four Factors'
+        team_ids (list): Optional list of team IDs to filter for (saves API data)
+    
+    Returns:
+        pd.DataFrame: Stats as of date_str (raises on API errors)
+    """
+    api_date = datetime.strptime(date_str, '%Y-%m-%d').strftime('%m/%d/%Y')
+    
+    stats = leaguedashteamstats.LeagueDashTeamStats(
+        season=season,
+        date_to_nullable=api_date,
+        measure_type_detailed_defense=stat_type,
+        season_type_all_star='Regular Season',
+        timeout=90
+    )
+    
+    df = stats.get_data_frames()[0]
+    
+    # Filter to only teams that played if specified
+    if team_ids is not None:
+        df = df[df['TEAM_ID'].isin(team_ids)]
+    
+    # Add metadata
+    df = df.assign(GAME_DATE=date_str, SEASON=season, STAT_TYPE=stat_type)
+    return apply_schema(df)
+
+
 def fetch_stats_for_date(season, date_str, team_ids=None, stat_type='Advanced', max_retries=MAX_RETRIES):
     """
-    Fetch team statistics as of a specific date.
+    Fetch team statistics as of a specific date (sequential, with backoff).
     
     Args:
         season (str): Season like '2024-25'
@@ -60,35 +124,11 @@ def fetch_stats_for_date(season, date_str, team_ids=None, stat_type='Advanced',
     """
     for attempt in range(max_retries):
         try:
-            # Convert to API format
-            date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-            api_date = date_obj.strftime('%m/%d/%Y')
-            
             # Rate limiting with exponential backoff
             wait_time = RATE_LIMIT_DELAY * (2 ** attempt) if attempt > 0 else RATE_LIMIT_DELAY
             time.sleep(wait_time)
             
-            # Fetch stats
-            stats = leaguedashteamstats.LeagueDashTeamStats(
-                season=season,
-                date_to_nullable=api_date,
-                measure_type_detailed_defense=stat_type,
-                season_type_all_star='Regular Season',
-                timeout=90
-            )
-            
-            df = stats.get_data_frames()[0]
-            
-            # Filter to only teams that played if specified
-            if team_ids is not None:
-                df = df[df['TEAM_ID'].isin(team_ids)]
-            
-            # Add metadata
-            df['GAME_DATE'] = date_str
-            df['SEASON'] = season
-            df['STAT_TYPE'] = stat_type
-            
-            return df, None
+            return request_team_stats(season, date_str, stat_type, team_ids), None
             
         except Exception as e:
             if attempt == max_retries - 1:
@@ -98,6 +138,17 @@ def fetch_stats_for_date(season, date_str, team_ids=None, stat_type='Advanced',
     return pd.DataFrame(), "Max retries exceeded"
 
 
+def set_stats_base_url(base_url):
+    """
+    Point nba_api stats requests at another host (e.g. a local stub server).
+    
+    Args:
+        base_url (str): URL template with an {endpoint} placeholder,
+            e.g. 'http://127.0.0.1:8000/stats/{endpoint}'
+    """
+    NBAStatsHTTP.base_url = base_url
+
+
 def merge_advanced_and_four_factors(adv_df, ff_df):
     """
     Merge Advanced Stats and Four Factors datasets.
@@ -136,128 +187,182 @@ def merge_advanced_and_four_factors(adv_df, ff_df):
 # COLLECTION
 # ============================================================
 
-def collect_stats_for_all_dates(games_df):
+def collect_stats_for_all_dates(games_df, rate_limited=True, stored=None):
     """
     Collect stats for all unique game dates with checkpoint support.
     OPTIMIZATION: Only collects stats for teams that played on each date.
+    Requests run concurrently (MAX_WORKERS) under one shared rate limit.
+    
+    The request list comes from the collection planner: dates already
+    journaled or already in the stored dataset are skipped. Every
+    completed (season, date, measure_type) request is appended to a
+    journal as soon as it returns, so a rerun resumes automatically.
     
     Args:
         games_df (pd.DataFrame): Game data with GAME_DATE and SEASON columns
+        rate_limited (bool): Rate-limit every request here; False when the
+            response cache applies the limit to network calls only
+        stored (pd.DataFrame): Stats already saved (SEASON, GAME_DATE,
+            TEAM_ID); their dates are not requested again
     
     Returns:
-        pd.DataFrame: Combined stats for all dates
+        pd.DataFrame: Combined stats for the journaled dates
     """
-    checkpoint_path = os.path.join(OUTPUT_DIR, CHECKPOINT_FILE)
-    
-    # Check for checkpoint
-    collected_dates = set()
-    all_stats = []
-    
-    if os.path.exists(checkpoint_path):
-        print(f"\n✓ Found checkpoint: {CHECKPOINT_FILE}")
-        existing = pd.read_csv(checkpoint_path)
-        print(f"  Records: {len(existing):,}")
-        print(f"  Last date: {existing['GAME_DATE'].max()}")
-        
-        resume = input("\n  Resume from checkpoint? (y/n): ").strip().lower()
-        if resume == 'y':
-            all_stats.append(existing)
-            collected_dates = set(existing['GAME_DATE'].unique())
-            print(f"  ✓ Resuming with {len(collected_dates)} dates already collected\n")
-        else:
-            print("  Starting fresh collection...\n")
-    
-    # Get unique date-season combinations
-    games_df['GAME_DATE'] = pd.to_datetime(games_df['GAME_DATE'])
-    date_season_pairs = games_df[['GAME_DATE', 'SEASON']].drop_duplicates()
-    date_season_pairs = date_season_pairs.sort_values('GAME_DATE')
-    
-    total_dates = len(date_season_pairs)
-    print(f"Total dates to collect: {total_dates}")
-    print(f"Estimated time: {total_dates * RATE_LIMIT_DELAY * 2 / 60:.1f} minutes")
+    journal = CollectionJournal(os.path.join(OUTPUT_DIR, JOURNAL_DIR))
+    completed = journal.completed_keys()
+    
+    if completed:
+        print(f"\n✓ Resuming from journal: {JOURNAL_DIR}")
+        print(f"  Completed requests: {len(completed):,}")
+        print(f"  Last date: {max(date for _, date, _ in completed)}")
+        if JOURNAL_COMPACT_AT and journal.n_segments >= JOURNAL_COMPACT_AT:
+            print(f"  ✓ Compacted {journal.compact():,} segments")
+    
+    # Minimal work list: one request per missing (season, date, measure type)
+    plan = plan_collection(games_df, journaled=completed, stored=stored)
+    tasks = plan.tasks
+    
+    remaining = {}
+    for season, date_str, _, _ in tasks:
+        remaining[(season, date_str)] = remaining.get((season, date_str), 0) + 1
+    
+    total_dates = plan.n_dates
+    print("Collection plan:")
+    plan.print_summary(rate=1.0 / RATE_LIMIT_DELAY, max_workers=MAX_WORKERS)
     print(f"(Collecting Advanced + Four Factors for each date)")
     print(f"\n💡 OPTIMIZATION: Only collecting stats for teams that played on each date")
     print(f"   This reduces data volume by ~50% compared to collecting all 30 teams\n")
     
+    limiter = TokenBucket(rate=1.0 / RATE_LIMIT_DELAY) if rate_limited else None
+    
     failed_dates = []
-    checkpoint_counter = len(collected_dates)
+    done_dates = total_dates - len(remaining)
+    errors = {}
     
-    for idx, (_, row) in enumerate(date_season_pairs.iterrows(), 1):
-        date = row['GAME_DATE']
-        season = row['SEASON']
-        date_str = date.strftime('%Y-%m-%d')
-        
-        # Skip if already collected
-        if date_str in collected_dates:
-            print(f"[{idx}/{total_dates}] {season} {date_str} ... ⏭️  Already collected")
-            continue
-        
-        # Get teams that played on this date
-        teams_on_date = games_df[
-            (games_df['GAME_DATE'] == date) & 
-            (games_df['SEASON'] == season)
-        ]
-        
-        # Extract unique team IDs (both home and away)
-        home_teams = teams_on_date['HOME_TEAM_ID'].unique().tolist()
-        away_teams = teams_on_date['AWAY_TEAM_ID'].unique().tolist()
-        team_ids = list(set(home_teams + away_teams))
+    for (season, date_str, stat_type, team_ids), df, error in fetch_concurrently(
+            tasks, request_team_stats, limiter,
+            max_workers=MAX_WORKERS, max_retries=MAX_RETRIES, backoff=RATE_LIMIT_DELAY,
+            no_retry=(CacheMissError,)):
         
-        team_count = len(team_ids)
-        
-        print(f"[{idx}/{total_dates}] {season} {date_str} ({team_count} teams) ...", end=" ")
-        
-        # Collect Advanced Stats (only for teams that played)
-        adv_df, adv_error = fetch_stats_for_date(season, date_str, team_ids, 'Advanced')
+        # Checkpoint: one segment + one index line per completed request
+        if df is not None and not df.empty:
+            journal.record(season, date_str, stat_type, df)
+        else:
+            errors.setdefault((season, date_str), []).append(f"{stat_type}: {error}")
         
-        # Collect Four Factors (only for teams that played)
-        ff_df, ff_error = fetch_stats_for_date(season, date_str, team_ids, 'Four Factors')
+        # Report once every pending request for the date is back
+        key = (season, date_str)
+        remaining[key] -= 1
+        if remaining[key]:
+            continue
         
-        # Check results
-        if not adv_df.empty and not ff_df.empty:
-            # Both successful - merge them
-            merged = merge_advanced_and_four_factors(adv_df, ff_df)
-            all_stats.append(merged)
-            print(f"✓ {len(merged)} teams (Adv + FF)")
-            
-        elif not adv_df.empty:
-            # Only Advanced successful
-            all_stats.append(adv_df)
-            print(f"⚠️  {len(adv_df)} teams (Adv only, FF failed)")
-            failed_dates.append((season, date_str, f"FF: {ff_error}"))
-            
-        elif not ff_df.empty:
-            # Only Four Factors successful
-            all_stats.append(ff_df)
-            print(f"⚠️  {len(ff_df)} teams (FF only, Adv failed)")
-            failed_dates.append((season, date_str, f"Adv: {adv_error}"))
-            
+        done_dates += 1
+        print(f"[{done_dates}/{total_dates}] {season} {date_str} ({len(team_ids)} teams) ...", end=" ")
+        if key in errors:
+            print(f"✗ {'; '.join(e[:40] for e in errors[key])}")
+            failed_dates.append((season, date_str, '; '.join(errors[key])))
         else:
-            # Both failed
-            print(f"✗ Failed (both)")
-            failed_dates.append((season, date_str, f"Both failed"))
-        
-        # Checkpoint saving
-        checkpoint_counter += 1
-        if checkpoint_counter % CHECKPOINT_INTERVAL == 0 and all_stats:
-            temp_df = pd.concat(all_stats, ignore_index=True)
-            temp_df.to_csv(checkpoint_path, index=False)
-            print(f"    💾 Checkpoint saved: {len(temp_df):,} records")
-    
-    # Combine all
-    if all_stats:
-        combined = pd.concat(all_stats, ignore_index=True)
-        return combined, failed_dates
-    else:
+            print("✓ journaled")
+    
+    # Combine all: one outer merge of every Advanced row with every Four Factors row
+    journaled = journal.load()
+    if journaled.empty:
         return pd.DataFrame(), failed_dates
+    
+    adv_df = journaled[journaled['STAT_TYPE'] == 'Advanced'].dropna(axis=1, how='all')
+    ff_df = journaled[journaled['STAT_TYPE'] == 'Four Factors'].dropna(axis=1, how='all')
+    combined = merge_advanced_and_four_factors(adv_df, ff_df)
+    return combined.sort_values(['GAME_DATE', 'TEAM_ID'], kind='stable').reset_index(drop=True), failed_dates
+
+
+STATS_KEYS = ['SEASON', 'GAME_DATE', 'TEAM_ID']
+
+def combine_with_stored(stored, new_df):
+    """
+    Stored stats updated with newly collected rows
+    
+    The journal kept after failed dates still holds rows that were
+    already saved, so a rerun returns them again. Rows are combined per
+    (SEASON, GAME_DATE, TEAM_ID) instead of appended: the last non-null
+    value of each column wins, so a retried measure fills the gaps of
+    its stored row and nothing is duplicated.
+    
+    Args:
+        stored (pd.DataFrame): Stats already saved
+        new_df (pd.DataFrame): Stats returned by collect_stats_for_all_dates
+    
+    Returns:
+        pd.DataFrame: One row per (SEASON, GAME_DATE, TEAM_ID), in date order
+    """
+    combined = pd.concat([stored, new_df], ignore_index=True)
+    combined['SEASON'] = combined['SEASON'].astype(str)
+    latest = combined.groupby(STATS_KEYS, sort=False, observed=True).last().reset_index()
+    return latest[combined.columns].sort_values(['GAME_DATE', 'TEAM_ID'], kind='stable').reset_index(drop=True)
+
+
+# ============================================================
+# RECONCILIATION
+# ============================================================
+
+def reconcile_local_stats(local_df, games_df, n_dates=RECONCILE_SAMPLE_DATES,
+                          tolerance=RECONCILE_TOLERANCE, seed=0):
+    """
+    Spot-check locally built stats against the API on a few sampled dates.
+    
+    Args:
+        local_df (pd.DataFrame): Output of build_asof_team_stats
+        games_df (pd.DataFrame): Game data (dates are sampled from it)
+        n_dates (int): Number of dates to fetch from the API
+        tolerance (float): Max relative difference per stat
+        seed (int): Random seed for the date sample
+    
+    Returns:
+        pd.DataFrame: Per-stat comparison (see compare_team_stats)
+    """
+    date_season_pairs = games_df[['GAME_DATE', 'SEASON']].drop_duplicates()
+    sample = date_season_pairs.sample(min(n_dates, len(date_season_pairs)), random_state=seed)
+    
+    api_frames = []
+    for _, row in sample.sort_values('GAME_DATE').iterrows():
+        date_str = row['GAME_DATE'].strftime('%Y-%m-%d')
+        print(f"  Fetching {row['SEASON']} {date_str} from API ...", end=" ")
+        adv_df, adv_error = fetch_stats_for_date(row['SEASON'], date_str, stat_type='Advanced')
+        ff_df, ff_error = fetch_stats_for_date(row['SEASON'], date_str, stat_type='Four Factors')
+        merged = merge_advanced_and_four_factors(adv_df, ff_df)
+        if merged.empty:
+            print(f"✗ {adv_error or ff_error}")
+            continue
+        api_frames.append(merged)
+        print(f"✓ {len(merged)} teams")
+    
+    if not api_frames:
+        print("✗ No API data to reconcile against")
+        return pd.DataFrame()
+    
+    report = compare_team_stats(local_df, pd.concat(api_frames, ignore_index=True), tolerance=tolerance)
+    
+    print(f"\n{'Stat':<14} {'Rows':>6} {'Max abs diff':>13} {'Max rel diff':>13}")
+    for _, r in report.iterrows():
+        flag = '✓' if r['OK'] else '✗'
+        print(f"{r['STAT']:<14} {r['ROWS']:>6} {r['MAX_ABS_DIFF']:>13.4f} {r['MAX_REL_DIFF']:>13.4f}  {flag}")
+    print(f"\n{report['OK'].sum()}/{len(report)} stats within {tolerance:.0%}")
+    
+    return report
 
 
 # ============================================================
 # MAIN
 # ============================================================
 
-def main():
-    """Main execution workflow."""
+def main(offline=False, use_cache=True, dry_run=False):
+    """
+    Main execution workflow.
+    
+    Args:
+        offline (bool): Serve API responses only from the cache
+        use_cache (bool): Cache API responses on disk
+        dry_run (bool): Print the collection plan and exit without any requests
+    """
     start_time = datetime.now()
     
     print("\n" + "="*70)
@@ -270,48 +375,95 @@ def main():
     # Load game data
     print("\n[STEP 1] Loading game data...")
     
-    if not os.path.exists(INPUT_FILE):
+    if not dataset_exists(INPUT_FILE):
         print(f"✗ Error: Input file not found!")
         print(f"  Expected: {INPUT_FILE}")
         print(f"\n  Run collect_nba_games_improved.py first!")
         return
     
-    games_df = pd.read_csv(INPUT_FILE, parse_dates=['GAME_DATE'])
+    # Only the seasons in SEASONS_FILTER are read from disk
+    games_df = load_typed(INPUT_FILE, seasons=SEASONS_FILTER)
     print(f"✓ Loaded {len(games_df):,} games")
-    
-    # Filter seasons if specified
     if SEASONS_FILTER:
-        print(f"\nFiltering to seasons: {', '.join(SEASONS_FILTER)}")
-        games_df = games_df[games_df['SEASON'].isin(SEASONS_FILTER)]
-        print(f"✓ Filtered to {len(games_df):,} games")
+        print(f"  Filtered to seasons: {', '.join(SEASONS_FILTER)}")
     
     seasons = sorted(games_df['SEASON'].unique())
     print(f"Seasons: {', '.join(seasons)}")
     print(f"Date range: {games_df['GAME_DATE'].min().date()} to {games_df['GAME_DATE'].max().date()}")
     
-    # Collect stats
-    print("\n[STEP 2] Collecting team statistics...")
-    print("Will collect for each date:")
-    print("  - Advanced Stats (OFF_RATING, DEF_RATING, NET_RATING, PACE, etc.)")
-    print("  - Four Factors (EFG_PCT, TOV_PCT, OREB_PCT, FTA_RATE, etc.)")
+    # Dates already in the output are not requested again (API source)
+    output_path = os.path.join(OUTPUT_DIR, OUTPUT_FILE)
+    stored = None
+    if STATS_SOURCE != 'local' and dataset_exists(output_path):
+        stored = load_typed(output_path)
+        print(f"✓ Stored stats: {len(stored):,} rows (their dates are skipped)")
+    
+    if dry_run:
+        print("\n[DRY RUN] Collection plan:")
+        if STATS_SOURCE == 'local':
+            print("  STATS_SOURCE = 'local': stats are built from box scores, 0 API requests")
+            if RECONCILE_SAMPLE_DATES:
+                print(f"  Reconciliation: {2 * RECONCILE_SAMPLE_DATES} requests")
+            return
+        journal = CollectionJournal(os.path.join(OUTPUT_DIR, JOURNAL_DIR))
+        plan = plan_collection(games_df, journaled=journal.completed_keys(), stored=stored)
+        plan.print_summary(rate=1.0 / RATE_LIMIT_DELAY, max_workers=MAX_WORKERS)
+        return
+    
+    if STATS_BASE_URL:
+        set_stats_base_url(STATS_BASE_URL)
     
-    stats_df, failed = collect_stats_for_all_dates(games_df)
+    # With the cache, only network calls take a rate-limit token
+    cache = None
+    if use_cache:
+        cache = install_response_cache(limiter=TokenBucket(rate=1.0 / RATE_LIMIT_DELAY), offline=offline)
+    
+    # Collect stats
+    if STATS_SOURCE == 'local':
+        print("\n[STEP 2] Building team statistics from box scores...")
+        stats_df, failed = build_asof_team_stats(games_df), []
+        
+        if RECONCILE_SAMPLE_DATES:
+            print(f"\nReconciling against the API on {RECONCILE_SAMPLE_DATES} sampled dates...")
+            reconcile_local_stats(stats_df, games_df)
+    else:
+        print("\n[STEP 2] Collecting team statistics...")
+        print("Will collect for each date:")
+        print("  - Advanced Stats (OFF_RATING, DEF_RATING, NET_RATING, PACE, etc.)")
+        print("  - Four Factors (EFG_PCT, TOV_PCT, OREB_PCT, FTA_RATE, etc.)")
+        
+        stats_df, failed = collect_stats_for_all_dates(games_df, rate_limited=cache is None, stored=stored)
+        if cache is not None:
+            print(f"\n✓ Response {cache.summary()}")
+        if stored is not None:
+            if stats_df.empty and not failed:
+                print("\n✓ Stored stats already cover every game date")
+                return
+            if not stats_df.empty:
+                stats_df['GAME_DATE'] = pd.to_datetime(stats_df['GAME_DATE'])
+            stats_df = combine_with_stored(stored, stats_df)
     
     if stats_df.empty:
         print("\n✗ No data collected!")
         return
     
+    # API rows carry dates as 'YYYY-MM-DD' strings; store them typed
+    # (concatenated frames lose their categories, so the schema is reapplied)
+    stats_df = apply_schema(stats_df)
+    
     # Save final output
     print("\n[STEP 3] Saving final output...")
     os.makedirs(OUTPUT_DIR, exist_ok=True)
-    output_path = os.path.join(OUTPUT_DIR, OUTPUT_FILE)
-    stats_df.to_csv(output_path, index=False)
+    save_dataset(stats_df, output_path, export_csv=EXPORT_CSV)
     
-    # Remove checkpoint file
-    checkpoint_path = os.path.join(OUTPUT_DIR, CHECKPOINT_FILE)
-    if os.path.exists(checkpoint_path):
-        os.remove(checkpoint_path)
-        print("✓ Removed checkpoint file")
+    # Remove checkpoint journal (kept when dates failed, so a rerun fetches only those)
+    journal_path = os.path.join(OUTPUT_DIR, JOURNAL_DIR)
+    if os.path.isdir(journal_path):
+        if failed:
+            print(f"✓ Kept checkpoint journal for {len(failed)} failed dates: {journal_path}")
+        else:
+            CollectionJournal(journal_path).clear()
+            print("✓ Removed checkpoint journal")
     
     # Summary
     print("\n" + "="*70)
@@ -372,4 +524,10 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Collect team stats for every game date.")
+    parser.add_argument('--offline', action='store_true', help="Serve API responses only from the cache")
+    parser.add_argument('--no-cache', action='store_true', help="Don't read or write the response cache")
+    parser.add_argument('--dry-run', action='store_true', help="Print the collection plan without making requests")
+    args = parser.parse_args()
+    
+    main(offline=args.offline, use_cache=not args.no_cache, dry_run=args.dry_run)
\ No newline at end of file
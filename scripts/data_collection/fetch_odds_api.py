@@ -0,0 +1,529 @@
+"""
+Betting Odds Collection (The Odds API)
+======================================
+
+Collects moneyline, spread and total snapshots for NBA games and keeps
+their line history, so model_evaluation_functions (calculate_ev,
+kelly_criterion, should_bet) have market odds to work with.
+
+- One pooled keep-alive HTTP session: polling every few minutes reuses
+  the same connections instead of opening one per request
+- Batched requests: every upcoming game and all three markets come back
+  in one request per group of up to BOOKMAKERS_PER_REQUEST books
+- Compact history: one row per (game, bookmaker, line change), typed
+  columns (int16 prices, float32 points), partitioned by season.
+  Snapshots whose lines haven't moved since the stored row are dropped
+  before writing
+- Rows are joined to GAME_ID on (GAME_DATE, HOME_TEAM_ID, AWAY_TEAM_ID);
+  games not collected yet are joined later by join_odds_to_games
+
+INPUT:  data/raw/nba/nba_games_all_seasons_RAW.csv (for GAME_ID, optional)
+OUTPUT: data/raw/nba/nba_odds_history.csv (+ .parquet dataset)
+
+USAGE:
+    # One snapshot of upcoming games
+    python scripts/data_collection/fetch_odds_api.py
+
+    # Poll every 5 minutes on a game day
+    python scripts/data_collection/fetch_odds_api.py --poll 5 --polls 96
+
+    # Backfill from the historical endpoint (one snapshot per interval)
+    python scripts/data_collection/fetch_odds_api.py --historical 2024-10-22 2024-11-05
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scripts.data_collection.fetcher import TokenBucket, fetch_concurrently
+from scripts.data_collection.helpers import get_team_registry
+from scripts.data_collection.storage import append_dataset, dataset_exists, load_dataset
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+BASE_URL = 'https://api.the-odds-api.com'
+SPORT = 'basketball_nba'
+API_KEY = os.environ.get('ODDS_API_KEY')
+REGIONS = 'us'
+MARKETS = ('h2h', 'spreads', 'totals')
+BOOKMAKERS = None              # e.g., ['draftkings', 'fanduel']; None = every book in REGIONS
+BOOKMAKERS_PER_REQUEST = 10    # the API bills per region/market, so group books into as few requests as allowed
+
+GAMES_FILE = 'data/raw/nba/nba_games_all_seasons_RAW.csv'
+OUTPUT_FILE = 'data/raw/nba/nba_odds_history.csv'
+EXPORT_CSV = False             # the line history is append-heavy; keep it Parquet-only
+
+RATE_LIMIT_DELAY = 1.0         # seconds between requests (global ceiling)
+MAX_WORKERS = 4                # pooled connections / historical snapshots in flight
+MAX_RETRIES = 3
+TIMEOUT = 30
+POLL_MINUTES = 5
+HISTORICAL_INTERVAL_MINUTES = 60
+
+LINE_COLS = ['HOME_ML', 'AWAY_ML', 'HOME_SPREAD', 'HOME_SPREAD_PRICE', 'AWAY_SPREAD_PRICE',
+             'TOTAL', 'OVER_PRICE', 'UNDER_PRICE']
+ODDS_DTYPES = {
+    'EVENT_ID': 'string', 'BOOKMAKER': 'string', 'GAME_ID': 'string', 'SEASON': 'string',
+    'HOME_TEAM_ID': 'Int64', 'AWAY_TEAM_ID': 'Int64',
+    'HOME_ML': 'Int16', 'AWAY_ML': 'Int16', 'HOME_SPREAD': 'float32',
+    'HOME_SPREAD_PRICE': 'Int16', 'AWAY_SPREAD_PRICE': 'Int16',
+    'TOTAL': 'float32', 'OVER_PRICE': 'Int16', 'UNDER_PRICE': 'Int16',
+}
+ODDS_COLUMNS = ['SEASON', 'GAME_DATE', 'GAME_ID', 'EVENT_ID', 'COMMENCE_TIME', 'HOME_TEAM_ID',
+                'AWAY_TEAM_ID', 'BOOKMAKER', 'SNAPSHOT_TIME'] + LINE_COLS
+KEY_COLS = ['EVENT_ID', 'BOOKMAKER']
+
+# ============================================================
+# HTTP CLIENT
+# ============================================================
+
+class OddsClient:
+    """
+    The Odds API client over one pooled keep-alive session
+
+    Args:
+        api_key (str): API key (default: ODDS_API_KEY environment variable)
+        base_url (str): API host (e.g. a local StubOddsServer)
+        max_workers (int): Connections kept in the pool
+        timeout (float): Seconds per request
+
+    Example:
+        >>> with OddsClient() as client:
+        ...     events, fetched_at = client.get_odds(bookmakers=['draftkings', 'fanduel'])
+    """
+
+    def __init__(self, api_key=None, base_url=BASE_URL, max_workers=MAX_WORKERS, timeout=TIMEOUT):
+        self.api_key = api_key or API_KEY
+        if not self.api_key:
+            raise ValueError("No API key: set ODDS_API_KEY or pass api_key")
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.requests_remaining = None
+        self.session = requests.Session()
+        # Retries are handled by fetch_concurrently, so the adapter never retries
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Accept': 'application/json', 'Accept-Encoding': 'gzip'})
+
+    def _get(self, path, **params):
+        params = {'apiKey': self.api_key, 'regions': REGIONS, 'markets': ','.join(MARKETS),
+                  'oddsFormat': 'american', 'dateFormat': 'iso', **params}
+        response = self.session.get(f'{self.base_url}{path}',
+                                    params={k: v for k, v in params.items() if v is not None},
+                                    timeout=self.timeout)
+        response.raise_for_status()
+        remaining = response.headers.get('x-requests-remaining')
+        if remaining is not None:
+            self.requests_remaining = int(float(remaining))
+        return response.json()
+
+    def get_odds(self, bookmakers=None):
+        """
+        Current odds for every upcoming game (one request per bookmaker batch)
+
+        Args:
+            bookmakers (list): Bookmaker keys, or None for every book in REGIONS
+
+        Returns:
+            tuple: (list of event dicts, fetch time as a UTC Timestamp)
+        """
+        fetched_at = pd.Timestamp.now(tz='UTC')
+        events = {}
+        for batch in bookmaker_batches(bookmakers):
+            for event in self._get(f'/v4/sports/{SPORT}/odds', bookmakers=batch):
+                if event['id'] in events:
+                    events[event['id']]['bookmakers'].extend(event['bookmakers'])
+                else:
+                    events[event['id']] = event
+        return list(events.values()), fetched_at
+
+    def get_historical_odds(self, timestamp, bookmakers=None):
+        """
+        Odds snapshot as of a past time (one request per bookmaker batch)
+
+        Args:
+            timestamp (pd.Timestamp): Snapshot time (UTC)
+            bookmakers (list): Bookmaker keys, or None for every book in REGIONS
+
+        Returns:
+            tuple: (list of event dicts, snapshot time as a UTC Timestamp)
+        """
+        events = {}
+        snapshot = _utc(timestamp)
+        for batch in bookmaker_batches(bookmakers):
+            body = self._get(f'/v4/historical/sports/{SPORT}/odds', date=_iso(timestamp), bookmakers=batch)
+            snapshot = pd.Timestamp(body['timestamp'])
+            for event in body['data']:
+                if event['id'] in events:
+                    events[event['id']]['bookmakers'].extend(event['bookmakers'])
+                else:
+                    events[event['id']] = event
+        return list(events.values()), snapshot
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _utc(ts):
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+
+
+def _iso(ts):
+    return _utc(ts).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def bookmaker_batches(bookmakers, size=BOOKMAKERS_PER_REQUEST):
+    """Comma-joined groups of bookmaker keys ([None] = no filter)."""
+    if not bookmakers:
+        return [None]
+    bookmakers = list(bookmakers)
+    return [','.join(bookmakers[i:i + size]) for i in range(0, len(bookmakers), size)]
+
+# ============================================================
+# PARSING
+# ============================================================
+
+def _outcome(market, name):
+    for outcome in market['outcomes']:
+        if outcome['name'] == name:
+            return outcome.get('price'), outcome.get('point')
+    return None, None
+
+
+def events_to_frame(events, snapshot_time):
+    """
+    Flatten Odds API events into one typed row per (event, bookmaker)
+
+    Args:
+        events (list): Event dicts from OddsClient.get_odds / get_historical_odds
+        snapshot_time (pd.Timestamp): When the snapshot was taken; used when a
+            bookmaker has no last_update
+
+    Returns:
+        pd.DataFrame: ODDS_COLUMNS with ODDS_DTYPES (GAME_ID empty until joined)
+
+    Example:
+        >>> events, fetched_at = client.get_odds()
+        >>> snapshot = events_to_frame(events, fetched_at)
+    """
+    registry = get_team_registry()
+    rows = []
+    for event in events:
+        home, away = event['home_team'], event['away_team']
+        for book in event.get('bookmakers', []):
+            markets = {m['key']: m for m in book.get('markets', [])}
+            row = {'EVENT_ID': event['id'], 'COMMENCE_TIME': event['commence_time'],
+                   'HOME_TEAM': home, 'AWAY_TEAM': away, 'BOOKMAKER': book['key'],
+                   'SNAPSHOT_TIME': book.get('last_update') or snapshot_time}
+            if 'h2h' in markets:
+                row['HOME_ML'] = _outcome(markets['h2h'], home)[0]
+                row['AWAY_ML'] = _outcome(markets['h2h'], away)[0]
+            if 'spreads' in markets:
+                row['HOME_SPREAD_PRICE'], row['HOME_SPREAD'] = _outcome(markets['spreads'], home)
+                row['AWAY_SPREAD_PRICE'] = _outcome(markets['spreads'], away)[0]
+            if 'totals' in markets:
+                row['OVER_PRICE'], row['TOTAL'] = _outcome(markets['totals'], 'Over')
+                row['UNDER_PRICE'] = _outcome(markets['totals'], 'Under')[0]
+            rows.append(row)
+
+    df = pd.DataFrame(rows, columns=['EVENT_ID', 'COMMENCE_TIME', 'HOME_TEAM', 'AWAY_TEAM', 'BOOKMAKER',
+                                     'SNAPSHOT_TIME'] + LINE_COLS)
+    df['COMMENCE_TIME'] = pd.to_datetime(df['COMMENCE_TIME'], utc=True)
+    df['SNAPSHOT_TIME'] = pd.to_datetime(df['SNAPSHOT_TIME'], utc=True)
+    # NBA game dates are Eastern; a 10:30pm ET tip is already the next day in UTC
+    df['GAME_DATE'] = df['COMMENCE_TIME'].dt.tz_convert('America/New_York').dt.tz_localize(None).dt.normalize()
+    start_year = df['GAME_DATE'].dt.year - (df['GAME_DATE'].dt.month < 8)
+    df['SEASON'] = start_year.astype(str) + '-' + (start_year + 1).astype(str).str[-2:]
+    for side in ['HOME', 'AWAY']:
+        df[f'{side}_TEAM_ID'] = [(registry.lookup(name) or {}).get('id') for name in df[f'{side}_TEAM']]
+    df['GAME_ID'] = None
+    return df[ODDS_COLUMNS].astype(ODDS_DTYPES)
+
+# ============================================================
+# LINE HISTORY
+# ============================================================
+
+def join_odds_to_games(odds_df, games_df):
+    """
+    Fill GAME_ID from matchup-format games on (GAME_DATE, HOME_TEAM_ID, AWAY_TEAM_ID)
+
+    Args:
+        odds_df (pd.DataFrame): Odds rows (events_to_frame / load_odds_history)
+        games_df (pd.DataFrame): Games with GAME_ID, GAME_DATE, HOME/AWAY_TEAM_ID
+
+    Returns:
+        pd.DataFrame: odds_df with GAME_ID set where a game matches
+    """
+    key = ['GAME_DATE', 'HOME_TEAM_ID', 'AWAY_TEAM_ID']
+    games = games_df[['GAME_ID'] + key].assign(
+        GAME_DATE=pd.to_datetime(games_df['GAME_DATE']).dt.normalize(),
+        HOME_TEAM_ID=games_df['HOME_TEAM_ID'].astype('Int64'),
+        AWAY_TEAM_ID=games_df['AWAY_TEAM_ID'].astype('Int64'),
+        GAME_ID=games_df['GAME_ID'].astype('string'),
+    ).drop_duplicates(key)
+    joined = odds_df.drop(columns='GAME_ID').merge(games, on=key, how='left')
+    joined['GAME_ID'] = joined['GAME_ID'].fillna(odds_df['GAME_ID'].reset_index(drop=True))
+    return joined[odds_df.columns]
+
+
+def changed_lines(snapshot_df, last_lines):
+    """
+    Drop snapshot rows whose lines equal the last stored row for (event, bookmaker)
+
+    Args:
+        snapshot_df (pd.DataFrame): New rows (events_to_frame)
+        last_lines (pd.DataFrame): Latest stored row per key (indexed by KEY_COLS)
+
+    Returns:
+        pd.DataFrame: Rows for new keys or moved lines
+    """
+    if snapshot_df.empty or last_lines is None or last_lines.empty:
+        return snapshot_df.drop_duplicates(KEY_COLS + LINE_COLS)
+    snapshot_df = snapshot_df.drop_duplicates(KEY_COLS + LINE_COLS)
+    previous = last_lines.reindex(pd.MultiIndex.from_frame(snapshot_df[KEY_COLS]))[LINE_COLS]
+    current = snapshot_df[LINE_COLS].set_axis(previous.index)
+    same = ((current == previous) | (current.isna() & previous.isna())).fillna(False).all(axis=1)
+    return snapshot_df[~same.to_numpy()]
+
+
+class OddsHistory:
+    """
+    Append-only line history (one row per game, bookmaker and line change)
+
+    Keeps the latest line per (event, bookmaker) in memory so each poll
+    only writes the rows that moved.
+
+    Args:
+        path (str): Dataset path (OUTPUT_FILE)
+        games_df (pd.DataFrame): Games to join GAME_ID from (optional)
+
+    Example:
+        >>> history = OddsHistory(OUTPUT_FILE, games_df=games)
+        >>> history.record(events_to_frame(events, fetched_at))
+        12
+    """
+
+    def __init__(self, path=OUTPUT_FILE, games_df=None):
+        self.path = path
+        self.games_df = games_df
+        self.last_lines = None
+        if dataset_exists(path):
+            stored = load_odds_history(path, columns=KEY_COLS + ['SNAPSHOT_TIME'] + LINE_COLS)
+            self._remember(stored.astype({col: 'string' for col in KEY_COLS}))
+
+    def _remember(self, rows):
+        if rows.empty:
+            return
+        latest = rows.sort_values('SNAPSHOT_TIME', kind='stable').groupby(KEY_COLS, sort=False).tail(1)
+        latest = latest.set_index(KEY_COLS)[LINE_COLS]
+        if self.last_lines is None:
+            self.last_lines = latest
+        else:
+            self.last_lines = pd.concat([self.last_lines[~self.last_lines.index.isin(latest.index)], latest])
+
+    def record(self, snapshot_df, verbose=False):
+        """
+        Append the rows of a snapshot whose lines changed
+
+        Args:
+            snapshot_df (pd.DataFrame): Output of events_to_frame
+            verbose (bool): Print what was written
+
+        Returns:
+            int: Rows written
+        """
+        rows = changed_lines(snapshot_df, self.last_lines)
+        if rows.empty:
+            return 0
+        if self.games_df is not None:
+            rows = join_odds_to_games(rows, self.games_df)
+        append_dataset(rows, self.path, date_col='SNAPSHOT_TIME', export_csv=EXPORT_CSV, verbose=verbose)
+        self._remember(rows)
+        return len(rows)
+
+
+def load_odds_history(path=OUTPUT_FILE, columns=None, seasons=None, games_df=None):
+    """
+    Load the line history with compact dtypes
+
+    Args:
+        path (str): Dataset path
+        columns (list): Columns to read (None = all)
+        seasons (list): Seasons to read (None = all)
+        games_df (pd.DataFrame): Games to fill missing GAME_IDs from (optional)
+
+    Returns:
+        pd.DataFrame: Line history; EVENT_ID and BOOKMAKER as categories
+    """
+    df = load_dataset(path, columns=columns, seasons=seasons)
+    df = df.astype({c: t for c, t in ODDS_DTYPES.items() if c in df.columns})
+    for col in ['COMMENCE_TIME', 'SNAPSHOT_TIME']:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], utc=True)
+    if games_df is not None and 'GAME_ID' in df.columns:
+        df = join_odds_to_games(df, games_df)
+    # Few distinct values repeated on every line change
+    for col in ['EVENT_ID', 'BOOKMAKER']:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def closing_lines(odds_df):
+    """
+    Last line each bookmaker posted before tip-off
+
+    Args:
+        odds_df (pd.DataFrame): Line history (load_odds_history)
+
+    Returns:
+        pd.DataFrame: One row per (GAME_ID/EVENT_ID, BOOKMAKER)
+
+    Example:
+        >>> closing = closing_lines(load_odds_history())
+        >>> should_bet(model_prob, closing.loc[0, 'HOME_ML'])
+    """
+    pregame = odds_df[odds_df['SNAPSHOT_TIME'] <= odds_df['COMMENCE_TIME']]
+    return (pregame.sort_values('SNAPSHOT_TIME', kind='stable')
+            .groupby(KEY_COLS, sort=False, observed=True).tail(1)
+            .sort_values(['COMMENCE_TIME', 'EVENT_ID', 'BOOKMAKER'])
+            .reset_index(drop=True))
+
+# ============================================================
+# COLLECTION
+# ============================================================
+
+def poll_odds(client, history, n_polls=1, interval_minutes=POLL_MINUTES, bookmakers=BOOKMAKERS,
+              sleep=time.sleep):
+    """
+    Snapshot upcoming games n_polls times, recording line changes
+
+    Args:
+        client (OddsClient): Pooled client
+        history (OddsHistory): Line history to append to
+        n_polls (int): Number of snapshots
+        interval_minutes (float): Minutes between snapshots
+        bookmakers (list): Bookmaker keys (None = all in REGIONS)
+        sleep (callable): Sleep function (tests step a fake clock instead)
+
+    Returns:
+        list: (events, rows written) per poll
+    """
+    results = []
+    for i in range(n_polls):
+        if i > 0:
+            sleep(interval_minutes * 60)
+        try:
+            events, fetched_at = client.get_odds(bookmakers)
+        except requests.RequestException as e:
+            print(f"  ⚠️  Poll {i + 1}/{n_polls} failed: {e}")
+            results.append((0, 0))
+            continue
+        written = history.record(events_to_frame(events, fetched_at))
+        results.append((len(events), written))
+        print(f"  ✓ Poll {i + 1}/{n_polls}: {len(events)} games, {written} line changes"
+              + (f" ({client.requests_remaining} requests left)" if client.requests_remaining is not None else ""))
+    return results
+
+
+def backfill_historical(client, history, start, end, interval_minutes=HISTORICAL_INTERVAL_MINUTES,
+                        bookmakers=BOOKMAKERS, limiter=None):
+    """
+    Record historical snapshots between start and end
+
+    Snapshots are fetched concurrently over the client's pooled session
+    and recorded in time order, so the history only stores line changes.
+
+    Args:
+        client (OddsClient): Pooled client
+        history (OddsHistory): Line history to append to
+        start, end (str | pd.Timestamp): UTC range (inclusive)
+        interval_minutes (float): Minutes between snapshots
+        bookmakers (list): Bookmaker keys (None = all in REGIONS)
+        limiter (TokenBucket): Shared rate limiter (None = unlimited)
+
+    Returns:
+        tuple: (rows written, failed timestamps)
+    """
+    timestamps = pd.date_range(_utc(start), _utc(end), freq=f'{interval_minutes}min')
+    tasks = [(ts,) for ts in timestamps]
+    snapshots, failed = {}, []
+    written = 0
+    next_i = 0
+    for (ts,), result, error in fetch_concurrently(
+            tasks, lambda ts: client.get_historical_odds(ts, bookmakers), limiter,
+            max_workers=MAX_WORKERS, max_retries=MAX_RETRIES):
+        if error is not None:
+            failed.append(ts)
+            snapshots[ts] = None
+        else:
+            snapshots[ts] = events_to_frame(*result)
+        # Record in time order as soon as the earliest outstanding snapshot arrives
+        while next_i < len(timestamps) and timestamps[next_i] in snapshots:
+            frame = snapshots.pop(timestamps[next_i])
+            if frame is not None:
+                written += history.record(frame)
+            next_i += 1
+    return written, failed
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def main(poll_minutes=None, n_polls=1, historical=None, base_url=BASE_URL):
+    print("\n" + "=" * 70)
+    print("NBA ODDS COLLECTION")
+    print("=" * 70)
+
+    games_df = load_dataset(GAMES_FILE) if dataset_exists(GAMES_FILE) else None
+    if games_df is None:
+        print(f"  ⚠️  {GAMES_FILE} not found; GAME_ID is joined on a later run")
+    history = OddsHistory(OUTPUT_FILE, games_df=games_df)
+
+    with OddsClient(base_url=base_url) as client:
+        if historical:
+            start, end = historical
+            print(f"\nBackfilling {start} to {end} (every {HISTORICAL_INTERVAL_MINUTES} minutes)...")
+            written, failed = backfill_historical(client, history, start, end,
+                                                  limiter=TokenBucket(rate=1.0 / RATE_LIMIT_DELAY))
+            print(f"  ✓ {written:,} line changes recorded")
+            if failed:
+                print(f"  ⚠️  {len(failed)} snapshots failed: {[str(ts) for ts in failed[:5]]}")
+        else:
+            print(f"\nPolling {n_polls} time(s)" + (f" every {poll_minutes} minutes" if n_polls > 1 else "") + "...")
+            poll_odds(client, history, n_polls=n_polls, interval_minutes=poll_minutes or POLL_MINUTES)
+
+    if dataset_exists(OUTPUT_FILE):
+        odds = load_odds_history(OUTPUT_FILE, columns=['GAME_ID', 'EVENT_ID', 'BOOKMAKER'])
+        print(f"\n✓ Line history: {len(odds):,} rows, {odds['EVENT_ID'].nunique():,} games, "
+              f"{odds['BOOKMAKER'].nunique()} bookmakers ({odds['GAME_ID'].notna().mean():.0%} joined to GAME_ID)")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collect NBA betting lines from The Odds API.")
+    parser.add_argument('--poll', type=float, default=None, metavar='MINUTES',
+                        help="Minutes between snapshots when polling")
+    parser.add_argument('--polls', type=int, default=1, help="Number of snapshots to take")
+    parser.add_argument('--historical', nargs=2, metavar=('START', 'END'),
+                        help="Backfill historical snapshots between two UTC dates")
+    parser.add_argument('--base-url', default=BASE_URL, help="API host (e.g. a local stub server)")
+    args = parser.parse_args()
+    main(poll_minutes=args.poll, n_polls=args.polls, historical=args.historical, base_url=args.base_url)
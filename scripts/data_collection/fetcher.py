@@ -0,0 +1,120 @@
+"""
+Concurrent Rate-Limited Fetching
+================================
+
+A shared token-bucket limiter plus a bounded thread pool for API
+collection. Independent requests run in parallel while the bucket keeps
+the global request rate under a ceiling, so wall time approaches
+n_requests / rate instead of n_requests * (delay + latency).
+
+Failures back off with jitter inside the affected request only; other
+workers keep drawing tokens. Retries draw a fresh token, so they count
+against the same ceiling.
+
+USAGE:
+    from scripts.data_collection.fetcher import TokenBucket, fetch_concurrently
+
+    limiter = TokenBucket(rate=1.0)
+    for task, result, error in fetch_concurrently(tasks, fetch_fn, limiter, max_workers=4):
+        ...
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# ============================================================
+# RATE LIMITER
+# ============================================================
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    Args:
+        rate (float): Tokens added per second (the request rate ceiling)
+        capacity (int): Max tokens held; 1 means no bursts above the rate
+
+    Example:
+        >>> limiter = TokenBucket(rate=2.0)
+        >>> limiter.acquire()  # blocks until a token is available
+    """
+
+    def __init__(self, rate, capacity=1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until it is available. Returns seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Reserve the token now (may go negative) so waiters queue in order
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+# ============================================================
+# CONCURRENT FETCH
+# ============================================================
+
+def _fetch_with_retries(task, fetch_fn, limiter, max_retries, backoff, no_retry):
+    error = None
+    for attempt in range(max_retries):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return fetch_fn(*task), None
+        except no_retry as e:
+            return None, str(e) or type(e).__name__
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            if attempt < max_retries - 1:
+                # Exponential backoff with jitter, only for this request
+                time.sleep(backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+    return None, error
+
+def fetch_concurrently(tasks, fetch_fn, limiter, max_workers=4, max_retries=3, backoff=1.0,
+                       no_retry=()):
+    """
+    Run fetch_fn over tasks in a bounded pool under a shared rate limit
+
+    Args:
+        tasks (list): Argument tuples, one per request (e.g. (season, date, measure))
+        fetch_fn (callable): Called as fetch_fn(*task); raises on failure
+        limiter (TokenBucket): Shared limiter (one token per attempt); None when
+            the limit is applied further down (e.g. by the response cache)
+        max_workers (int): Max requests in flight
+        max_retries (int): Attempts per request
+        backoff (float): Base backoff in seconds (doubles per attempt, ±50% jitter)
+        no_retry (tuple): Exception types that fail the request immediately
+
+    Yields:
+        tuple: (task, result, error) in completion order; result is None
+               and error is the last error message if every attempt failed
+
+    Example:
+        >>> tasks = [('2024-25', '2024-11-01', 'Advanced'), ('2024-25', '2024-11-01', 'Four Factors')]
+        >>> for task, df, error in fetch_concurrently(tasks, request_team_stats, TokenBucket(1.0)):
+        ...     print(task, error or len(df))
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(_fetch_with_retries, task, fetch_fn, limiter, max_retries, backoff, no_retry): task
+            for task in tasks
+        }
+        for future in as_completed(futures):
+            # Drop the pool's reference so a consumed result can be freed
+            task = futures.pop(future)
+            result, error = future.result()
+            del future
+            yield task, result, error
@@ -7,12 +7,124 @@ Import these functions in your scripts for consistent data handling.
 
 USAGE:
     from scripts.data_collection.helpers import get_all_team_ids, get_team_id
+    from scripts.data_collection.helpers import get_team_registry
 """
 
 from nba_api.stats.static import teams
+import numpy as np
 import pandas as pd
 import time
 
+# ============================================================
+# TEAM REGISTRY
+# ============================================================
+
+class TeamRegistry:
+    """
+    Team metadata loaded once, with O(1) lookups and dense integer codes
+    
+    Teams are ordered by id, so code i is the i-th smallest team id and
+    codes are stable across runs. Codes are meant for array indexing
+    (Elo ratings, head-to-head pair codes); unknown ids map to -1.
+    
+    Args:
+        team_list (list): Team dicts like nba_api's teams.get_teams()
+                          (default: loaded from nba_api's static data)
+    
+    Example:
+        >>> registry = get_team_registry()
+        >>> registry.by_abbreviation('LAL')['id']
+        1610612747
+        >>> registry.codes(games['HOME_TEAM_ID'])      # array of 0..29
+        >>> games['HOME_TEAM_ID'].astype(registry.id_dtype)
+    """
+    
+    def __init__(self, team_list=None):
+        team_list = teams.get_teams() if team_list is None else team_list
+        self.teams = sorted(team_list, key=lambda t: t['id'])
+        self.ids = np.array([t['id'] for t in self.teams], dtype=np.int64)
+        self.abbreviations = [t['abbreviation'] for t in self.teams]
+        
+        self._id_index = pd.Index(self.ids)
+        self._by_id = {t['id']: t for t in self.teams}
+        self._by_abbr = {t['abbreviation'].upper(): t for t in self.teams}
+        self._by_nickname = {t['nickname'].lower(): t for t in self.teams}
+        self._by_full_name = {t['full_name'].lower(): t for t in self.teams}
+        
+        self.id_dtype = pd.CategoricalDtype(categories=self.ids)
+        self.abbreviation_dtype = pd.CategoricalDtype(categories=self.abbreviations)
+    
+    def __len__(self):
+        return len(self.teams)
+    
+    def __contains__(self, team_id):
+        return team_id in self._by_id
+    
+    def by_id(self, team_id):
+        """Team dict for an id, or None."""
+        return self._by_id.get(team_id)
+    
+    def by_abbreviation(self, team_abbr):
+        """Team dict for an abbreviation like 'LAL' (case-insensitive), or None."""
+        return self._by_abbr.get(str(team_abbr).upper())
+    
+    def by_nickname(self, nickname):
+        """Team dict for a nickname like 'Lakers' (case-insensitive), or None."""
+        return self._by_nickname.get(str(nickname).lower())
+    
+    def by_full_name(self, full_name):
+        """Team dict for a full name like 'Los Angeles Lakers' (case-insensitive), or None."""
+        return self._by_full_name.get(str(full_name).lower())
+    
+    def lookup(self, key):
+        """
+        Team dict for an id, abbreviation, nickname or full name
+        
+        Args:
+            key (int | str): Any team identifier
+        
+        Returns:
+            dict: Team information or None if not found
+        """
+        if isinstance(key, (int, np.integer)):
+            return self.by_id(int(key))
+        return self.by_abbreviation(key) or self.by_nickname(key) or self.by_full_name(key)
+    
+    def code(self, team_id):
+        """Dense code 0..N-1 for a team id (-1 if unknown)."""
+        team = self._by_id.get(team_id)
+        return -1 if team is None else int(self._id_index.get_loc(team_id))
+    
+    def codes(self, team_ids):
+        """
+        Dense codes for an array or Series of team ids, in one vectorized lookup
+        
+        Args:
+            team_ids (array-like): Team ids
+        
+        Returns:
+            np.ndarray: int64 codes, -1 for unknown ids
+        """
+        return self._id_index.get_indexer(np.asarray(team_ids, dtype=np.int64)).astype(np.int64)
+    
+    def ids_for_codes(self, codes):
+        """Team ids for an array of dense codes."""
+        return self.ids[np.asarray(codes, dtype=np.int64)]
+
+_REGISTRY = None
+
+def get_team_registry():
+    """
+    Shared TeamRegistry, built on first use
+    
+    Returns:
+        TeamRegistry: Registry over nba_api's static team list
+    """
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = TeamRegistry()
+    return _REGISTRY
+
 # ============================================================
 # TEAM HELPERS
 # ============================================================
@@ -29,8 +141,8 @@ def get_all_team_ids():
         >>> print(team_ids['LAL'])
         1610612747
     """
-    all_teams = teams.get_teams()
-    return {team['abbreviation']: team['id'] for team in all_teams}
+    registry = get_team_registry()
+    return dict(zip(registry.abbreviations, registry.ids.tolist()))
 
 def get_team_id(team_abbr):
     """
@@ -47,9 +159,8 @@ def get_team_id(team_abbr):
         >>> print(lakers_id)
         1610612747
     """
-    all_teams = teams.get_teams()
-    team = [t for t in all_teams if t['abbreviation'] == team_abbr]
-    return team[0]['id'] if team else None
+    team = get_team_registry().by_abbreviation(team_abbr)
+    return team['id'] if team else None
 
 def get_team_info(team_abbr):
     """
@@ -66,9 +177,7 @@ def get_team_info(team_abbr):
         >>> print(lakers_info['full_name'])
         'Los Angeles Lakers'
     """
-    all_teams = teams.get_teams()
-    team = [t for t in all_teams if t['abbreviation'] == team_abbr]
-    return team[0] if team else None
+    return get_team_registry().by_abbreviation(team_abbr)
 
 def get_all_teams():
     """
@@ -82,7 +191,7 @@ def get_all_teams():
         >>> print(len(all_teams))
         30
     """
-    return teams.get_teams()
+    return list(get_team_registry().teams)
 
 # ============================================================
 # DATA HELPERS
@@ -178,8 +287,7 @@ def validate_team_abbr(team_abbr):
         >>> validate_team_abbr('XXX')
         False
     """
-    all_team_ids = get_all_team_ids()
-    return team_abbr in all_team_ids
+    return get_team_registry().by_abbreviation(team_abbr) is not None
 
 def count_expected_games(num_seasons=4, games_per_season=1230):
     """
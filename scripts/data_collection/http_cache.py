@@ -0,0 +1,276 @@
+"""
+On-Disk Response Cache for nba_api
+==================================
+
+Caches stats.nba.com responses keyed by endpoint plus normalized
+parameters. Payloads are gzip-compressed JSON files named by the hash
+of the key (content-addressed by request), so any script that goes
+through nba_api (game finder, team stats, test_nba_api.py) shares one
+cache.
+
+- TTL per entry: completed seasons never expire, the current season
+  expires after CURRENT_SEASON_TTL
+- Size-based LRU eviction (entries are touched on every hit)
+- Offline mode: serve only from cache, raise CacheMissError otherwise
+- Optional rate limiter applied to network calls only, so cache hits
+  don't wait for a token
+
+USAGE:
+    from scripts.data_collection.http_cache import install_response_cache
+
+    cache = install_response_cache(offline=args.offline)
+    ...  # nba_api calls as usual
+    print(cache.summary())
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from nba_api.stats.library.http import NBAStatsHTTP
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+CACHE_DIR = 'data/cache/nba_api'
+MAX_CACHE_MB = 2048
+CURRENT_SEASON_TTL = 6 * 60 * 60   # seconds; completed seasons never expire
+SEASON_PARAMS = ('season', 'seasonnullable', 'seasonyear')
+
+
+class CacheMissError(Exception):
+    """Raised in offline mode when a request isn't in the cache."""
+
+# ============================================================
+# KEYS AND TTL
+# ============================================================
+
+def normalize_params(parameters):
+    """
+    Parameters as a sorted list of (name, value) strings
+
+    Empty parameters (None or '') are dropped: the API treats them as
+    unset, and an HTTP query string may omit them entirely.
+    """
+    items = parameters.items() if isinstance(parameters, dict) else parameters
+    return sorted((str(k), str(v)) for k, v in items if v is not None and str(v) != '')
+
+def cache_key(endpoint, parameters):
+    """
+    Hex digest identifying a request
+
+    Args:
+        endpoint (str): Endpoint name (case-insensitive)
+        parameters (dict | list): Request parameters
+
+    Returns:
+        str: sha256 of endpoint + normalized parameters
+    """
+    canonical = json.dumps([endpoint.lower(), normalize_params(parameters)], separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def current_season_start(now=None):
+    """Start year of the season in progress (seasons roll over in August)."""
+    now = now or datetime.now()
+    return now.year if now.month >= 8 else now.year - 1
+
+def season_ttl(parameters, now=None, current_ttl=CURRENT_SEASON_TTL):
+    """
+    TTL for a request: None (never expires) for completed seasons
+
+    Args:
+        parameters (dict | list): Request parameters
+        now (datetime): Reference time (default: now)
+        current_ttl (float): TTL in seconds for the current season or
+            requests without a season parameter
+
+    Returns:
+        float or None: Seconds until expiry, None for no expiry
+
+    Example:
+        >>> season_ttl({'Season': '2020-21'})  # completed season
+        None
+    """
+    for name, value in normalize_params(parameters):
+        if name.lower() in SEASON_PARAMS and value[:4].isdigit():
+            if int(value[:4]) < current_season_start(now):
+                return None
+            break
+    return current_ttl
+
+# ============================================================
+# CACHE
+# ============================================================
+
+class ResponseCache:
+    """
+    Compressed on-disk response cache with TTL and LRU eviction
+
+    Args:
+        cache_dir (str): Directory for cache files
+        max_mb (float): Size limit; least recently used entries are evicted beyond it
+        current_ttl (float): TTL in seconds for current-season entries
+        offline (bool): Serve only from cache, including expired entries
+            (raise CacheMissError on miss)
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_mb=MAX_CACHE_MB,
+                 current_ttl=CURRENT_SEASON_TTL, offline=False):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_mb * 1024 ** 2)
+        self.current_ttl = current_ttl
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = sum(os.path.getsize(p) for p in self._entry_paths())
+
+    def _entry_paths(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for f in files:
+                if f.endswith('.json.gz'):
+                    yield os.path.join(root, f)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f'{key}.json.gz')
+
+    def get(self, endpoint, parameters):
+        """
+        Cached response text, or None if missing or expired
+
+        Args:
+            endpoint (str): Endpoint name
+            parameters (dict | list): Request parameters
+
+        Returns:
+            str or None: Response body
+        """
+        path = self._path(cache_key(endpoint, parameters))
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+
+        # Offline mode serves stale entries rather than nothing
+        if entry['expires'] is not None and entry['expires'] < time.time() and not self.offline:
+            return None
+
+        # LRU: mark as recently used (a concurrent eviction may have removed it since the read)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry['response']
+
+    def put(self, endpoint, parameters, response, ttl=None):
+        """
+        Store a response body
+
+        Args:
+            endpoint (str): Endpoint name
+            parameters (dict | list): Request parameters
+            response (str): Response body
+            ttl (float): Seconds until expiry (None = never)
+        """
+        path = self._path(cache_key(endpoint, parameters))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            'endpoint': endpoint,
+            'parameters': normalize_params(parameters),
+            'created': time.time(),
+            'expires': None if ttl is None else time.time() + ttl,
+            'response': response,
+        }
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f)
+
+        with self._lock:
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            self._size += os.path.getsize(path) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Delete least recently used entries until under the size limit."""
+        entries = sorted(((os.path.getmtime(p), os.path.getsize(p), p) for p in self._entry_paths()))
+        for _, size, path in entries:
+            if self._size <= self.max_bytes:
+                break
+            os.remove(path)
+            self._size -= size
+            self.evictions += 1
+
+    @property
+    def size_mb(self):
+        return self._size / 1024 ** 2
+
+    def summary(self):
+        total = self.hits + self.misses
+        hit_rate = self.hits / total if total else 0.0
+        return (f"cache: {self.hits:,} hits, {self.misses:,} network calls "
+                f"({hit_rate:.0%} hit rate), {self.size_mb:.1f} MB, {self.evictions} evicted")
+
+# ============================================================
+# NBA_API HOOK
+# ============================================================
+
+_original_send_api_request = NBAStatsHTTP.send_api_request
+
+def install_response_cache(cache=None, limiter=None, **cache_kwargs):
+    """
+    Route every nba_api stats request through a ResponseCache
+
+    Only successful JSON responses are stored. Cache hits return
+    immediately; misses go to the network, taking a token from
+    limiter first when one is given.
+
+    Args:
+        cache (ResponseCache): Cache to use (default: ResponseCache(**cache_kwargs))
+        limiter (TokenBucket): Optional rate limiter for network calls
+        **cache_kwargs: Passed to ResponseCache (cache_dir, max_mb, offline, ...)
+
+    Returns:
+        ResponseCache: The installed cache
+
+    Example:
+        >>> cache = install_response_cache(offline=True)
+    """
+    cache = cache or ResponseCache(**cache_kwargs)
+
+    def send_api_request(self, endpoint, parameters, *args, **kwargs):
+        text = cache.get(endpoint, parameters)
+        if text is not None:
+            with cache._lock:
+                cache.hits += 1
+            return self.nba_response(response=text, status_code=200, url=None)
+
+        if cache.offline:
+            raise CacheMissError(f"Offline mode: {endpoint} {normalize_params(parameters)} not cached")
+
+        with cache._lock:
+            cache.misses += 1
+        if limiter is not None:
+            limiter.acquire()
+        response = _original_send_api_request(self, endpoint, parameters, *args, **kwargs)
+
+        if response._status_code == 200 and response.valid_json():
+            cache.put(endpoint, parameters, response.get_response(),
+                      ttl=season_ttl(parameters, current_ttl=cache.current_ttl))
+        return response
+
+    NBAStatsHTTP.send_api_request = send_api_request
+    return cache
+
+def uninstall_response_cache():
+    """Restore nba_api's uncached request method."""
+    NBAStatsHTTP.send_api_request = _original_send_api_request
@@ -0,0 +1,165 @@
+"""
+Append-Only Collection Journal
+==============================
+
+Checkpointing for long API backfills. Each completed request is written
+once as its own small segment file, then recorded by appending one line
+to index.jsonl. Checkpoint cost is constant per record no matter how
+far the backfill has progressed, and resume only reads the index.
+
+    nba_team_stats_journal/
+        index.jsonl                              one line per completed key
+        segments/2023-24/2023-11-01_Advanced.csv one segment per key
+        segments/compacted-<n>.csv               after compact()
+
+A segment is only referenced once its file is fully written (tmp file +
+rename before the index append), so an interrupted run never leaves a
+half-written record in the index.
+
+USAGE:
+    from scripts.data_collection.journal import CollectionJournal
+
+    journal = CollectionJournal('data/raw/nba/nba_team_stats_journal')
+    done = journal.completed_keys()           # {(season, date, measure_type), ...}
+    journal.record('2023-24', '2023-11-01', 'Advanced', df)
+    stats = journal.load()
+"""
+
+import json
+import os
+import shutil
+
+import pandas as pd
+
+INDEX_FILE = 'index.jsonl'
+SEGMENT_DIR = 'segments'
+READ_DTYPES = {'GAME_DATE': str, 'SEASON': str}
+
+
+class CollectionJournal:
+    """
+    Append-only journal of completed (season, date, measure_type) records
+
+    Args:
+        journal_dir (str): Directory holding the index and segment files
+    """
+
+    def __init__(self, journal_dir):
+        self.journal_dir = journal_dir
+        self.index_path = os.path.join(journal_dir, INDEX_FILE)
+        self.segment_dir = os.path.join(journal_dir, SEGMENT_DIR)
+        os.makedirs(self.segment_dir, exist_ok=True)
+
+    # ------------------------------------------------------------
+    # index
+    # ------------------------------------------------------------
+
+    def _entries(self):
+        """Index entries, last one per key wins; a torn final line is ignored."""
+        entries = {}
+        if not os.path.exists(self.index_path):
+            return entries
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entries[(entry['season'], entry['date'], entry['measure_type'])] = entry
+        return entries
+
+    def completed_keys(self):
+        """
+        Keys already in the journal
+
+        Returns:
+            set: {(season, date_str, measure_type), ...}
+        """
+        return set(self._entries())
+
+    @property
+    def n_segments(self):
+        return len({e['segment'] for e in self._entries().values()})
+
+    # ------------------------------------------------------------
+    # write
+    # ------------------------------------------------------------
+
+    def record(self, season, date_str, measure_type, df):
+        """
+        Append one completed request
+
+        Args:
+            season (str): Season like '2024-25'
+            date_str (str): Date in 'YYYY-MM-DD' format
+            measure_type (str): e.g. 'Advanced' or 'Four Factors'
+            df (pd.DataFrame): Rows returned for the request
+        """
+        segment = os.path.join(season, f"{date_str}_{measure_type.replace(' ', '_')}.csv")
+        path = os.path.join(self.segment_dir, segment)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        df.to_csv(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+
+        entry = {'season': season, 'date': date_str, 'measure_type': measure_type,
+                 'segment': segment, 'rows': len(df)}
+        # Start on a fresh line if an interrupted run left a torn one
+        torn = False
+        if os.path.exists(self.index_path) and os.path.getsize(self.index_path) > 0:
+            with open(self.index_path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b'\n'
+
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(('\n' if torn else '') + json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    # ------------------------------------------------------------
+    # read / maintenance
+    # ------------------------------------------------------------
+
+    def load(self):
+        """
+        All journaled rows as one DataFrame (each segment read once)
+
+        Returns:
+            pd.DataFrame: Concatenated segments (empty if nothing recorded)
+        """
+        segments = sorted({e['segment'] for e in self._entries().values()})
+        frames = [pd.read_csv(os.path.join(self.segment_dir, s), dtype=READ_DTYPES) for s in segments]
+        frames = [f for f in frames if not f.empty]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def compact(self):
+        """
+        Merge all segments into one and rewrite the index to point at it
+
+        Returns:
+            int: Number of segment files replaced
+        """
+        entries = self._entries()
+        old_segments = {e['segment'] for e in entries.values()}
+        if len(old_segments) <= 1:
+            return 0
+
+        previous = [int(f[len('compacted-'):-len('.csv')]) for f in os.listdir(self.segment_dir)
+                    if f.startswith('compacted-') and f.endswith('.csv')]
+        segment = f'compacted-{max(previous, default=-1) + 1}.csv'
+        path = os.path.join(self.segment_dir, segment)
+        self.load().to_csv(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+
+        with open(self.index_path + '.tmp', 'w', encoding='utf-8') as f:
+            for entry in entries.values():
+                f.write(json.dumps(dict(entry, segment=segment)) + '\n')
+        os.replace(self.index_path + '.tmp', self.index_path)
+
+        for old in old_segments:
+            os.remove(os.path.join(self.segment_dir, old))
+        return len(old_segments)
+
+    def clear(self):
+        """Delete the journal (after the final output is saved)."""
+        shutil.rmtree(self.journal_dir, ignore_errors=True)
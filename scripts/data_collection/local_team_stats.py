@@ -0,0 +1,244 @@
+"""
+Local As-Of Team Stats from Box Scores
+======================================
+
+Builds the season-to-date team stats that LeagueDashTeamStats returns
+(Advanced + Four Factors, date_to = game date) directly from the
+box-score columns already in the matchup-format games file, so
+02_collect_team_stats doesn't need two API calls per game date.
+
+One row per team per game date, stats cumulative through that date
+(inclusive, like the API with date_to_nullable). Formulas follow the
+NBA.com definitions:
+
+    POSS        = FGA + 0.44 * FTA - OREB + TOV
+    OFF_RATING  = 100 * PTS / POSS
+    DEF_RATING  = 100 * OPP_PTS / OPP_POSS
+    PACE        = 48 * (POSS + OPP_POSS) / 2 / (MIN / 5)
+    EFG_PCT     = (FGM + 0.5 * FG3M) / FGA
+    TM_TOV_PCT  = 100 * TOV / POSS          (Advanced scale; OPP_TOV_PCT is a fraction)
+    OREB_PCT    = OREB / (OREB + OPP_DREB)
+    FTA_RATE    = FTA / FGA
+    PLUS_MINUS  = (PTS - OPP_PTS) / GP
+    PIE         = TEAM_PIE / (TEAM_PIE + OPP_PIE), where
+                  PIE_TOTAL = PTS + FGM + FTM - FGA - FTA + DREB + OREB / 2
+                              + AST + STL + BLK / 2 - PF - TOV
+
+POSS is already the box-score possession estimate, so the E_ estimates
+(E_OFF_RATING, E_DEF_RATING, E_NET_RATING, E_PACE) use the same
+formulas as their play-by-play counterparts; PACE_PER40 = PACE * 40 / 48
+and OREB_PCT_FF = OREB_PCT. Every stat in 01_merge_stats.STAT_COLUMNS is
+produced, so local stats are a drop-in replacement for the API's.
+
+USAGE:
+    from scripts.data_collection.local_team_stats import build_asof_team_stats
+    stats_df = build_asof_team_stats(games_df)
+"""
+
+import numpy as np
+import pandas as pd
+
+from scripts.data_collection.schema import apply_schema
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+BOX_SCORE_COLS = ['PTS', 'FGM', 'FGA', 'FG3M', 'FTM', 'FTA', 'OREB', 'DREB', 'REB', 'AST', 'TOV',
+                  'STL', 'BLK', 'PF']
+TEAM_MINUTES = 240  # regulation team minutes, used when MIN isn't in the games file
+
+# Stats produced locally (every column of 01_merge_stats.ALL_STAT_COLS)
+LOCAL_STAT_COLS = [
+    'GP', 'W', 'L', 'W_PCT', 'MIN',
+    'OFF_RATING', 'DEF_RATING', 'NET_RATING',
+    'E_OFF_RATING', 'E_DEF_RATING', 'E_NET_RATING',
+    'PACE', 'E_PACE', 'PACE_PER40', 'POSS',
+    'EFG_PCT', 'TM_TOV_PCT', 'OREB_PCT', 'FTA_RATE',
+    'OPP_EFG_PCT', 'OPP_TOV_PCT', 'DREB_PCT', 'OPP_FTA_RATE',
+    'AST_PCT', 'AST_TO', 'AST_RATIO', 'TS_PCT', 'REB_PCT', 'OREB_PCT_FF',
+    'PIE', 'PLUS_MINUS',
+]
+
+# ============================================================
+# TEAM-GAME ROWS
+# ============================================================
+
+def team_game_box_scores(games_df):
+    """
+    Stack matchup rows into team-game rows with own and opponent totals
+
+    Args:
+        games_df (pd.DataFrame): Matchup-format games with HOME_/AWAY_
+            box-score columns (BOX_SCORE_COLS, optional MIN)
+
+    Returns:
+        pd.DataFrame: TEAM_ID, TEAM_NAME, GAME_DATE, SEASON, WIN, MIN and
+                      each box-score column plus its OPP_ version
+    """
+    missing = [f'{side}_{c}' for side in ('HOME', 'AWAY') for c in BOX_SCORE_COLS
+               if f'{side}_{c}' not in games_df.columns]
+    if missing:
+        raise ValueError(f"Games file is missing box-score columns: {', '.join(missing)}")
+
+    frames = []
+    for side, opp in (('HOME', 'AWAY'), ('AWAY', 'HOME')):
+        frame = pd.DataFrame({
+            'TEAM_ID': games_df[f'{side}_TEAM_ID'].to_numpy(),
+            'TEAM_NAME': (games_df[f'{side}_TEAM_NAME'].to_numpy()
+                          if f'{side}_TEAM_NAME' in games_df.columns else None),
+            'GAME_DATE': pd.to_datetime(games_df['GAME_DATE']).to_numpy(),
+            'SEASON': games_df['SEASON'].to_numpy(),
+            'WIN': (games_df[f'{side}_PTS'] > games_df[f'{opp}_PTS']).to_numpy(dtype=np.int64),
+            'MIN': (games_df[f'{side}_MIN'].fillna(TEAM_MINUTES).to_numpy(dtype=np.float64)
+                    if f'{side}_MIN' in games_df.columns
+                    else np.full(len(games_df), float(TEAM_MINUTES))),
+        })
+        for col in BOX_SCORE_COLS:
+            frame[col] = games_df[f'{side}_{col}'].to_numpy(dtype=np.float64)
+            frame[f'OPP_{col}'] = games_df[f'{opp}_{col}'].to_numpy(dtype=np.float64)
+        frames.append(frame)
+
+    return pd.concat(frames, ignore_index=True)
+
+# ============================================================
+# AS-OF STATS
+# ============================================================
+
+def _ratio(num, den, scale=1.0):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = scale * num / den
+    return np.where(np.isfinite(out), out, np.nan)
+
+def _pie_total(t, prefix=''):
+    """PIE numerator of one side's (cumulative) box-score totals."""
+    c = {col: t[f'{prefix}{col}'] for col in BOX_SCORE_COLS}
+    return (c['PTS'] + c['FGM'] + c['FTM'] - c['FGA'] - c['FTA'] + c['DREB'] + c['OREB'] / 2
+            + c['AST'] + c['STL'] + c['BLK'] / 2 - c['PF'] - c['TOV'])
+
+def build_asof_team_stats(games_df, verbose=True):
+    """
+    Season-to-date team stats for every team-date, in one vectorized pass
+
+    Team-game rows are sorted once by (SEASON, TEAM_ID, GAME_DATE); one
+    grouped cumulative sum over all box-score totals gives the counts
+    through each date, and every rate stat is a ratio of those sums.
+
+    Args:
+        games_df (pd.DataFrame): Matchup-format games with box-score columns
+        verbose (bool): Print a summary
+
+    Returns:
+        pd.DataFrame: TEAM_ID, TEAM_NAME, GAME_DATE, SEASON + LOCAL_STAT_COLS,
+                      one row per team per game date (same shape as the API output)
+
+    Example:
+        >>> stats_df = build_asof_team_stats(games_df)
+        >>> stats_df.loc[stats_df['TEAM_ID'] == 1610612747, ['GAME_DATE', 'NET_RATING']].tail()
+    """
+    team_games = team_game_box_scores(games_df)
+    team_games = team_games.sort_values(['SEASON', 'TEAM_ID', 'GAME_DATE'], kind='stable')
+
+    total_cols = ['WIN', 'MIN'] + BOX_SCORE_COLS + [f'OPP_{c}' for c in BOX_SCORE_COLS]
+    totals = team_games.groupby(['SEASON', 'TEAM_ID'], sort=False)[total_cols].cumsum()
+    games_played = team_games.groupby(['SEASON', 'TEAM_ID'], sort=False).cumcount() + 1
+
+    t = {col: totals[col].to_numpy() for col in total_cols}
+    gp = games_played.to_numpy(dtype=np.float64)
+
+    poss = t['FGA'] + 0.44 * t['FTA'] - t['OREB'] + t['TOV']
+    opp_poss = t['OPP_FGA'] + 0.44 * t['OPP_FTA'] - t['OPP_OREB'] + t['OPP_TOV']
+    off_rating = _ratio(t['PTS'], poss, 100)
+    def_rating = _ratio(t['OPP_PTS'], opp_poss, 100)
+    pace = _ratio(48 * (poss + opp_poss) / 2, t['MIN'] / 5)
+    oreb_pct = _ratio(t['OREB'], t['OREB'] + t['OPP_DREB'])
+    pie = _pie_total(t)
+    opp_pie = _pie_total(t, prefix='OPP_')
+
+    stats = pd.DataFrame({
+        'TEAM_ID': team_games['TEAM_ID'].to_numpy(),
+        'TEAM_NAME': team_games['TEAM_NAME'].to_numpy(),
+        'GAME_DATE': team_games['GAME_DATE'].to_numpy(),
+        'SEASON': team_games['SEASON'].to_numpy(),
+        'GP': games_played.to_numpy(),
+        'W': t['WIN'],
+        'L': games_played.to_numpy() - t['WIN'],
+        'W_PCT': t['WIN'] / gp,
+        'MIN': t['MIN'] / 5 / gp,
+        'OFF_RATING': off_rating,
+        'DEF_RATING': def_rating,
+        'NET_RATING': off_rating - def_rating,
+        'E_OFF_RATING': off_rating,
+        'E_DEF_RATING': def_rating,
+        'E_NET_RATING': off_rating - def_rating,
+        'PACE': pace,
+        'E_PACE': pace,
+        'PACE_PER40': pace * 40 / 48,
+        'POSS': poss,
+        'EFG_PCT': _ratio(t['FGM'] + 0.5 * t['FG3M'], t['FGA']),
+        'TM_TOV_PCT': _ratio(t['TOV'], poss, 100),
+        'OREB_PCT': oreb_pct,
+        'FTA_RATE': _ratio(t['FTA'], t['FGA']),
+        'OPP_EFG_PCT': _ratio(t['OPP_FGM'] + 0.5 * t['OPP_FG3M'], t['OPP_FGA']),
+        'OPP_TOV_PCT': _ratio(t['OPP_TOV'], opp_poss),
+        'DREB_PCT': _ratio(t['DREB'], t['DREB'] + t['OPP_OREB']),
+        'OPP_FTA_RATE': _ratio(t['OPP_FTA'], t['OPP_FGA']),
+        'AST_PCT': _ratio(t['AST'], t['FGM']),
+        'AST_TO': _ratio(t['AST'], t['TOV']),
+        'AST_RATIO': _ratio(t['AST'], poss, 100),
+        'TS_PCT': _ratio(t['PTS'], 2 * (t['FGA'] + 0.44 * t['FTA'])),
+        'REB_PCT': _ratio(t['REB'], t['REB'] + t['OPP_REB']),
+        'OREB_PCT_FF': oreb_pct,
+        'PIE': _ratio(pie, pie + opp_pie),
+        'PLUS_MINUS': (t['PTS'] - t['OPP_PTS']) / gp,
+    })
+    stats = apply_schema(stats.sort_values(['GAME_DATE', 'TEAM_ID'], kind='stable').reset_index(drop=True))
+
+    if verbose:
+        print(f"✓ Built {len(stats):,} team-date rows locally "
+              f"({stats['GAME_DATE'].nunique():,} dates, {len(LOCAL_STAT_COLS)} stats)")
+
+    return stats
+
+# ============================================================
+# RECONCILIATION
+# ============================================================
+
+def compare_team_stats(local_df, api_df, stat_cols=None, tolerance=0.02):
+    """
+    Compare local stats against API stats for the same team-dates
+
+    Args:
+        local_df (pd.DataFrame): Output of build_asof_team_stats
+        api_df (pd.DataFrame): API rows (TEAM_ID, GAME_DATE + stat columns)
+        stat_cols (list): Stats to compare (default: shared LOCAL_STAT_COLS)
+        tolerance (float): Max allowed relative difference per stat
+
+    Returns:
+        pd.DataFrame: One row per stat with ROWS, MAX_ABS_DIFF,
+                      MAX_REL_DIFF and OK columns
+    """
+    api_df = api_df.copy()
+    api_df['GAME_DATE'] = pd.to_datetime(api_df['GAME_DATE'])
+    if stat_cols is None:
+        stat_cols = [c for c in LOCAL_STAT_COLS if c in api_df.columns]
+
+    joined = local_df.merge(api_df[['TEAM_ID', 'GAME_DATE'] + stat_cols],
+                            on=['TEAM_ID', 'GAME_DATE'], suffixes=('', '_API'))
+
+    rows = []
+    for col in stat_cols:
+        local = joined[col].to_numpy(dtype=np.float64)
+        api = joined[f'{col}_API'].to_numpy(dtype=np.float64)
+        abs_diff = np.abs(local - api)
+        rel_diff = abs_diff / np.maximum(np.abs(api), 1e-9)
+        max_rel = np.nanmax(rel_diff) if len(joined) else np.nan
+        rows.append({
+            'STAT': col,
+            'ROWS': len(joined),
+            'MAX_ABS_DIFF': np.nanmax(abs_diff) if len(joined) else np.nan,
+            'MAX_REL_DIFF': max_rel,
+            'OK': bool(max_rel <= tolerance) if len(joined) else False,
+        })
+
+    return pd.DataFrame(rows)
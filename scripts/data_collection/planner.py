@@ -0,0 +1,183 @@
+"""
+Collection Planner
+==================
+
+Turns a games frame into the minimal list of stats requests for
+02_collect_team_stats. The (season, date) -> teams index is built in one
+grouped pass over stacked home/away ids, then diffed against what is
+already journaled or stored, so only missing (season, date, measure_type)
+requests are planned.
+
+A plan can be printed without touching the network (dry run): request
+count, dates, what was skipped and the estimated time under the rate
+limit.
+
+USAGE:
+    from scripts.data_collection.planner import plan_collection
+
+    plan = plan_collection(games_df, journaled=journal.completed_keys(), stored=stored_stats)
+    plan.print_summary(rate=1.0, max_workers=4)
+    for season, date_str, measure_type, team_ids in plan.tasks:
+        ...
+"""
+
+import pandas as pd
+
+MEASURE_TYPES = ('Advanced', 'Four Factors')
+# A stored row covers a measure type only where that measure's columns are filled
+# (rows are an outer merge of both measures, so a failed measure leaves NaN).
+# Each column is one only that measure returns: Advanced also carries EFG_PCT.
+MEASURE_COLUMNS = {'Advanced': 'OFF_RATING', 'Four Factors': 'OPP_EFG_PCT'}
+
+# ============================================================
+# INDEXES
+# ============================================================
+
+def teams_by_date(games_df):
+    """
+    Teams that played on each (season, date), built in one grouped pass
+
+    Args:
+        games_df (pd.DataFrame): Matchup-format games (GAME_DATE, SEASON,
+            HOME_TEAM_ID, AWAY_TEAM_ID)
+
+    Returns:
+        dict: {(season, 'YYYY-MM-DD'): sorted list of team ids}, in date order
+
+    Example:
+        >>> index = teams_by_date(games_df)
+        >>> index[('2024-25', '2024-10-22')]
+        [1610612738, 1610612747, 1610612750, 1610612752]
+    """
+    if games_df.empty:
+        return {}
+    stacked = pd.DataFrame({
+        'SEASON': pd.concat([games_df['SEASON']] * 2, ignore_index=True).astype(str),
+        'DATE': pd.concat([pd.to_datetime(games_df['GAME_DATE'])] * 2, ignore_index=True),
+        'TEAM_ID': pd.concat([games_df['HOME_TEAM_ID'], games_df['AWAY_TEAM_ID']], ignore_index=True),
+    })
+    stacked = stacked.drop_duplicates().sort_values(['DATE', 'SEASON', 'TEAM_ID'], kind='stable')
+    grouped = stacked.groupby(['DATE', 'SEASON'], sort=False)['TEAM_ID'].agg(list)
+    return {(season, date.strftime('%Y-%m-%d')): [int(t) for t in ids]
+            for (date, season), ids in grouped.items()}
+
+def stored_keys(stats_df, expected, measure_types=MEASURE_TYPES):
+    """
+    Requests already covered by a stored stats dataset
+
+    A (season, date, measure_type) counts as stored when every team that
+    played that day has a row whose MEASURE_COLUMNS column for that
+    measure is non-null. Rows merge all measure types, so a date where
+    only one measure failed is still planned for that measure.
+
+    Args:
+        stats_df (pd.DataFrame): Stored stats (SEASON, GAME_DATE, TEAM_ID + stat columns)
+        expected (dict): Output of teams_by_date
+        measure_types (tuple): Measure types merged into each stored row
+
+    Returns:
+        set: {(season, date_str, measure_type), ...}
+    """
+    if stats_df is None or stats_df.empty:
+        return set()
+    covered = set()
+    for measure in measure_types:
+        column = MEASURE_COLUMNS.get(measure)
+        if column not in stats_df.columns:
+            continue
+        rows = stats_df[stats_df[column].notna()]
+        have = teams_by_date(pd.DataFrame({
+            'SEASON': rows['SEASON'], 'GAME_DATE': rows['GAME_DATE'],
+            'HOME_TEAM_ID': rows['TEAM_ID'], 'AWAY_TEAM_ID': rows['TEAM_ID'],
+        }))
+        for (season, date_str), team_ids in expected.items():
+            if set(team_ids) <= set(have.get((season, date_str), ())):
+                covered.add((season, date_str, measure))
+    return covered
+
+# ============================================================
+# PLAN
+# ============================================================
+
+class CollectionPlan:
+    """
+    Minimal work list of stats requests
+
+    Attributes:
+        tasks (list): (season, date_str, measure_type, team_ids) per request
+        n_dates (int): Game dates covered by the games frame
+        skipped_journal (int): Requests already in the journal
+        skipped_stored (int): Requests already in the stored dataset
+    """
+
+    def __init__(self, tasks, n_dates, skipped_journal, skipped_stored):
+        self.tasks = tasks
+        self.n_dates = n_dates
+        self.skipped_journal = skipped_journal
+        self.skipped_stored = skipped_stored
+
+    def __len__(self):
+        return len(self.tasks)
+
+    @property
+    def pending_dates(self):
+        """(season, date_str) pairs with at least one request left."""
+        return sorted({(season, date_str) for season, date_str, _, _ in self.tasks},
+                      key=lambda k: (k[1], k[0]))
+
+    def estimated_seconds(self, rate):
+        """Lower bound on wall time: the rate limit caps requests per second."""
+        return len(self.tasks) / rate if self.tasks else 0.0
+
+    def print_summary(self, rate, max_workers=1):
+        """
+        Print what the plan will do
+
+        Args:
+            rate (float): Request rate ceiling (requests per second)
+            max_workers (int): Requests in flight
+        """
+        pending = self.pending_dates
+        print(f"  Game dates:        {self.n_dates:,}")
+        print(f"  Already journaled: {self.skipped_journal:,} requests")
+        print(f"  Already stored:    {self.skipped_stored:,} requests")
+        print(f"  To fetch:          {len(self.tasks):,} requests for {len(pending):,} dates")
+        if pending:
+            print(f"  Date range:        {pending[0][1]} to {pending[-1][1]}")
+        print(f"  Estimated time:    {self.estimated_seconds(rate) / 60:.1f} minutes "
+              f"({rate:.2f} requests/s, {max_workers} workers)")
+
+def plan_collection(games_df, journaled=(), stored=None, measure_types=MEASURE_TYPES):
+    """
+    Build the minimal request list for a games frame
+
+    Args:
+        games_df (pd.DataFrame): Matchup-format games
+        journaled (set): Completed (season, date_str, measure_type) keys
+        stored (pd.DataFrame): Stored stats dataset (SEASON, GAME_DATE, TEAM_ID), or None
+        measure_types (tuple): Measure types to request per date
+
+    Returns:
+        CollectionPlan: Requests still needed, in date order
+
+    Example:
+        >>> plan = plan_collection(games_df, journaled=journal.completed_keys())
+        >>> len(plan), plan.estimated_seconds(rate=1.0)
+    """
+    index = teams_by_date(games_df)
+    journaled = set(journaled)
+    in_store = stored_keys(stored, index, measure_types)
+
+    tasks = []
+    skipped_journal = skipped_stored = 0
+    for (season, date_str), team_ids in index.items():
+        for measure in measure_types:
+            key = (season, date_str, measure)
+            if key in journaled:
+                skipped_journal += 1
+            elif key in in_store:
+                skipped_stored += 1
+            else:
+                tasks.append((season, date_str, measure, team_ids))
+
+    return CollectionPlan(tasks, len(index), skipped_journal, skipped_stored)
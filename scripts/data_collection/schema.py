@@ -0,0 +1,213 @@
+"""
+Ingestion Schema
+================
+
+Compact dtypes for every frame the collection stages produce and the
+merge/feature stages load (team-game rows, matchup rows, team stats and
+the merged games-with-stats frame), assigned once at parse time:
+
+    TEAM_ABBREVIATION, TEAM_NAME, WL, MATCHUP   category
+    PTS, FGM, ..., GP, W, L, *_RANK             int16 (int32 if a value needs it)
+    TEAM_ID                                     int32
+    HOME_WIN                                    int8
+    *_PCT, ratings, PLUS_MINUS, other floats    float32
+    GAME_DATE                                   datetime64
+
+HOME_/AWAY_ prefixes are stripped before the lookup, so one registry
+covers both sides of a matchup. Count columns holding NaN (e.g. a
+missing game) become float32 rather than failing; float columns with
+fractional values are never truncated to ints.
+
+Categories are built from the data, not from the TeamRegistry: the
+history includes franchises (Seattle SuperSonics, New Jersey Nets)
+that the current-team list doesn't know.
+
+USAGE:
+    from scripts.data_collection.schema import apply_schema, load_typed
+
+    games = apply_schema(convert_to_matchup_format(team_games))
+    stats = load_typed('data/raw/nba/nba_team_stats_by_date.csv', seasons=['2024-25'])
+    stats = load_typed(INPUT_STATS, columns=['TEAM_ID', 'GAME_DATE'], stat_columns=STAT_COLUMNS)
+"""
+
+import numpy as np
+
+from scripts.data_collection.storage import dataset_columns, load_dataset
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+CATEGORY_COLS = {'TEAM_ABBREVIATION', 'TEAM_NAME', 'WL', 'MATCHUP', 'STAT_TYPE'}
+COUNT_COLS = {'PTS', 'FGM', 'FGA', 'FG3M', 'FG3A', 'FTM', 'FTA', 'OREB', 'DREB', 'REB',
+              'AST', 'STL', 'BLK', 'TOV', 'PF', 'MIN', 'GP', 'W', 'L'}
+ID_COLS = {'TEAM_ID': 'int32'}
+FLAG_COLS = {'HOME_WIN': 'int8', 'IS_HOME': 'int8'}
+DATE_COLS = {'GAME_DATE'}
+SIDE_PREFIXES = ('HOME_', 'AWAY_')
+
+# ============================================================
+# DTYPE RULES
+# ============================================================
+
+def base_name(col):
+    """Column name without its HOME_/AWAY_ prefix ('HOME_FG_PCT' -> 'FG_PCT')."""
+    for prefix in SIDE_PREFIXES:
+        if col.startswith(prefix) and col != 'HOME_WIN':
+            return col[len(prefix):]
+    return col
+
+
+def _int_dtype(values):
+    """Smallest of int16/int32/int64 that holds every value."""
+    if values.size == 0:
+        return 'int16'
+    lo, hi = values.min(), values.max()
+    for dtype in ('int16', 'int32'):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return dtype
+    return 'int64'
+
+
+def _integral(series):
+    values = series.to_numpy()
+    if series.dtype.kind in 'iu':
+        return values
+    if series.dtype.kind == 'f' and not np.isnan(values).any() and np.array_equal(values, np.round(values)):
+        return values
+    return None
+
+
+def column_dtype(col, series):
+    """
+    Compact dtype for one column (None = leave as is)
+
+    Args:
+        col (str): Column name
+        series (pd.Series): Column values
+
+    Returns:
+        str: Target dtype, or None
+    """
+    base = base_name(col)
+    kind = series.dtype.kind
+
+    if base in DATE_COLS:
+        return None if kind == 'M' else 'datetime64[ns]'
+    if base in CATEGORY_COLS:
+        return 'category'
+    if kind not in 'iufb':
+        return None
+    if col in FLAG_COLS:
+        return FLAG_COLS[col] if _integral(series) is not None else 'float32'
+    if base in ID_COLS:
+        return ID_COLS[base] if _integral(series) is not None else None
+
+    if base in COUNT_COLS or base.endswith('_RANK') or kind in 'iu':
+        values = _integral(series)
+        if values is not None:
+            return _int_dtype(values)
+    if kind == 'f':
+        return 'float32'
+    return None
+
+
+def apply_schema(df):
+    """
+    Cast a collected or loaded frame to the compact ingestion dtypes
+
+    Idempotent and column-driven: columns outside the registry keep
+    their dtype unless they are plain int64/float64 numbers, which are
+    downcast the same way as counts/stats.
+
+    Args:
+        df (pd.DataFrame): Team-game, matchup, team-stats or merged frame
+
+    Returns:
+        pd.DataFrame: Frame with compact dtypes
+
+    Example:
+        >>> games = apply_schema(games)
+        >>> games.memory_usage(deep=True).sum() / 1024 ** 2
+    """
+    casts = {}
+    for col in df.columns:
+        dtype = column_dtype(col, df[col])
+        if dtype is not None and str(df[col].dtype) != dtype:
+            casts[col] = dtype
+    return df.astype(casts) if casts else df
+
+
+def read_dtypes(columns, stat_columns=()):
+    """
+    Explicit dtypes for parsing a CSV, known from column names alone
+
+    Categories and ids get their final dtype; counts, ranks and the
+    given stat columns are parsed straight to float32 (apply_schema then
+    narrows integral counts to int16). Other columns are left to pandas.
+
+    Args:
+        columns (list): Column names to read
+        stat_columns (list): Columns known to be numeric stats
+
+    Returns:
+        dict: Column -> dtype for pd.read_csv
+    """
+    dtypes = {col: 'float32' for col in stat_columns}
+    for col in columns:
+        base = base_name(col)
+        if base in CATEGORY_COLS:
+            dtypes[col] = 'category'
+        elif base in ID_COLS:
+            dtypes[col] = ID_COLS[base]
+        elif base in COUNT_COLS or base.endswith('_RANK'):
+            dtypes[col] = 'float32'
+    return dtypes
+
+
+def flatten_columns(registry):
+    """Column list from a list or a {group: [columns]} registry like STAT_COLUMNS."""
+    if registry is None:
+        return []
+    if isinstance(registry, dict):
+        registry = [col for group in registry.values() for col in group]
+    return list(dict.fromkeys(registry))
+
+
+def load_typed(path, columns=None, stat_columns=None, **kwargs):
+    """
+    load_dataset with the ingestion schema applied
+
+    Parquet datasets written from typed frames already carry these
+    dtypes; CSV datasets (and older Parquet files) are cast after the read.
+
+    With columns and/or stat_columns the read is projected: only those
+    columns are read (ones the dataset doesn't have are skipped), and
+    CSV values are parsed straight into compact dtypes, so memory scales
+    with what is kept rather than with everything the API returned.
+
+    Args:
+        path (str): Dataset path
+        columns (list): Key/identifier columns to read (default: all)
+        stat_columns (list | dict): Numeric stat columns to read, as a list
+            or a registry of lists (e.g. 01_merge_stats.STAT_COLUMNS)
+        **kwargs: Passed to load_dataset (seasons, date_range, ...)
+
+    Returns:
+        pd.DataFrame: Loaded frame with compact dtypes
+
+    Example:
+        >>> stats = load_typed(INPUT_STATS, columns=['TEAM_ID', 'GAME_DATE', 'SEASON'],
+        ...                    stat_columns=STAT_COLUMNS)
+    """
+    stat_columns = flatten_columns(stat_columns)
+    if columns is None and not stat_columns:
+        return apply_schema(load_dataset(path, **kwargs))
+
+    available = set(dataset_columns(path))
+    columns = [col for col in columns or [] if col in available]
+    stat_columns = [col for col in stat_columns if col in available and col not in columns]
+    projected = columns + stat_columns
+    return apply_schema(load_dataset(path, columns=projected,
+                                     dtypes=read_dtypes(projected, stat_columns), **kwargs))
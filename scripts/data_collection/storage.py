@@ -0,0 +1,563 @@
+"""
+Columnar Dataset Storage
+========================
+
+Read/write API for pipeline stage outputs. Each dataset is stored as
+typed, compressed Parquet files partitioned by SEASON:
+
+    data/raw/nba/nba_games_all_seasons_RAW.parquet/
+        SEASON=2023-24/part-0.parquet
+        SEASON=2024-25/part-0.parquet
+
+Dataset paths are the same paths the pipeline already uses for CSV
+('.../nba_games_all_seasons_RAW.csv'); the '.parquet' directory next to
+it is used when present, otherwise the CSV is read. Dates and dtypes
+survive the round trip, so loaders don't re-parse or re-infer them.
+
+pyarrow is optional. Without it save_dataset writes CSV and
+load_dataset reads CSV, applying the same projection and filters in
+pandas after the read.
+
+USAGE:
+    from scripts.data_collection.storage import append_dataset, load_dataset, save_dataset
+
+    save_dataset(games, 'data/raw/nba/nba_games_all_seasons_RAW.csv')
+    with DatasetWriter('data/raw/nba/nba_games_all_seasons_RAW.csv') as writer:
+        writer.write(season_games)                  # one season at a time
+    append_dataset(todays_games, 'data/raw/nba/nba_games_all_seasons_RAW.csv')
+    recent = load_dataset('data/raw/nba/nba_games_all_seasons_RAW.csv',
+                          columns=['GAME_DATE', 'HOME_TEAM_ID', 'AWAY_TEAM_ID'],
+                          seasons=['2024-25', '2025-26'])
+"""
+
+import os
+import shutil
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:  # pragma: no cover - depends on environment
+    HAS_PYARROW = False
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+PARTITION_COL = 'SEASON'
+DATE_COL = 'GAME_DATE'
+COMPRESSION = 'zstd'
+ROW_GROUP_SIZE = 50_000
+MAX_PARTS_PER_PARTITION = 32  # appended part files before a partition is merged back into one
+
+# ============================================================
+# PATH HELPERS
+# ============================================================
+
+def dataset_paths(path):
+    """
+    Resolve the Parquet directory and CSV file for a dataset path
+
+    Args:
+        path (str): Dataset path, with or without '.csv' / '.parquet'
+
+    Returns:
+        tuple: (parquet_dir, csv_path)
+
+    Example:
+        >>> dataset_paths('data/raw/nba/games.csv')
+        ('data/raw/nba/games.parquet', 'data/raw/nba/games.csv')
+    """
+    base, ext = os.path.splitext(path)
+    if ext not in ('.csv', '.parquet'):
+        base = path
+    return f'{base}.parquet', f'{base}.csv'
+
+def dataset_exists(path):
+    """True if either the Parquet or the CSV form of a dataset exists."""
+    parquet_dir, csv_path = dataset_paths(path)
+    return (HAS_PYARROW and os.path.isdir(parquet_dir)) or os.path.exists(csv_path)
+
+def dataset_columns(path):
+    """
+    Column names of a dataset without reading any rows
+
+    Args:
+        path (str): Dataset path
+
+    Returns:
+        list: Column names (Parquet schema or CSV header)
+
+    Raises:
+        FileNotFoundError: If neither form of the dataset exists
+    """
+    parquet_dir, csv_path = dataset_paths(path)
+    if HAS_PYARROW and os.path.isdir(parquet_dir):
+        schema = _dataset_schema(parquet_dir)
+        if schema is not None:
+            return list(schema.names)
+    if os.path.exists(csv_path):
+        return list(pd.read_csv(csv_path, nrows=0).columns)
+    raise FileNotFoundError(f"Dataset not found: {parquet_dir} or {csv_path}")
+
+def _resolve_column(columns, name):
+    """Case-insensitive column lookup (final datasets use lowercase names)."""
+    if name is None:
+        return None
+    lookup = {c.lower(): c for c in columns}
+    return lookup.get(name.lower())
+
+def _arrow_table(df, schema=None):
+    """
+    Arrow table for a frame, with categorical columns stored as
+    dictionary<int32, ...> so files whose category counts differ
+    (e.g. one season vs another) still read back as one dataset.
+    """
+    if schema is not None:
+        return pa.Table.from_pandas(df.reindex(columns=schema.names), schema=schema, preserve_index=False)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if not any(pa.types.is_dictionary(f.type) for f in table.schema):
+        return table
+    fields = [pa.field(f.name, pa.dictionary(pa.int32(), f.type.value_type))
+              if pa.types.is_dictionary(f.type) else f for f in table.schema]
+    return table.cast(pa.schema(fields, metadata=table.schema.metadata))
+
+def _partition_dir(parquet_dir, partition_col, value):
+    return os.path.join(parquet_dir, f'{partition_col}={quote(str(value), safe="")}')
+
+def _partition_value(dirname):
+    return unquote(dirname.split('=', 1)[1])
+
+# ============================================================
+# WRITE
+# ============================================================
+
+class DatasetWriter:
+    """
+    Write a dataset incrementally, one chunk (e.g. one season) at a time
+
+    Chunks go to a temporary directory as they arrive, so memory is
+    bounded by the largest chunk; close() swaps the complete dataset in
+    place of any previous version. Used as a context manager, an
+    exception discards the partial output and leaves the old version.
+
+    Args:
+        path (str): Dataset path (e.g. 'data/raw/nba/games.csv')
+        partition_col (str): Column to partition by (default: 'SEASON')
+        date_col (str): Column to sort rows by within each chunk
+        export_csv (bool): Also write the CSV form of the dataset
+        compression (str): Parquet codec (default: 'zstd')
+        verbose (bool): Print what was written on close
+
+    Example:
+        >>> with DatasetWriter('data/raw/nba/nba_games_all_seasons_RAW.csv') as writer:
+        ...     for season in seasons:
+        ...         writer.write(fetch_season(season))
+    """
+
+    def __init__(self, path, partition_col=PARTITION_COL, date_col=DATE_COL,
+                 export_csv=False, compression=COMPRESSION, verbose=True):
+        self.parquet_dir, self.csv_path = dataset_paths(path)
+        self.partition_col = partition_col
+        self.date_col = date_col
+        self.write_csv = export_csv or not HAS_PYARROW
+        self.compression = compression
+        self.verbose = verbose
+        self.n_rows = 0
+        self.partitions = set()
+        self._part_counts = {}
+        self._csv_started = False
+        self._closed = False
+
+        os.makedirs(os.path.dirname(self.parquet_dir) or '.', exist_ok=True)
+        self.tmp_dir = self.parquet_dir + '.tmp'
+        self.tmp_csv = self.csv_path + '.tmp'
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        if HAS_PYARROW:
+            os.makedirs(self.tmp_dir)
+
+    def write(self, df):
+        """
+        Write one chunk of rows
+
+        Args:
+            df (pd.DataFrame): Rows to add (any number of partitions)
+        """
+        date_col = _resolve_column(df.columns, self.date_col)
+        if date_col is not None:
+            df = df.sort_values(date_col, kind='stable')
+
+        self.n_rows += len(df)
+        if not HAS_PYARROW:
+            df.to_csv(self.tmp_csv, mode='a' if self._csv_started else 'w',
+                      header=not self._csv_started, index=False)
+            self._csv_started = True
+            return
+
+        partition_col = _resolve_column(df.columns, self.partition_col)
+        if partition_col is None:
+            parts = [(self.tmp_dir, df)]
+        else:
+            parts = [(_partition_dir(self.tmp_dir, partition_col, value), part)
+                     for value, part in df.groupby(partition_col, sort=True, dropna=False, observed=True)]
+
+        for part_dir, part in parts:
+            os.makedirs(part_dir, exist_ok=True)
+            n = self._part_counts.get(part_dir, 0)
+            self._part_counts[part_dir] = n + 1
+            self.partitions.add(part_dir)
+            table = _arrow_table(part)
+            pq.write_table(table, os.path.join(part_dir, f'part-{n}.parquet'),
+                           compression=self.compression, row_group_size=ROW_GROUP_SIZE)
+
+    def close(self):
+        """
+        Replace the previous version of the dataset with what was written
+
+        Returns:
+            str: Path of the primary output (Parquet dir, or CSV without pyarrow)
+        """
+        if self._closed:
+            return self.parquet_dir if HAS_PYARROW else self.csv_path
+        self._closed = True
+
+        if self.write_csv:
+            if HAS_PYARROW:
+                self._export_partitions_csv()
+            if not self._csv_started:
+                pd.DataFrame().to_csv(self.tmp_csv, index=False)
+            os.replace(self.tmp_csv, self.csv_path)
+            if self.verbose:
+                print(f"✓ CSV written: {self.csv_path} ({self.n_rows:,} rows)")
+
+        if not HAS_PYARROW:
+            if self.verbose:
+                print("⚠️  pyarrow not installed - Parquet output skipped")
+            return self.csv_path
+
+        # Swap in the new version only once every partition is written
+        shutil.rmtree(self.parquet_dir, ignore_errors=True)
+        os.replace(self.tmp_dir, self.parquet_dir)
+
+        if self.verbose:
+            print(f"✓ Parquet written: {self.parquet_dir} ({self.n_rows:,} rows, "
+                  f"{len(self.partitions)} partitions)")
+        return self.parquet_dir
+
+    def _export_partitions_csv(self):
+        """CSV in partition order (chunks may arrive in any order), one partition in memory at a time."""
+        part_dirs = sorted(self.partitions)
+        for part_dir in part_dirs:
+            files = [os.path.join(part_dir, f) for f in _part_files(part_dir)]
+            part = ds.dataset(files, format='parquet').to_table().to_pandas()
+            date_col = _resolve_column(part.columns, self.date_col)
+            if date_col is not None:
+                part = part.sort_values(date_col, kind='stable')
+            part.to_csv(self.tmp_csv, mode='a' if self._csv_started else 'w',
+                        header=not self._csv_started, index=False)
+            self._csv_started = True
+
+    def abort(self):
+        """Discard everything written; the previous version stays in place."""
+        self._closed = True
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        if os.path.exists(self.tmp_csv):
+            os.remove(self.tmp_csv)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+def save_dataset(df, path, partition_col=PARTITION_COL, date_col=DATE_COL,
+                 export_csv=False, compression=COMPRESSION, verbose=True):
+    """
+    Persist a stage output as Parquet partitioned by season
+
+    Rows are sorted by date inside each partition so row-group
+    statistics allow date-range pushdown. Any previous Parquet version
+    of the dataset is replaced.
+
+    Args:
+        df (pd.DataFrame): Data to save
+        path (str): Dataset path (e.g. 'data/raw/nba/games.csv')
+        partition_col (str): Column to partition by (default: 'SEASON');
+            files are unpartitioned if the column is missing
+        date_col (str): Column to sort rows by within a partition
+        export_csv (bool): Also write the CSV form of the dataset
+        compression (str): Parquet codec (default: 'zstd')
+        verbose (bool): Print what was written
+
+    Returns:
+        str: Path of the primary output (Parquet dir, or CSV without pyarrow)
+
+    Example:
+        >>> save_dataset(games_df, 'data/raw/nba/nba_games_all_seasons_RAW.csv', export_csv=True)
+    """
+    with DatasetWriter(path, partition_col, date_col, export_csv, compression, verbose) as writer:
+        writer.write(df)
+    return writer.close()
+
+def _part_files(part_dir):
+    return sorted(f for f in os.listdir(part_dir) if f.endswith('.parquet'))
+
+def _dataset_schema(parquet_dir):
+    for root, _, files in os.walk(parquet_dir):
+        for f in sorted(files):
+            if f.endswith('.parquet'):
+                return pq.read_schema(os.path.join(root, f))
+    return None
+
+def append_dataset(df, path, partition_col=PARTITION_COL, date_col=DATE_COL,
+                   export_csv=False, compression=COMPRESSION, max_parts=MAX_PARTS_PER_PARTITION,
+                   verbose=True):
+    """
+    Append rows to a stage output without rewriting it
+
+    Each season in df becomes one new part file in its partition (cast
+    to the existing schema), so the cost is proportional to the rows
+    appended. A partition holding more than max_parts files is merged
+    back into one. Creates the dataset if it doesn't exist yet.
+
+    Args:
+        df (pd.DataFrame): New rows (same columns as the stored dataset)
+        path (str): Dataset path
+        partition_col (str): Column the dataset is partitioned by
+        date_col (str): Column to sort new rows by
+        export_csv (bool): Also append to the CSV form
+        compression (str): Parquet codec
+        max_parts (int): Part files per partition before it is compacted
+        verbose (bool): Print what was written
+
+    Returns:
+        str: Path of the primary output
+
+    Example:
+        >>> append_dataset(todays_games, 'data/raw/nba/nba_games_all_seasons_RAW.csv')
+    """
+    parquet_dir, csv_path = dataset_paths(path)
+    if not dataset_exists(path):
+        return save_dataset(df, path, partition_col, date_col, export_csv, compression, verbose)
+    if df.empty:
+        return parquet_dir if HAS_PYARROW and os.path.isdir(parquet_dir) else csv_path
+
+    date_col = _resolve_column(df.columns, date_col)
+    if date_col is not None:
+        df = df.sort_values(date_col, kind='stable')
+
+    if (not HAS_PYARROW or export_csv) and os.path.exists(csv_path):
+        header = pd.read_csv(csv_path, nrows=0).columns
+        df.reindex(columns=header).to_csv(csv_path, mode='a', header=False, index=False)
+        if verbose:
+            print(f"✓ CSV appended: {csv_path} (+{len(df):,} rows)")
+
+    if not HAS_PYARROW or not os.path.isdir(parquet_dir):
+        return csv_path
+
+    schema = _dataset_schema(parquet_dir)
+    partition_col = _resolve_column(df.columns, partition_col)
+    partitioned = any('=' in d for d in os.listdir(parquet_dir))
+    if partition_col is None or not partitioned:
+        parts = [(parquet_dir, df)]
+    else:
+        parts = [(_partition_dir(parquet_dir, partition_col, value), part)
+                 for value, part in df.groupby(partition_col, sort=True, dropna=False, observed=True)]
+
+    for part_dir, part in parts:
+        os.makedirs(part_dir, exist_ok=True)
+        existing = _part_files(part_dir)
+        names = {f[:-len('.parquet')] for f in existing}
+        n = len(existing)
+        while f'part-{n}' in names:
+            n += 1
+
+        table = _arrow_table(part, schema)
+        target = os.path.join(part_dir, f'part-{n}.parquet')
+        pq.write_table(table, target + '.tmp', compression=compression, row_group_size=ROW_GROUP_SIZE)
+        os.replace(target + '.tmp', target)
+
+        if len(existing) + 1 > max_parts:
+            _compact_partition(part_dir, compression)
+
+    if verbose:
+        print(f"✓ Parquet appended: {parquet_dir} (+{len(df):,} rows, {len(parts)} partitions)")
+
+    return parquet_dir
+
+def _compact_partition(part_dir, compression=COMPRESSION):
+    """Merge every part file of one partition into a single file."""
+    files = [os.path.join(part_dir, f) for f in _part_files(part_dir)]
+    table = ds.dataset(files, format='parquet').to_table()
+    merged = os.path.join(part_dir, 'compacted.parquet.tmp')
+    pq.write_table(table, merged, compression=compression, row_group_size=ROW_GROUP_SIZE)
+    for f in files:
+        os.remove(f)
+    os.replace(merged, os.path.join(part_dir, 'part-0.parquet'))
+
+# ============================================================
+# READ
+# ============================================================
+
+def _date_bounds(date_range):
+    start, end = date_range if date_range is not None else (None, None)
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    return start, end
+
+def _read_parquet(parquet_dir, columns, seasons, date_range, partition_col, date_col):
+    partition_dirs = sorted(d for d in os.listdir(parquet_dir) if '=' in d)
+
+    def parquet_files(dirs):
+        if not dirs:
+            return sorted(os.path.join(parquet_dir, f)
+                          for f in os.listdir(parquet_dir) if f.endswith('.parquet'))
+        return [os.path.join(parquet_dir, d, f)
+                for d in dirs
+                for f in sorted(os.listdir(os.path.join(parquet_dir, d)))
+                if f.endswith('.parquet')]
+
+    # Partition pruning: only open the requested seasons
+    selected = partition_dirs
+    if partition_dirs and seasons is not None:
+        wanted = {str(s) for s in seasons}
+        selected = [d for d in partition_dirs if _partition_value(d) in wanted]
+
+    files = parquet_files(selected) if selected or not partition_dirs else parquet_files(partition_dirs[:1])
+    dataset = ds.dataset(files, format='parquet')
+    names = dataset.schema.names
+    partition_col = _resolve_column(names, partition_col)
+    date_col = _resolve_column(names, date_col)
+
+    expr = None
+    if partition_dirs and not selected:
+        expr = ds.scalar(False)  # no requested season on disk: empty, correctly typed frame
+    elif seasons is not None and partition_col is not None and not partition_dirs:
+        expr = ds.field(partition_col).isin([str(s) for s in seasons])
+
+    # Predicate pushdown: evaluated against row-group statistics
+    start, end = _date_bounds(date_range)
+    if date_col is not None:
+        date_type = dataset.schema.field(date_col).type
+        for op, bound in (('>=', start), ('<=', end)):
+            if bound is None:
+                continue
+            scalar = pa.scalar(bound.to_pydatetime(), type=date_type)
+            cond = ds.field(date_col) >= scalar if op == '>=' else ds.field(date_col) <= scalar
+            expr = cond if expr is None else expr & cond
+
+    if columns is not None:
+        columns = [_resolve_column(names, c) or c for c in columns]
+
+    table = dataset.to_table(columns=columns, filter=expr)
+    return table.to_pandas().reset_index(drop=True)
+
+def _read_csv(csv_path, columns, seasons, date_range, partition_col, date_col, dtypes=None):
+    header = pd.read_csv(csv_path, nrows=0).columns
+    partition_col = _resolve_column(header, partition_col)
+    date_col = _resolve_column(header, date_col)
+
+    if columns is not None:
+        columns = [_resolve_column(header, c) or c for c in columns]
+        filter_cols = [c for c in (partition_col, date_col) if c is not None]
+        usecols = list(dict.fromkeys(columns + filter_cols))
+    else:
+        usecols = None
+
+    parse_dates = [date_col] if date_col is not None else False
+    if dtypes:
+        dtypes = {_resolve_column(header, c): t for c, t in dtypes.items()
+                  if _resolve_column(header, c) not in (None, date_col)}
+    df = pd.read_csv(csv_path, usecols=usecols, parse_dates=parse_dates, dtype=dtypes or None)
+
+    mask = pd.Series(True, index=df.index)
+    if seasons is not None and partition_col is not None:
+        mask &= df[partition_col].astype(str).isin({str(s) for s in seasons})
+    start, end = _date_bounds(date_range)
+    if date_col is not None and start is not None:
+        mask &= df[date_col] >= start
+    if date_col is not None and end is not None:
+        mask &= df[date_col] <= end
+
+    df = df[mask].reset_index(drop=True)
+    return df[columns] if columns is not None else df
+
+def load_dataset(path, columns=None, seasons=None, date_range=None,
+                 partition_col=PARTITION_COL, date_col=DATE_COL, dtypes=None):
+    """
+    Load a stage output with optional projection and season/date filters
+
+    Reads the Parquet form when available (only the requested seasons'
+    partitions and the requested columns are read; date bounds are
+    pushed down to row-group statistics), otherwise the CSV form.
+    Column names are matched case-insensitively.
+
+    Args:
+        path (str): Dataset path (e.g. 'data/raw/nba/games.csv')
+        columns (list): Columns to load (default: all)
+        seasons (list): Seasons to keep, e.g. ['2023-24', '2024-25']
+        date_range (tuple): Inclusive (start, end) dates; either may be None
+        partition_col (str): Season column name
+        date_col (str): Date column name
+        dtypes (dict): Column dtypes applied while parsing the CSV form
+                       (Parquet columns are already typed)
+
+    Returns:
+        pd.DataFrame: Loaded data
+
+    Raises:
+        FileNotFoundError: If neither form of the dataset exists
+
+    Example:
+        >>> df = load_dataset('data/processed/nba/final/nba_train_data_enhanced.csv',
+        ...                   date_range=('2023-10-01', None))
+    """
+    parquet_dir, csv_path = dataset_paths(path)
+
+    if HAS_PYARROW and os.path.isdir(parquet_dir):
+        return _read_parquet(parquet_dir, columns, seasons, date_range, partition_col, date_col)
+
+    if os.path.exists(csv_path):
+        return _read_csv(csv_path, columns, seasons, date_range, partition_col, date_col, dtypes)
+
+    raise FileNotFoundError(f"Dataset not found: {parquet_dir} or {csv_path}")
+
+def export_csv(path, csv_path=None):
+    """
+    Write the CSV form of a Parquet dataset (e.g. for spreadsheets)
+
+    Args:
+        path (str): Dataset path
+        csv_path (str): Output CSV (default: alongside the dataset)
+
+    Returns:
+        str: CSV path written
+    """
+    _, default_csv = dataset_paths(path)
+    csv_path = csv_path or default_csv
+    load_dataset(path).to_csv(csv_path, index=False)
+    print(f"✓ CSV exported: {csv_path}")
+    return csv_path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert a CSV dataset to partitioned Parquet (or back).")
+    parser.add_argument('path', help="Dataset path, e.g. data/raw/nba/nba_games_all_seasons_RAW.csv")
+    parser.add_argument('--to-csv', action='store_true', help="Export the Parquet dataset as CSV")
+    args = parser.parse_args()
+
+    if args.to_csv:
+        export_csv(args.path)
+    else:
+        _, csv_file = dataset_paths(args.path)
+        save_dataset(_read_csv(csv_file, None, None, None, PARTITION_COL, DATE_COL), args.path)
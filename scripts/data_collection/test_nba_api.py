@@ -8,6 +8,15 @@ from nba_api.stats.endpoints import leaguegamefinder, teamdashboardbygeneralspli
 from nba_api.stats.static import teams
 import pandas as pd
 import time
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scripts.data_collection.http_cache import install_response_cache
+
+# Repeat runs are served from the on-disk response cache
+cache = install_response_cache()
 
 print("=" * 60)
 print("NBA API TESTING SUITE")
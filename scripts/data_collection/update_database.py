@@ -0,0 +1,549 @@
+"""
+Incremental Database Update
+===========================
+Nightly refresh: fetches only what happened since the last run and
+appends it to every stage output, instead of re-running the full
+collection for all seasons.
+
+Each stage keeps a watermark (last GAME_DATE processed, per season) in
+a small JSON file:
+
+    games             ← LeagueGameFinder, games after the watermark only
+    team_stats        ← as-of stats for the new game dates only
+    games_with_stats  ← merge of the new games with their stats
+    features          ← feature rows for the new games
+
+A stage reads the rows its upstream stage added after its own
+watermark, appends its output (append_dataset writes one new part file
+per season), then advances its watermark. A stage that fails keeps its
+old watermark, so the next run picks up where it stopped. Without a
+watermark file, watermarks are read off the stored datasets.
+
+Downstream recomputation is limited to the new dates: stats read only
+the seasons with new games, and features come from a per-team state
+store (team_state.TeamStateStore) advanced one game day at a time, so
+no stage rereads the history behind a night's games. Without a current
+store, features are rebuilt from the affected teams' histories once.
+
+Only complete game days are collected (dates before `until`, default
+today), so a day whose late games haven't finished is picked up whole
+on the next run.
+
+USAGE:
+    python scripts/data_collection/update_database.py
+    python scripts/data_collection/update_database.py --season 2025-26
+    python scripts/data_collection/update_database.py --offline    # serve only from the response cache
+
+OUTPUT (appended):
+    data/raw/nba/nba_games_all_seasons_RAW.csv
+    data/raw/nba/nba_team_stats_by_date.csv
+    data/processed/nba/nba_games_with_stats.csv
+    data/processed/nba/final/nba_train_data.csv
+    data/processed/nba/team_state.pkl (rewritten)
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scripts.data_collection.fetcher import TokenBucket
+from scripts.data_collection.http_cache import current_season_start, install_response_cache
+from scripts.data_collection.journal import CollectionJournal
+from scripts.data_collection.local_team_stats import build_asof_team_stats
+from scripts.data_collection.schema import load_typed
+from scripts.data_collection.storage import append_dataset, dataset_exists, load_dataset
+from scripts.feature_engineering.team_state import TeamStateStore
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+GAMES_FILE = 'data/raw/nba/nba_games_all_seasons_RAW.csv'
+STATS_FILE = 'data/raw/nba/nba_team_stats_by_date.csv'
+MERGED_FILE = 'data/processed/nba/nba_games_with_stats.csv'
+FEATURES_FILE = 'data/processed/nba/final/nba_train_data.csv'
+WATERMARK_FILE = 'data/raw/nba/update_watermarks.json'
+TEAM_STATE_FILE = 'data/processed/nba/team_state.pkl'  # feature state at the 'features' watermark
+
+UPDATE_SEASONS = None     # e.g., ['2025-26']; None = the season in progress
+STATS_SOURCE = 'local'    # 'local' (from box scores) or 'api' (LeagueDashTeamStats per new date)
+RATE_LIMIT_DELAY = 2.0
+EXPORT_CSV = True  # also append to the CSV next to the Parquet dataset
+
+STAGES = ['games', 'team_stats', 'games_with_stats', 'features']
+
+_SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _load_script(name, relpath):
+    """Import a pipeline script whose filename starts with a digit."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(_SCRIPTS_DIR, relpath))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+collect_games = _load_script('collect_nba_games', os.path.join('data_collection', '01_collect_nba_games.py'))
+merge_stats = _load_script('merge_stats', os.path.join('feature_engineering', '01_merge_stats.py'))
+feature_engineering = _load_script('nba_feature_engineering',
+                                   os.path.join('feature_engineering', '02_nba_feature_engineering.py'))
+
+# ============================================================
+# WATERMARKS
+# ============================================================
+
+def current_season(now=None):
+    """Label of the season in progress, e.g. '2025-26'."""
+    start = current_season_start(now)
+    return f"{start}-{str(start + 1)[-2:]}"
+
+def dataset_watermarks(path):
+    """
+    Last GAME_DATE per season in a stored dataset
+
+    Args:
+        path (str): Dataset path
+
+    Returns:
+        dict: {season: 'YYYY-MM-DD'} (empty if the dataset doesn't exist)
+    """
+    if not dataset_exists(path):
+        return {}
+    df = load_dataset(path, columns=['SEASON', 'GAME_DATE'])
+    if df.empty:
+        return {}
+    season_col, date_col = df.columns
+    last = pd.to_datetime(df[date_col]).groupby(df[season_col].astype(str)).max()
+    return {season: date.strftime('%Y-%m-%d') for season, date in last.items()}
+
+def load_watermarks(path=WATERMARK_FILE):
+    """
+    Per-stage watermarks, filling stages missing from the file from their datasets
+
+    Args:
+        path (str): Watermark JSON file
+
+    Returns:
+        dict: {stage: {season: 'YYYY-MM-DD'}}
+    """
+    stored = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+
+    stage_files = dict(zip(STAGES, [GAMES_FILE, STATS_FILE, MERGED_FILE, FEATURES_FILE]))
+    return {stage: stored[stage] if stage in stored else dataset_watermarks(stage_files[stage])
+            for stage in STAGES}
+
+def save_watermarks(watermarks, path=WATERMARK_FILE):
+    """Write watermarks atomically (tmp file + rename)."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(watermarks, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+def advance(watermarks, stage, df, season_col='SEASON', date_col='GAME_DATE'):
+    """Move a stage's watermark to the last date in df, per season."""
+    if df.empty:
+        return
+    last = pd.to_datetime(df[date_col]).groupby(df[season_col].astype(str)).max()
+    for season, date in last.items():
+        current = watermarks[stage].get(season)
+        date_str = date.strftime('%Y-%m-%d')
+        if current is None or date_str > current:
+            watermarks[stage][season] = date_str
+
+def _after(df, watermarks, stage, season_col='SEASON', date_col='GAME_DATE'):
+    """Rows of df dated after the stage's watermark for their season."""
+    if df.empty:
+        return df
+    marks = df[season_col].astype(str).map(watermarks[stage])
+    marks = pd.to_datetime(marks).fillna(pd.Timestamp.min)
+    return df[pd.to_datetime(df[date_col]) > marks].reset_index(drop=True)
+
+def _pending_seasons(watermarks, stage, upstream):
+    """Seasons whose upstream stage has rows past the stage's watermark."""
+    return sorted(season for season, date in watermarks[upstream].items()
+                  if watermarks[stage].get(season, '') < date)
+
+def _season_range(watermarks, stage, seasons):
+    """Earliest date after the stage's watermark over seasons (None = no watermark)."""
+    marks = [watermarks[stage].get(s) for s in seasons]
+    if not marks or any(m is None for m in marks):
+        return None
+    return pd.Timestamp(min(marks)) + timedelta(days=1)
+
+# ============================================================
+# STAGE 1: GAMES
+# ============================================================
+
+def fetch_new_games(season, after=None, until=None):
+    """
+    Regular-season games for a season dated after `after` and before `until`
+
+    Args:
+        season (str): Season like '2025-26'
+        after (str): Last date already stored ('YYYY-MM-DD'), None for all
+        until (pd.Timestamp): First date not to collect (incomplete day)
+
+    Returns:
+        pd.DataFrame: New games in matchup format
+    """
+    from nba_api.stats.endpoints import leaguegamefinder
+
+    date_from = (pd.Timestamp(after) + timedelta(days=1)).strftime('%m/%d/%Y') if after else ''
+    date_to = (pd.Timestamp(until) - timedelta(days=1)).strftime('%m/%d/%Y') if until is not None else ''
+
+    gamefinder = leaguegamefinder.LeagueGameFinder(
+        season_nullable=season,
+        season_type_nullable='Regular Season',
+        league_id_nullable='00',
+        date_from_nullable=date_from,
+        date_to_nullable=date_to,
+    )
+    games_df = gamefinder.get_data_frames()[0]
+    if games_df.empty:
+        return pd.DataFrame()
+    games_df['SEASON'] = season
+    return collect_games.convert_to_matchup_format(games_df)
+
+def update_games(watermarks, seasons, fetch_fn=fetch_new_games, until=None):
+    """
+    Append games played after the 'games' watermark
+
+    Args:
+        watermarks (dict): Per-stage watermarks (updated in place)
+        seasons (list): Seasons to check for new games
+        fetch_fn (callable): fetch_fn(season, after, until) -> matchup-format games
+        until (pd.Timestamp): First date not to collect (default: today)
+
+    Returns:
+        pd.DataFrame: Games appended
+    """
+    until = pd.Timestamp(until if until is not None else datetime.now().date())
+    new_games = []
+    for season in seasons:
+        after = watermarks['games'].get(season)
+        games = fetch_fn(season, after, until)
+        if games is None or games.empty:
+            print(f"  {season}: no new games after {after or 'season start'}")
+            continue
+
+        games['GAME_DATE'] = pd.to_datetime(games['GAME_DATE'])
+        games = games[games['GAME_DATE'] < until]
+        games = _after(games, watermarks, 'games')
+        print(f"✓ {season}: {len(games)} new games after {after or 'season start'}")
+        new_games.append(games)
+
+    new_games = pd.concat(new_games, ignore_index=True) if new_games else pd.DataFrame()
+    if not new_games.empty:
+        new_games = new_games.sort_values('GAME_DATE', kind='stable').reset_index(drop=True)
+        append_dataset(new_games, GAMES_FILE, export_csv=EXPORT_CSV)
+        advance(watermarks, 'games', new_games)
+    return new_games
+
+# ============================================================
+# STAGE 2: TEAM STATS
+# ============================================================
+
+def update_team_stats(watermarks, stats_source=STATS_SOURCE, rate_limited=True):
+    """
+    Append as-of team stats for game dates after the 'team_stats' watermark
+
+    Local stats are season-to-date cumulative, so only the seasons with
+    new games are read (one partition each) and only the new dates are
+    kept. API stats are requested for the new dates only, through the
+    collector's journal next to STATS_FILE; rows are appended once their
+    date is fully collected, and the journal is cleared after a run
+    without failures (so no later run returns them again).
+
+    Args:
+        watermarks (dict): Per-stage watermarks (updated in place)
+        stats_source (str): 'local' or 'api'
+        rate_limited (bool): Rate-limit API requests here (False when the
+            response cache applies the limit)
+
+    Returns:
+        pd.DataFrame: Stats rows appended
+    """
+    seasons = _pending_seasons(watermarks, 'team_stats', 'games')
+    if not seasons:
+        print("  No new game dates")
+        return pd.DataFrame()
+    games = load_typed(GAMES_FILE, seasons=seasons)
+    new_games = _after(games, watermarks, 'team_stats')
+    if new_games.empty:
+        print("  No new game dates")
+        return pd.DataFrame()
+
+    journal = None
+    if stats_source == 'local':
+        stats_df = _after(build_asof_team_stats(games, verbose=False), watermarks, 'team_stats')
+        failed = []
+    else:
+        collect_stats = _load_script('collect_team_stats',
+                                     os.path.join('data_collection', '02_collect_team_stats.py'))
+        collect_stats.OUTPUT_DIR = os.path.dirname(STATS_FILE)
+        journal = CollectionJournal(os.path.join(collect_stats.OUTPUT_DIR, collect_stats.JOURNAL_DIR))
+        stats_df, failed = collect_stats.collect_stats_for_all_dates(new_games, rate_limited=rate_limited)
+        if not stats_df.empty:
+            stats_df['GAME_DATE'] = pd.to_datetime(stats_df['GAME_DATE'])
+
+    # Only advance past dates that were fully collected
+    failed_dates = {(season, date) for season, date, _ in failed}
+    done = new_games[[(s, d.strftime('%Y-%m-%d')) not in failed_dates
+                      for s, d in zip(new_games['SEASON'], new_games['GAME_DATE'])]]
+    if failed_dates:
+        earliest = min(date for _, date in failed_dates)
+        done = done[done['GAME_DATE'] < pd.Timestamp(earliest)]
+        print(f"⚠️  {len(failed_dates)} dates failed; watermark stops before {earliest}")
+
+    # Append exactly the dates the watermark moves past: the journal also
+    # returns dates appended by earlier runs and dates still pending a retry
+    if not stats_df.empty:
+        done_keys = set(zip(done['SEASON'].astype(str), done['GAME_DATE']))
+        stats_df = stats_df[[key in done_keys for key in zip(stats_df['SEASON'].astype(str),
+                                                             stats_df['GAME_DATE'])]]
+        stats_df = stats_df.reset_index(drop=True)
+    if not stats_df.empty:
+        append_dataset(stats_df, STATS_FILE, export_csv=EXPORT_CSV)
+    advance(watermarks, 'team_stats', done)
+    if journal is not None and not failed_dates:
+        journal.clear()
+    print(f"✓ {len(stats_df):,} team-date rows for {done['GAME_DATE'].nunique()} new dates")
+    return stats_df
+
+# ============================================================
+# STAGE 3: MERGE
+# ============================================================
+
+def update_merged(watermarks):
+    """
+    Merge games after the 'games_with_stats' watermark with their stats
+
+    Args:
+        watermarks (dict): Per-stage watermarks (updated in place)
+
+    Returns:
+        pd.DataFrame: Merged rows appended
+    """
+    seasons = _pending_seasons(watermarks, 'games_with_stats', 'team_stats')
+    if not seasons:
+        print("  No new games with stats")
+        return pd.DataFrame()
+    start = _season_range(watermarks, 'games_with_stats', seasons)
+    games = load_typed(GAMES_FILE, seasons=seasons, date_range=(start, None))
+    games = _after(games, watermarks, 'games_with_stats')
+
+    # Only games whose stats are in
+    games = games[pd.to_datetime(games['GAME_DATE']) <=
+                  pd.to_datetime(games['SEASON'].map(watermarks['team_stats']))]
+    if games.empty:
+        print("  No new games with stats")
+        return pd.DataFrame()
+
+    # As-of merges can reach back to any earlier snapshot
+    first = None if merge_stats.MERGE_MODE == 'asof' else games['GAME_DATE'].min()
+    stats = merge_stats.load_stats(STATS_FILE, seasons=seasons, date_range=(first, games['GAME_DATE'].max()))
+    stats = merge_stats.clean_stats_dataframe(stats)
+    merged = merge_stats.merge_team_stats(games, stats, mode=merge_stats.MERGE_MODE)
+    merged = merge_stats.organize_columns(merged)
+
+    append_dataset(merged, MERGED_FILE, export_csv=EXPORT_CSV)
+    advance(watermarks, 'games_with_stats', merged)
+    return merged
+
+# ============================================================
+# STAGE 4: FEATURES (TEAM STATE STORE)
+# ============================================================
+
+def _load_team_state(watermarks):
+    """The saved TeamStateStore if it is at the 'features' watermark with the current options, else None."""
+    if not os.path.exists(TEAM_STATE_FILE) or not watermarks['features']:
+        return None
+    store = TeamStateStore.load(TEAM_STATE_FILE)
+    fe = feature_engineering
+    current = (store.last_date == pd.Timestamp(max(watermarks['features'].values()))
+               and store.windows == list(fe.ROLLING_WINDOWS)
+               and store.h2h_last_n == fe.H2H_LAST_N
+               and store.h2h_last_seasons == fe.H2H_LAST_SEASONS
+               and store.variants == list(fe.DIFFERENTIAL_VARIANTS))
+    return store if current else None
+
+def _rebuild_features(new_games):
+    """
+    Batch fallback: features of the new games from the affected teams' histories
+
+    Also rebuilds the team state store from the whole merged dataset.
+    """
+    merged = load_typed(MERGED_FILE)
+    affected = set(new_games['HOME_TEAM_ID']) | set(new_games['AWAY_TEAM_ID'])
+    history = merged[merged['HOME_TEAM_ID'].isin(affected) | merged['AWAY_TEAM_ID'].isin(affected)]
+    print(f"  No current team state: {len(affected)} affected teams "
+          f"({len(history):,} of {len(merged):,} games recomputed)")
+
+    features = feature_engineering.build_feature_frame(history.reset_index(drop=True))
+    features = features[features['game_id'].isin(set(new_games['GAME_ID']))].reset_index(drop=True)
+    last = new_games['GAME_DATE'].max()
+    store = TeamStateStore.from_history(merged[pd.to_datetime(merged['GAME_DATE']) <= last])
+    return features, store
+
+def _state_features(store, new_games, seasons):
+    """
+    Training rows of the new games from the team state store
+
+    Each game day is featurized from the state, then folded into it.
+    Targets come from the results, and each team's first home game of a
+    season is dropped as in the batch frame (filter_game_1).
+    """
+    rows = []
+    for _, day in new_games.groupby('GAME_DATE', sort=True):
+        day_rows = store.features(day)
+        spread, total = day['HOME_PTS'] - day['AWAY_PTS'], day['HOME_PTS'] + day['AWAY_PTS']
+        targets = day[['GAME_ID', 'HOME_WIN', 'HOME_PTS', 'AWAY_PTS']].assign(SPREAD=spread, TOTAL=total)
+        targets.columns = [c.lower() for c in targets.columns]
+        rows.append(day_rows.merge(targets, on='game_id', how='left'))
+        store.advance(day)
+    features = pd.concat(rows, ignore_index=True)
+
+    # Home openers, from a projected read of the seasons being updated
+    homes = load_typed(MERGED_FILE, columns=['SEASON', 'GAME_DATE', 'HOME_TEAM_ID'], seasons=seasons)
+    homes['SEASON'] = homes['SEASON'].astype(str)
+    openers = pd.to_datetime(homes['GAME_DATE']).groupby([homes['SEASON'], homes['HOME_TEAM_ID']]).min()
+    keys = pd.MultiIndex.from_arrays([features['season'].astype(str), features['home_team_id']])
+    first = pd.to_datetime(features['game_date']).to_numpy() == openers.reindex(keys).to_numpy()
+    return features[~first].reset_index(drop=True)
+
+def update_features(watermarks):
+    """
+    Feature rows for games after the 'features' watermark
+
+    Every feature of a game is a function of a small per-team and
+    per-pair state (see team_state.TeamStateStore), saved next to the
+    features. The store is advanced one game day at a time, so a
+    nightly run reads only the new games and costs O(games that day).
+    Without a store at the watermark (first run, changed options, an
+    interrupted run), the new rows are rebuilt from the affected teams'
+    histories and the store is rebuilt from the merged dataset.
+
+    Args:
+        watermarks (dict): Per-stage watermarks (updated in place)
+
+    Returns:
+        pd.DataFrame: Feature rows appended
+    """
+    seasons = _pending_seasons(watermarks, 'features', 'games_with_stats')
+    if not seasons:
+        print("  No new games to featurize")
+        return pd.DataFrame()
+    start = _season_range(watermarks, 'features', seasons)
+    new_games = _after(load_typed(MERGED_FILE, seasons=seasons, date_range=(start, None)), watermarks, 'features')
+    if new_games.empty:
+        print("  No new games to featurize")
+        return pd.DataFrame()
+    new_games['GAME_DATE'] = pd.to_datetime(new_games['GAME_DATE'])
+
+    store = _load_team_state(watermarks)
+    if store is None:
+        features, store = _rebuild_features(new_games)
+    else:
+        print(f"  {len(new_games)} new games on {new_games['GAME_DATE'].nunique()} dates from the {store.summary()}")
+        features = _state_features(store, new_games, seasons)
+
+    append_dataset(features, FEATURES_FILE, export_csv=EXPORT_CSV)
+    advance(watermarks, 'features', new_games)
+    store.save(TEAM_STATE_FILE)
+    return features
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def run_update(seasons=None, fetch_fn=fetch_new_games, until=None, stats_source=STATS_SOURCE,
+               rate_limited=True):
+    """
+    Run every stage once, saving watermarks after each one
+
+    Args:
+        seasons (list): Seasons to fetch games for (default: UPDATE_SEASONS
+            or the season in progress)
+        fetch_fn (callable): Game fetcher, see update_games
+        until (pd.Timestamp): First date not to collect (default: today)
+        stats_source (str): 'local' or 'api'
+        rate_limited (bool): Rate-limit API requests in the stats stage
+
+    Returns:
+        dict: {stage: rows appended}
+    """
+    seasons = seasons or UPDATE_SEASONS or [current_season()]
+    watermarks = load_watermarks(WATERMARK_FILE)
+    added = {}
+
+    print("\n[STAGE 1] Games...")
+    added['games'] = len(update_games(watermarks, seasons, fetch_fn=fetch_fn, until=until))
+    save_watermarks(watermarks, WATERMARK_FILE)
+
+    print("\n[STAGE 2] Team stats...")
+    added['team_stats'] = len(update_team_stats(watermarks, stats_source, rate_limited))
+    save_watermarks(watermarks, WATERMARK_FILE)
+
+    print("\n[STAGE 3] Merge...")
+    added['games_with_stats'] = len(update_merged(watermarks))
+    save_watermarks(watermarks, WATERMARK_FILE)
+
+    print("\n[STAGE 4] Features...")
+    added['features'] = len(update_features(watermarks))
+    save_watermarks(watermarks, WATERMARK_FILE)
+
+    return added
+
+
+def main(seasons=None, offline=False, use_cache=True):
+    """
+    Nightly update workflow.
+
+    Args:
+        seasons (list): Seasons to update (default: the season in progress)
+        offline (bool): Serve API responses only from the cache
+        use_cache (bool): Cache API responses on disk
+    """
+    start_time = datetime.now()
+
+    print("\n" + "="*70)
+    print("INCREMENTAL DATABASE UPDATE")
+    print("="*70)
+    print(f"Start time: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Seasons: {', '.join(seasons or UPDATE_SEASONS or [current_season()])}")
+    print(f"Watermarks: {WATERMARK_FILE}")
+
+    limiter = TokenBucket(rate=1.0 / RATE_LIMIT_DELAY)
+    cache = install_response_cache(limiter=limiter, offline=offline) if use_cache else None
+
+    added = run_update(seasons, stats_source=STATS_SOURCE, rate_limited=cache is None)
+
+    if cache is not None:
+        print(f"\n✓ Response {cache.summary()}")
+
+    print("\n" + "="*70)
+    print("✓ UPDATE COMPLETE")
+    print("="*70)
+    for stage in STAGES:
+        print(f"  {stage:<18} +{added[stage]:,} rows")
+    print(f"\n⏱️  Execution time: {datetime.now() - start_time}")
+    print("="*70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append games and stats since the last update.")
+    parser.add_argument('--season', action='append', help="Season to update (repeatable; default: current)")
+    parser.add_argument('--offline', action='store_true', help="Serve API responses only from the cache")
+    parser.add_argument('--no-cache', action='store_true', help="Don't read or write the response cache")
+    args = parser.parse_args()
+
+    main(seasons=args.season, offline=args.offline, use_cache=not args.no_cache)
@@ -3,7 +3,9 @@ Merge Games with Team Stats - Clean Version
 ============================================
 
 Merges game data with team advanced statistics.
-Stats are AS OF game date (will be lagged later in feature engineering).
+Stats are AS OF game date (will be lagged later in feature engineering),
+or with MERGE_MODE = 'asof' the latest snapshot strictly before the game
+(already lagged; feature engineering leaves them as they are).
 
 Features:
 - No _PRIOR suffix (lagging happens in feature engineering)
@@ -19,8 +21,15 @@ OUTPUT:
     data/processed/nba/nba_games_with_stats.csv
 """
 
+import numpy as np
 import pandas as pd
 import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scripts.data_collection.schema import load_typed
+from scripts.data_collection.storage import dataset_exists, save_dataset
 
 # ============================================================
 # CONFIGURATION
@@ -30,6 +39,8 @@ INPUT_GAMES = 'data/raw/nba/nba_games_all_seasons_RAW.csv'
 INPUT_STATS = 'data/raw/nba/nba_team_stats_by_date.csv'
 OUTPUT_DIR = 'data/processed/nba'
 OUTPUT_FILE = 'nba_games_with_stats.csv'
+EXPORT_CSV = True  # also write the CSV next to the Parquet dataset
+MERGE_MODE = 'exact'  # 'asof' = latest stats snapshot strictly before GAME_DATE (no shift needed later)
 
 # ============================================================
 # COLUMN DEFINITIONS
@@ -82,11 +93,36 @@ ALL_STAT_COLS = []
 for category in STAT_COLUMNS.values():
     ALL_STAT_COLS.extend(category)
 
+# Identifier columns kept from the stats alongside STAT_COLUMNS
+STATS_KEY_COLS = ['TEAM_ID', 'TEAM_NAME', 'GAME_DATE', 'SEASON']
+
+# Lookup keys are (team code << DAY_BITS) + days since DAY_OFFSET
+DAY_OFFSET = np.datetime64('1900-01-01', 'D').astype(np.int64)
+DAY_BITS = 32
+
 
 # ============================================================
 # HELPER FUNCTIONS
 # ============================================================
 
+def load_stats(path, stat_columns=STAT_COLUMNS, **kwargs):
+    """
+    Load only the stats columns the merge keeps, in compact dtypes
+    
+    Reads STATS_KEY_COLS plus the stat_columns registry; _RANK columns,
+    STAT_TYPE and anything else the API returned are never parsed.
+    
+    Args:
+        path: Team stats dataset path
+        stat_columns: Registry of stat columns (default: STAT_COLUMNS)
+        **kwargs: Passed to load_typed (seasons, date_range, ...)
+    
+    Returns:
+        Projected, typed stats dataframe
+    """
+    return load_typed(path, columns=STATS_KEY_COLS, stat_columns=stat_columns, **kwargs)
+
+
 def clean_stats_dataframe(stats_df):
     """
     Clean stats dataframe: remove ranks, STAT_TYPE, etc.
@@ -111,7 +147,7 @@ def clean_stats_dataframe(stats_df):
         print(f"  ✓ Removed STAT_TYPE column")
     
     # Keep only columns we need
-    keep_cols = ['TEAM_ID', 'TEAM_NAME', 'GAME_DATE', 'SEASON'] + [
+    keep_cols = STATS_KEY_COLS + [
         col for col in ALL_STAT_COLS if col in stats_df.columns
     ]
     
@@ -127,49 +163,139 @@ def clean_stats_dataframe(stats_df):
     return stats_df
 
 
-def merge_team_stats(games_df, stats_df, team_prefix):
+class StatsLookup:
     """
-    Merge team stats with games for HOME or AWAY team.
+    Indexed (team code, date) -> stat row lookup over a cleaned stats frame
+    
+    Team ids are factorized to dense codes and dates to day numbers, so
+    every (team, date) pair becomes one int64 key, kept sorted. Keys sort
+    by team first, so each team's snapshots form one contiguous, date-ordered
+    run and a binary search answers both exact and as-of lookups for any
+    list of games in one vectorized call.
+    
+    Args:
+        stats_df (pd.DataFrame): Cleaned stats (TEAM_ID, GAME_DATE, stat columns)
+        stat_cols (list): Stat columns to serve (default: ALL_STAT_COLS present)
+    
+    Example:
+        >>> lookup = StatsLookup(stats)
+        >>> rows = lookup.positions(games['HOME_TEAM_ID'], games['GAME_DATE'])   # -1 = no stats
+        >>> prior = lookup.asof_positions(games['HOME_TEAM_ID'], games['GAME_DATE'])
+        >>> lookup.values[rows[rows >= 0]]
+    """
+    
+    def __init__(self, stats_df, stat_cols=None):
+        stat_cols = [col for col in (stat_cols or ALL_STAT_COLS) if col in stats_df.columns]
+        # One row per (team, date); the latest collected row wins like a re-run would
+        stats_df = stats_df.drop_duplicates(['TEAM_ID', 'GAME_DATE'], keep='last')
+        
+        self.stat_cols = stat_cols
+        self.team_index = pd.Index(pd.unique(stats_df['TEAM_ID'].to_numpy()))
+        self.dtype = np.result_type(np.float32, *[stats_df[col].dtype for col in stat_cols])
+        self.values = stats_df[stat_cols].to_numpy(dtype=self.dtype)
+        self.dates = pd.to_datetime(stats_df['GAME_DATE']).to_numpy()
+        
+        keys = self._keys(stats_df['TEAM_ID'], self.dates)
+        self._rows = np.argsort(keys, kind='stable')
+        self._sorted_keys = keys[self._rows]
+    
+    def _keys(self, team_ids, dates):
+        codes = self.team_index.get_indexer(np.asarray(team_ids)).astype(np.int64)
+        dates = np.asarray(dates)
+        if dates.dtype.kind != 'M':
+            dates = pd.to_datetime(dates).to_numpy()
+        days = dates.astype('datetime64[D]').astype(np.int64)
+        # Unknown teams get a negative key that matches nothing
+        return np.where(codes >= 0, (codes << DAY_BITS) + (days - DAY_OFFSET), -1)
+    
+    def positions(self, team_ids, dates):
+        """Row positions in self.values for (team, date) pairs (-1 if missing)."""
+        keys = self._keys(team_ids, dates)
+        if not len(self._sorted_keys):
+            return np.full(len(keys), -1)
+        pos = np.searchsorted(self._sorted_keys, keys).clip(max=len(self._sorted_keys) - 1)
+        found = (keys >= 0) & (self._sorted_keys[pos] == keys)
+        return np.where(found, self._rows[pos], -1)
+    
+    def asof_positions(self, team_ids, dates):
+        """
+        Row positions of each team's latest snapshot strictly before a date
+        
+        Args:
+            team_ids (array-like): Team ids
+            dates (array-like): Game dates
+        
+        Returns:
+            np.ndarray: Positions in self.values, -1 when the team has no
+                        earlier snapshot
+        """
+        keys = self._keys(team_ids, dates)
+        if not len(self._sorted_keys):
+            return np.full(len(keys), -1)
+        # Last key below (team, day) -- a hit only if it is the same team's
+        pos = np.searchsorted(self._sorted_keys, keys, side='left') - 1
+        safe = pos.clip(min=0)
+        found = (keys >= 0) & (pos >= 0) & ((self._sorted_keys[safe] >> DAY_BITS) == (keys >> DAY_BITS))
+        return np.where(found, self._rows[safe], -1)
+
+
+def merge_team_stats(games_df, stats_df, prefixes=('HOME', 'AWAY'), mode='exact'):
+    """
+    Merge team stats with games for the HOME and AWAY teams in one pass
+    
+    Builds one StatsLookup, gathers each side's stat rows with an integer
+    take and writes them into a single preallocated block, so memory
+    peaks at about the size of the output instead of two full-width merges.
+    Stat columns are prefixed (HOME_OFF_RATING, ...) and replace any
+    same-named game columns; games without stats get NaN.
+    
+    mode='asof' takes each team's latest snapshot strictly before
+    GAME_DATE instead of the snapshot on GAME_DATE. The stats are then
+    already prior to tip-off (feature engineering does not shift them
+    again), dates with a failed or skipped collection fall back to the
+    previous snapshot, and {prefix}_STATS_DATE records which snapshot
+    each game got.
     
     Args:
         games_df: Game data
         stats_df: Cleaned stats data
-        team_prefix: 'HOME' or 'AWAY'
+        prefixes: 'HOME', 'AWAY' or both (default)
+        mode: 'exact' (stats on GAME_DATE) or 'asof' (latest before GAME_DATE)
     
     Returns:
         Games dataframe with team stats added
     """
-    print(f"\nMerging {team_prefix} team stats...")
-    
-    team_id_col = f'{team_prefix}_TEAM_ID'
-    
-    # Merge
-    merged = games_df.merge(
-        stats_df,
-        left_on=[team_id_col, 'GAME_DATE', 'SEASON'],
-        right_on=['TEAM_ID', 'GAME_DATE', 'SEASON'],
-        how='left',
-        suffixes=('', '_DROP')
-    )
-    
-    # Rename stat columns with prefix (no _PRIOR suffix!)
-    for col in ALL_STAT_COLS:
-        if col in merged.columns:
-            merged[f'{team_prefix}_{col}'] = merged[col]
-    
-    # Drop temporary columns
-    drop_cols = ['TEAM_ID', 'TEAM_NAME'] + [
-        col for col in merged.columns 
-        if col.endswith('_DROP') or col in ALL_STAT_COLS
-    ]
-    merged = merged.drop(columns=[col for col in drop_cols if col in merged.columns])
-    
-    # Count successful merges
-    new_cols = [col for col in merged.columns if col.startswith(f'{team_prefix}_') and col != team_id_col]
-    successful = merged[new_cols[0]].notna().sum() if new_cols else 0
+    if mode not in ('exact', 'asof'):
+        raise ValueError(f"mode must be 'exact' or 'asof', got {mode!r}")
+    prefixes = (prefixes,) if isinstance(prefixes, str) else tuple(prefixes)
+    print(f"\nMerging {'/'.join(prefixes)} team stats ({mode})...")
+    
+    lookup = StatsLookup(stats_df)
+    find_rows = lookup.asof_positions if mode == 'asof' else lookup.positions
+    n_stats = len(lookup.stat_cols)
+    block = np.full((len(games_df), n_stats * len(prefixes)), np.nan, dtype=lookup.dtype)
+    new_cols, snapshot_dates = [], {}
+    
+    for i, team_prefix in enumerate(prefixes):
+        rows = find_rows(games_df[f'{team_prefix}_TEAM_ID'], games_df['GAME_DATE'])
+        found = rows >= 0
+        block[found, i * n_stats:(i + 1) * n_stats] = lookup.values[rows[found]]
+        new_cols.extend(f'{team_prefix}_{col}' for col in lookup.stat_cols)
+        if mode == 'asof':
+            dates = np.full(len(games_df), np.datetime64('NaT'), dtype=lookup.dates.dtype)
+            dates[found] = lookup.dates[rows[found]]
+            snapshot_dates[f'{team_prefix}_STATS_DATE'] = dates
+        print(f"  ✓ {team_prefix}: successful merges: {found.sum():,} / {len(games_df):,} "
+              f"({found.mean()*100 if len(games_df) else 0:.1f}%)")
+    
+    stats_block = pd.DataFrame(block, columns=new_cols, index=games_df.index, copy=False)
+    parts = [games_df.drop(columns=[col for col in [*new_cols, *snapshot_dates] if col in games_df.columns]),
+             stats_block]
+    if snapshot_dates:
+        parts.append(pd.DataFrame(snapshot_dates, index=games_df.index))
+    merged = pd.concat(parts, axis=1, copy=False)
     
     print(f"  ✓ Added {len(new_cols)} stat columns")
-    print(f"  ✓ Successful merges: {successful:,} / {len(merged):,} ({successful/len(merged)*100:.1f}%)")
     
     return merged
 
@@ -212,6 +338,10 @@ def organize_columns(df):
     
     # 5. HOME advanced stats (in logical groups)
     for team_prefix in ['HOME', 'AWAY']:
+        # Snapshot date (as-of merges only)
+        if f'{team_prefix}_STATS_DATE' in df.columns:
+            ordered_cols.append(f'{team_prefix}_STATS_DATE')
+        
         # Basic
         for col in STAT_COLUMNS['basic']:
             full_col = f'{team_prefix}_{col}'
@@ -292,18 +422,18 @@ def main():
     # Load data
     print("\n[STEP 1] Loading data...")
     
-    if not os.path.exists(INPUT_GAMES):
+    if not dataset_exists(INPUT_GAMES):
         print(f"✗ Error: {INPUT_GAMES} not found!")
         print("  Run collect_nba_games_improved.py first")
         return
     
-    if not os.path.exists(INPUT_STATS):
+    if not dataset_exists(INPUT_STATS):
         print(f"✗ Error: {INPUT_STATS} not found!")
         print("  Run collect_team_stats_improved.py first")
         return
     
-    games = pd.read_csv(INPUT_GAMES, parse_dates=['GAME_DATE'])
-    stats = pd.read_csv(INPUT_STATS, parse_dates=['GAME_DATE'])
+    games = load_typed(INPUT_GAMES)
+    stats = load_stats(INPUT_STATS)
     
     print(f"✓ Games: {len(games):,} rows, {len(games.columns)} columns")
     print(f"✓ Stats: {len(stats):,} rows, {len(stats.columns)} columns")
@@ -313,16 +443,12 @@ def main():
     print("\n[STEP 2] Cleaning stats dataframe...")
     stats = clean_stats_dataframe(stats)
     
-    # Merge HOME team stats
-    print("\n[STEP 3] Merging HOME team stats...")
-    games = merge_team_stats(games, stats, 'HOME')
-    
-    # Merge AWAY team stats
-    print("\n[STEP 4] Merging AWAY team stats...")
-    games = merge_team_stats(games, stats, 'AWAY')
+    # Merge HOME and AWAY team stats
+    print("\n[STEP 3] Merging HOME and AWAY team stats...")
+    games = merge_team_stats(games, stats, mode=MERGE_MODE)
     
     # Organize columns
-    print("\n[STEP 5] Organizing columns...")
+    print("\n[STEP 4] Organizing columns...")
     games = organize_columns(games)
     
     # Show Four Factors grouping
@@ -332,10 +458,10 @@ def main():
         print(f"  {i}. {col}")
     
     # Save
-    print("\n[STEP 6] Saving...")
+    print("\n[STEP 5] Saving...")
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     output_path = os.path.join(OUTPUT_DIR, OUTPUT_FILE)
-    games.to_csv(output_path, index=False)
+    save_dataset(games, output_path, export_csv=EXPORT_CSV)
     
     # Summary
     print("\n" + "="*70)
@@ -11,8 +11,9 @@ CHANGES FROM ORIGINAL:
 Steps:
 1. Load matchup-level data (1 row per game)
 2. Preserve PTS columns (actual game outcomes)
-3. Shift ALL team stats to make them "prior" (except PTS)
-4. Calculate rolling features (L5, L10)
+3. Shift ALL team stats to make them "prior" (except PTS; as-of merged
+   stats are already prior and only box scores are shifted)
+4. Calculate rolling features (ROLLING_WINDOWS, default L5, L10)
 5. Calculate REST features (current + rolling)
 6. Calculate momentum features
 7. Rebuild matchup level
@@ -24,11 +25,30 @@ Steps:
 13. Convert all columns to lowercase
 14. Validate after each step
 15. Save final output
+
+The steps run as a FeatureDAG (see feature_dag()): each step's output is
+cached under CACHE_DIR, keyed by its inputs, parameters and code, so a
+re-run recomputes only the steps downstream of what changed.
 """
 
+import importlib.util
 import pandas as pd
-import numpy as np
 import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scripts.data_collection.schema import load_typed
+from scripts.data_collection.storage import save_dataset
+from scripts.feature_engineering.feature_dag import SOURCE, FeatureDAG, FeatureStep
+from scripts.feature_engineering.feature_utils import (
+    build_differentials, grouped_shift, h2h_features, rolling_means, run_length_streaks
+)
+
+_spec = importlib.util.spec_from_file_location(
+    'merge_stats', os.path.join(os.path.dirname(os.path.abspath(__file__)), '01_merge_stats.py'))
+merge_stats = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(merge_stats)
 
 # ============================================================
 # CONFIGURATION
@@ -38,6 +58,14 @@ INPUT_FILE = 'data/processed/nba/intermediate/nba_games_with_stats.csv'
 OUTPUT_DIR = 'data/processed/nba/final'
 OUTPUT_FILE = 'nba_train_data.csv'
 
+ROLLING_WINDOWS = [5, 10]  # e.g., [3, 5, 10, 20] for L3/L5/L10/L20
+H2H_LAST_N = None          # e.g., 4 = only the last 4 meetings count
+H2H_LAST_SEASONS = None    # e.g., 2 = only current + previous season count
+DIFFERENTIAL_VARIANTS = ['DIFF']  # add 'RATIO' / 'SUM' for home/away and home+away
+EXPORT_CSV = True  # also write the CSV next to the Parquet dataset
+CACHE_DIR = 'data/cache/features'  # step outputs keyed by input/code/param hashes; None = no cache
+CACHE_MAX_AGE_DAYS = 30  # cached step outputs unused for this long are pruned (None = keep all)
+
 # ============================================================
 # UTILITIES
 # ============================================================
@@ -63,22 +91,27 @@ def validate_step(df, step_name):
 # 1. LOAD AND SHIFT STATS (PRESERVE PTS)
 # ============================================================
 
-def load_and_shift_stats(filepath):
-    print_section("LOADING INPUT FILE AND SHIFTING TEAM STATS")
-    
-    df = pd.read_csv(filepath, parse_dates=['GAME_DATE'])
-    df = df.sort_values('GAME_DATE').reset_index(drop=True)
-    
-    print_section("INPUT FILE COLUMNS")
-    for c in df.columns:
-        print(f"  - {c}")
+def prepare_games(df):
+    """Matchup rows in GAME_DATE order (the frame every other step starts from)."""
+    return df.sort_values('GAME_DATE').reset_index(drop=True)
+
+def extract_pts(games):
+    """HOME_PTS/AWAY_PTS by GAME_ID (actual game outcomes - never shifted), or None."""
+    return games[['GAME_ID', 'HOME_PTS', 'AWAY_PTS']].copy() if 'HOME_PTS' in games.columns else None
+
+def team_view(df):
+    """
+    Stack the HOME and AWAY sides into one row per team-game
     
-    # PRESERVE PTS COLUMNS (actual game outcomes - do not shift these)
-    # Extract HOME_PTS and AWAY_PTS before processing
-    pts_data = df[['GAME_ID', 'HOME_PTS', 'AWAY_PTS']].copy() if 'HOME_PTS' in df.columns else None
+    Args:
+        df: Matchup-format games with stats
     
+    Returns:
+        tuple: (team frame sorted by TEAM_ID/GAME_DATE, stat columns,
+                as-of stat columns that are already prior to tip-off)
+    """
     # TEAM STATS (exclude identifiers AND PTS which we'll handle separately)
-    exclude_keywords = ['TEAM_ID','TEAM_ABBREVIATION','TEAM_NAME','WL','HOME_WIN']
+    exclude_keywords = ['TEAM_ID','TEAM_ABBREVIATION','TEAM_NAME','WL','HOME_WIN','STATS_DATE']
     
     # Get all stat columns (excluding PTS for now)
     home_stat_cols = [c for c in df.columns 
@@ -104,12 +137,46 @@ def load_and_shift_stats(filepath):
     all_games = pd.concat([home_games, away_games], ignore_index=True)
     all_games = all_games.sort_values(['TEAM_ID','GAME_DATE']).reset_index(drop=True)
     
-    # SHIFT ALL STATS TO PRIOR GAME (this makes them point-in-time predictors)
+    # As-of merged stats (HOME_STATS_DATE present) are already prior to tip-off
     stat_cols = [c for c in all_games.columns if c not in ['GAME_ID','GAME_DATE','SEASON','TEAM_ID','IS_HOME']]
-    for col in stat_cols:
-        all_games[col] = all_games.groupby('TEAM_ID')[col].shift(1).fillna(0)
+    asof = 'HOME_STATS_DATE' in df.columns
+    prior_cols = [c for c in stat_cols if c in merge_stats.ALL_STAT_COLS] if asof else []
+    return all_games, stat_cols, prior_cols
+
+def shift_team_stats(df, fill_value=0):
+    all_games, stat_cols, prior_cols = team_view(df)
+    
+    # SHIFT ALL STATS TO PRIOR GAME (this makes them point-in-time predictors)
+    # As-of stats are left as they are: box scores only
+    shift_cols = [c for c in stat_cols if c not in prior_cols]
+    if prior_cols:
+        print(f"✓ {len(prior_cols)} as-of stat columns already prior (not shifted)")
+    
+    # One grouped shift over the whole stat block (fill_value=None keeps NaN for first games)
+    shifted = grouped_shift(all_games, shift_cols, group_col='TEAM_ID', periods=1, fill_value=fill_value)
+    prior = all_games[prior_cols]
+    if fill_value is not None:
+        shifted = shifted.fillna(fill_value)
+        prior = prior.fillna(fill_value)
+    all_games = pd.concat([all_games.drop(columns=stat_cols), shifted, prior], axis=1)[all_games.columns]
     
     all_games = validate_step(all_games, "Shifted Team Stats")
+    return all_games
+
+def load_and_shift_stats(filepath, fill_value=0):
+    print_section("LOADING INPUT FILE AND SHIFTING TEAM STATS")
+    
+    # Accepts a dataset path or an already-loaded games frame (incremental updates)
+    df = load_typed(filepath) if isinstance(filepath, str) else filepath.copy()
+    df = prepare_games(df)
+    
+    print_section("INPUT FILE COLUMNS")
+    for c in df.columns:
+        print(f"  - {c}")
+    
+    # PRESERVE PTS COLUMNS (actual game outcomes - do not shift these)
+    pts_data = extract_pts(df)
+    all_games = shift_team_stats(df, fill_value=fill_value)
     
     return df, all_games, pts_data
 
@@ -117,32 +184,28 @@ def load_and_shift_stats(filepath):
 # 2. ROLLING FEATURES
 # ============================================================
 
-def calculate_rolling_features(team_df):
-    print_section("CALCULATING ROLLING FEATURES L5/L10 (INCLUDING 4F)")
+ROLL_STATS = [
+    'NET_RATING','OFF_RATING','DEF_RATING','W_PCT',
+    'EFG_PCT','TOV_PCT','OREB_PCT','FTA_RATE',
+    'OPP_EFG_PCT','OPP_TOV_PCT','DREB_PCT','OPP_FTA_RATE',
+    'PACE','TS_PCT','AST_PCT','PIE'
+]
+ROLL_RENAMES = {'TM_TOV_PCT':'TOV_PCT'}  # applied before rolling
+
+def calculate_rolling_features(team_df, windows=ROLLING_WINDOWS):
+    window_names = '/'.join(f'L{w}' for w in windows)
+    print_section(f"CALCULATING ROLLING FEATURES {window_names} (INCLUDING 4F)")
     
     # Remove TM_ prefix from turnover
-    rename_map = {'TM_TOV_PCT':'TOV_PCT'}
-    for old,new in rename_map.items():
+    for old,new in ROLL_RENAMES.items():
         if old in team_df.columns:
             team_df.rename(columns={old:new}, inplace=True)
     
-    stats_to_roll = [
-        'NET_RATING','OFF_RATING','DEF_RATING','W_PCT',
-        'EFG_PCT','TOV_PCT','OREB_PCT','FTA_RATE',
-        'OPP_EFG_PCT','OPP_TOV_PCT','DREB_PCT','OPP_FTA_RATE',
-        'PACE','TS_PCT','AST_PCT','PIE'
-    ]
-    stats_to_roll = [s for s in stats_to_roll if s in team_df.columns]
-    
-    for stat in stats_to_roll:
-        for window in [5,10]:
-            team_df[f'{stat}_L{window}'] = (
-                team_df.groupby('TEAM_ID')[stat]
-                .rolling(window,min_periods=1)
-                .mean()
-                .reset_index(level=0,drop=True)
-                .fillna(0)
-            )
+    stats_to_roll = [s for s in ROLL_STATS if s in team_df.columns]
+    
+    # All stats x all windows in one sorted cumulative-sum pass
+    rolled = rolling_means(team_df, stats_to_roll, windows, group_col='TEAM_ID', order_col='GAME_DATE').fillna(0)
+    team_df = pd.concat([team_df.drop(columns=rolled.columns, errors='ignore'), rolled], axis=1)
     
     team_df = validate_step(team_df, "Rolling Features")
     return team_df
@@ -151,6 +214,8 @@ def calculate_rolling_features(team_df):
 # 3. REST FEATURES
 # ============================================================
 
+REST_COLS = ['DAYS_REST','B2B','OPTIMAL_REST','OVER_RESTED','B2B_IN_L5','B2B_IN_L10','AVG_REST_L10']
+
 def calculate_rest_features(team_df):
     print_section("CALCULATING REST FEATURES")
     
@@ -161,14 +226,19 @@ def calculate_rest_features(team_df):
     df['OPTIMAL_REST'] = ((df['DAYS_REST']>=2)&(df['DAYS_REST']<=3)).astype(int)
     df['OVER_RESTED'] = (df['DAYS_REST']>=4).astype(int)
     
-    # Rolling REST
-    df['B2B_IN_L5'] = df.groupby('TEAM_ID')['B2B'].rolling(5,min_periods=1).sum().reset_index(level=0,drop=True).shift(1).fillna(0)
-    df['B2B_IN_L10'] = df.groupby('TEAM_ID')['B2B'].rolling(10,min_periods=1).sum().reset_index(level=0,drop=True).shift(1).fillna(0)
-    df['AVG_REST_L10'] = df.groupby('TEAM_ID')['DAYS_REST'].rolling(10,min_periods=1).mean().reset_index(level=0,drop=True).shift(1).fillna(2.5)
+    # Rolling REST (shifted within each team, so a team's first game never sees another team's rows)
+    df['B2B_IN_L5'] = df.groupby('TEAM_ID')['B2B'].rolling(5,min_periods=1).sum().reset_index(level=0,drop=True).groupby(df['TEAM_ID']).shift(1).fillna(0)
+    df['B2B_IN_L10'] = df.groupby('TEAM_ID')['B2B'].rolling(10,min_periods=1).sum().reset_index(level=0,drop=True).groupby(df['TEAM_ID']).shift(1).fillna(0)
+    df['AVG_REST_L10'] = df.groupby('TEAM_ID')['DAYS_REST'].rolling(10,min_periods=1).mean().reset_index(level=0,drop=True).groupby(df['TEAM_ID']).shift(1).fillna(2.5)
     
     df = validate_step(df, "REST Features")
     return df
 
+def combine_team_features(rolled_df, rest_df):
+    """Rolling frame plus the REST columns (rest only needs TEAM_ID/GAME_DATE, so it runs separately)."""
+    rest = rest_df[['TEAM_ID','GAME_ID'] + [c for c in REST_COLS if c in rest_df.columns]]
+    return rolled_df.merge(rest, on=['TEAM_ID','GAME_ID'], how='left')
+
 # ============================================================
 # 4. MOMENTUM FEATURES
 # ============================================================
@@ -180,15 +250,12 @@ def calculate_momentum(team_df):
         team_df['MOMENTUM'] = (team_df['W_PCT_L5'] - team_df['W_PCT_L10']).fillna(0)
     
     if 'W_PCT' in team_df.columns:
-        team_df['WIN_INDICATOR'] = (team_df['W_PCT'] > team_df.groupby('TEAM_ID')['W_PCT'].shift(1)).astype(int)
+        prev_w_pct = grouped_shift(team_df, ['W_PCT'], group_col='TEAM_ID', fill_value=None)['W_PCT']
+        team_df['WIN_INDICATOR'] = (team_df['W_PCT'] > prev_w_pct).astype(int)
         
-        def streak_count(s):
-            s=s.fillna(0)
-            groups = (s!=s.shift()).cumsum()
-            streaks = s.groupby(groups).cumcount()+1
-            return (s*streaks).fillna(0)
-        
-        team_df['WIN_STREAK'] = team_df.groupby('TEAM_ID')['WIN_INDICATOR'].apply(streak_count).reset_index(level=0,drop=True)
+        # Run-length kernel: current win run for every team in one pass (0 after a loss)
+        streaks = run_length_streaks(team_df, ['WIN_INDICATOR'], group_col='TEAM_ID')
+        team_df['WIN_STREAK'] = streaks['WIN_INDICATOR_STREAK'].clip(lower=0)
         team_df.drop(columns=['WIN_INDICATOR'], inplace=True)
     
     team_df = validate_step(team_df, "Momentum Features")
@@ -234,20 +301,15 @@ def rebuild_matchup_level(team_df, original_df, pts_data):
 # 6. H2H FEATURES
 # ============================================================
 
-def calculate_h2h(df):
+def calculate_h2h(df, last_n=H2H_LAST_N, last_seasons=H2H_LAST_SEASONS):
     print_section("CALCULATING HEAD-TO-HEAD FEATURES")
     
     df = df.sort_values('GAME_DATE').reset_index(drop=True)
-    df['MATCHUP_ID'] = df.apply(lambda r: tuple(sorted([r['HOME_TEAM_ID'], r['AWAY_TEAM_ID']])), axis=1)
-    df['TEAM_A'] = df['MATCHUP_ID'].apply(lambda m: m[0])
-    df['TEAM_A_WON'] = np.where(df['HOME_TEAM_ID']==df['TEAM_A'], df['HOME_WIN'], 1-df['HOME_WIN'])
     
-    df['PRIOR_A_WINS'] = df.groupby('MATCHUP_ID')['TEAM_A_WON'].cumsum().shift(1).fillna(0)
-    df['H2H_GAMES'] = df.groupby('MATCHUP_ID').cumcount()
-    df['H2H_HOME_WINS'] = np.where(df['HOME_TEAM_ID']==df['TEAM_A'], df['PRIOR_A_WINS'], df['H2H_GAMES']-df['PRIOR_A_WINS'])
-    df['H2H_HOME_WIN_PCT'] = np.where(df['H2H_GAMES']>0, df['H2H_HOME_WINS']/df['H2H_GAMES'],0.5)
+    # Integer pair codes + grouped prefix sums (prior meetings only)
+    h2h = h2h_features(df, last_n=last_n, last_seasons=last_seasons)
+    df = pd.concat([df.drop(columns=h2h.columns, errors='ignore'), h2h], axis=1)
     
-    df.drop(columns=['MATCHUP_ID','TEAM_A','TEAM_A_WON','PRIOR_A_WINS'], inplace=True)
     df = validate_step(df, "H2H Features")
     return df
 
@@ -255,7 +317,7 @@ def calculate_h2h(df):
 # 7. DIFFERENTIALS INCLUDING 4F
 # ============================================================
 
-def create_differentials(df):
+def create_differentials(df, variants=DIFFERENTIAL_VARIANTS):
     print_section("CREATING DIFFERENTIALS (INCLUDING 4F)")
     
     # REST advantage and B2B
@@ -264,17 +326,18 @@ def create_differentials(df):
     if 'HOME_B2B' in df.columns and 'AWAY_B2B' in df.columns:
         df['B2B_DIFF'] = df['HOME_B2B'] - df['AWAY_B2B']
     
-    # All overlapping columns
-    home_features = [c.replace('HOME_','') for c in df.columns if c.startswith('HOME_')]
-    away_features = [c.replace('AWAY_','') for c in df.columns if c.startswith('AWAY_')]
-    common_features = set(home_features) & set(away_features)
+    # All overlapping columns (in HOME column order, so output order is stable)
+    away_features = {c.replace('AWAY_','') for c in df.columns if c.startswith('AWAY_')}
+    common_features = [c.replace('HOME_','') for c in df.columns
+                       if c.startswith('HOME_') and c.replace('HOME_','') in away_features]
     
     # Exclude identifiers, raw box score stats, and PTS (we'll handle PTS separately for spread/total)
     exclude = ['TEAM_ID','TEAM_ABBREVIATION','TEAM_NAME','WL','PTS','FGM','FGA','FG3M','FG3A','FTM','FTA',
                'OREB','DREB','REB','AST','STL','BLK','TOV','PF','PLUS_MINUS','DAYS_REST','B2B']
     
-    for f in [x for x in common_features if x not in exclude]:
-        df[f'{f}_DIFF'] = (df[f'HOME_{f}'] - df[f'AWAY_{f}']).fillna(0)
+    # HOME and AWAY blocks as two matrices, one operation per variant, one concat
+    diffs = build_differentials(df, [x for x in common_features if x not in exclude], variants=variants)
+    df = pd.concat([df.drop(columns=diffs.columns, errors='ignore'), diffs], axis=1)
     
     df = validate_step(df, "Differentials")
     return df
@@ -342,6 +405,13 @@ def convert_to_lowercase(df):
     print(f"✓ Converted {len(df.columns)} column names to lowercase")
     return df
 
+def finalize_features(df):
+    """Spread/total targets, Game 1 filter, target order and lowercase names."""
+    df = add_spread_and_total(df)
+    df = filter_game_1(df)
+    df = reorder_target_variables(df)
+    return convert_to_lowercase(df)
+
 # ============================================================
 # 12. FINAL COLUMN CHECK
 # ============================================================
@@ -357,19 +427,68 @@ def print_all_columns(df):
 # 13. MAIN
 # ============================================================
 
+def feature_dag(cache_dir=None, verbose=True):
+    """
+    The feature pipeline as a FeatureDAG
+    
+    shifted feeds rolling and rest independently, so changing
+    ROLLING_WINDOWS re-runs rolling and everything after it but reuses
+    the cached shift and rest outputs; changing DIFFERENTIAL_VARIANTS
+    only re-runs the last two steps.
+    
+    Args:
+        cache_dir (str): Where step outputs are cached (None = no disk cache)
+        verbose (bool): Print cached/computed per step
+    
+    Returns:
+        FeatureDAG: source (games with stats) -> final feature frame
+    """
+    return FeatureDAG([
+        FeatureStep('games', prepare_games, [SOURCE]),
+        FeatureStep('pts', extract_pts, ['games']),
+        FeatureStep('shifted', shift_team_stats, ['games'], params={'fill_value': 0},
+                    code=[grouped_shift, team_view], consts={'ALL_STAT_COLS': merge_stats.ALL_STAT_COLS}),
+        FeatureStep('rolling', calculate_rolling_features, ['shifted'],
+                    params={'windows': list(ROLLING_WINDOWS)}, code=[rolling_means],
+                    consts={'ROLL_STATS': ROLL_STATS, 'ROLL_RENAMES': ROLL_RENAMES}),
+        FeatureStep('rest', calculate_rest_features, ['shifted']),
+        FeatureStep('team_features', combine_team_features, ['rolling', 'rest'],
+                    consts={'REST_COLS': REST_COLS}),
+        FeatureStep('momentum', calculate_momentum, ['team_features'],
+                    code=[grouped_shift, run_length_streaks]),
+        FeatureStep('matchup', rebuild_matchup_level, ['momentum', 'games', 'pts']),
+        FeatureStep('h2h', calculate_h2h, ['matchup'],
+                    params={'last_n': H2H_LAST_N, 'last_seasons': H2H_LAST_SEASONS}, code=[h2h_features]),
+        FeatureStep('differentials', create_differentials, ['h2h'],
+                    params={'variants': list(DIFFERENTIAL_VARIANTS)}, code=[build_differentials]),
+        FeatureStep('final', finalize_features, ['differentials'],
+                    code=[add_spread_and_total, filter_game_1, reorder_target_variables, convert_to_lowercase]),
+    ], cache_dir=cache_dir, verbose=verbose)
+
+def build_feature_frame(source, cache_dir=None, params=None):
+    """
+    Run every feature step on a games-with-stats dataset
+    
+    Args:
+        source (str | pd.DataFrame): Dataset path or loaded games frame
+        cache_dir (str): Reuse/keep step outputs here (None = compute everything)
+        params (dict): Per-step parameter overrides, e.g. {'rolling': {'windows': [3, 5, 10]}}
+    
+    Returns:
+        pd.DataFrame: Final lowercase feature frame (one row per game)
+    """
+    source = load_typed(source) if isinstance(source, str) else source
+    dag = feature_dag(cache_dir=cache_dir)
+    final_df = dag.run(source, params=params)
+    print(f"\n✓ {dag.summary()}")
+    if cache_dir is not None and CACHE_MAX_AGE_DAYS is not None:
+        removed = dag.prune(max_age_days=CACHE_MAX_AGE_DAYS)
+        if removed:
+            print(f"✓ Pruned {removed} cached outputs unused for {CACHE_MAX_AGE_DAYS} days")
+    return final_df
+
 def main(input_path, output_path):
-    original_df, team_df, pts_data = load_and_shift_stats(input_path)
-    team_df = calculate_rolling_features(team_df)
-    team_df = calculate_rest_features(team_df)
-    team_df = calculate_momentum(team_df)
-    
-    matchup_df = rebuild_matchup_level(team_df, original_df, pts_data)
-    matchup_df = calculate_h2h(matchup_df)
-    final_df = create_differentials(matchup_df)
-    final_df = add_spread_and_total(final_df)
-    final_df = filter_game_1(final_df)
-    final_df = reorder_target_variables(final_df)
-    final_df = convert_to_lowercase(final_df)
+    final_df = build_feature_frame(input_path, cache_dir=CACHE_DIR)
     
     print_all_columns(final_df)
     
@@ -385,8 +504,7 @@ def main(input_path, output_path):
         print(f"TOTAL range: {final_df['total'].min():.1f} - {final_df['total'].max():.1f}")
         print(f"TOTAL mean: {final_df['total'].mean():.1f}")
     
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    final_df.to_csv(output_path, index=False)
+    save_dataset(final_df, output_path, export_csv=EXPORT_CSV)
     print(f"\n✓ Saved final dataset to {output_path}\n")
     
     return final_df
@@ -0,0 +1,305 @@
+"""
+Feature DAG with Content-Hash Caching
+=====================================
+
+Declarative runner for the feature pipeline. Each FeatureStep declares
+its inputs (other steps, or SOURCE for the input frame), its parameters
+and its code; its output is cached on disk under a key hashed from
+
+    step name + code (function source, extra callables, version,
+    module-level constants the code reads) + parameters + the keys of
+    its inputs
+
+Keys chain like a Merkle tree: only the source frame is content-hashed,
+and a change anywhere invalidates exactly the steps downstream of it.
+A run walks back from the target and stops at the first cached step on
+every path, so changing ROLLING_WINDOWS recomputes rolling -> momentum
+-> matchup -> ... but reuses the cached shift and rest frames, and
+changing only the last step loads one cached frame and runs one step.
+
+Function source doesn't include the module-level values a step reads
+(column lists, registries): declare them as consts= so editing one
+invalidates the step like editing its code does.
+
+Step functions receive deep copies of their inputs, so steps that
+modify frames in place can't corrupt a frame another step reuses.
+Cached outputs are never overwritten, only added; prune() removes
+entries that are unused (by mtime - every cache hit touches its file)
+or no longer current (by key).
+
+USAGE:
+    from scripts.feature_engineering.feature_dag import SOURCE, FeatureDAG, FeatureStep
+
+    dag = FeatureDAG([
+        FeatureStep('shifted', shift_team_stats, [SOURCE], params={'fill_value': 0}),
+        FeatureStep('rolling', calculate_rolling_features, ['shifted'], params={'windows': [5, 10]},
+                    consts={'ROLL_STATS': ROLL_STATS}),
+    ], cache_dir='data/cache/features')
+    rolled = dag.run(games, params={'rolling': {'windows': [3, 5, 10]}})
+    print(dag.summary())     # which steps were loaded from cache vs computed
+    dag.prune(max_age_days=30)
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+CACHE_DIR = 'data/cache/features'
+SOURCE = 'source'   # input name of the frame passed to FeatureDAG.run
+
+# ============================================================
+# HASHING
+# ============================================================
+
+def frame_hash(df):
+    """
+    Content hash of a frame: columns, dtypes, index and every value
+
+    Args:
+        df (pd.DataFrame): Frame to hash
+
+    Returns:
+        str: Hex digest
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _code_hash(funcs, version, consts=None):
+    h = hashlib.sha256(str(version).encode())
+    for func in funcs:
+        try:
+            h.update(inspect.getsource(func).encode())
+        except (OSError, TypeError):  # built-ins / lambdas defined at a prompt
+            h.update(getattr(func, '__qualname__', repr(func)).encode())
+    h.update(_params_json(consts or {}).encode())
+    return h.hexdigest()
+
+
+def _params_json(params):
+    """Stable JSON for parameter values (lists, tuples, numpy scalars, None)."""
+    def default(value):
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, (set, frozenset)):
+            return sorted(value)
+        return repr(value)
+    return json.dumps(params, sort_keys=True, default=default)
+
+# ============================================================
+# STEPS
+# ============================================================
+
+class FeatureStep:
+    """
+    One node of the feature DAG
+
+    Args:
+        name (str): Step name (cache files and params overrides use it)
+        func (callable): func(*inputs, **params) -> frame (or any picklable object)
+        inputs (list): Names of upstream steps, or SOURCE
+        params (dict): Keyword arguments for func; part of the cache key
+        code (list): Extra callables whose source is part of the cache key
+            (e.g. the feature_utils kernels func relies on)
+        version (str): Bump to invalidate the cache by hand
+        consts (dict): Module-level values func (or code) reads, e.g.
+            {'REST_COLS': REST_COLS}; hashed into the key, not passed to func
+    """
+
+    def __init__(self, name, func, inputs, params=None, code=(), version=1, consts=None):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.params = dict(params or {})
+        self.code = list(code)
+        self.version = version
+        self.consts = dict(consts or {})
+
+    def code_hash(self):
+        return _code_hash([self.func] + self.code, self.version, self.consts)
+
+    def __repr__(self):
+        return f"FeatureStep({self.name!r}, inputs={self.inputs})"
+
+
+class FeatureDAG:
+    """
+    Runs FeatureSteps in dependency order, reusing cached outputs
+
+    Args:
+        steps (list): FeatureSteps; every input must be SOURCE or an earlier step
+        cache_dir (str): Directory for cached outputs (None = no disk cache)
+        verbose (bool): Print one line per step (cached / computed)
+
+    Raises:
+        ValueError: On duplicate step names or unknown inputs
+    """
+
+    def __init__(self, steps, cache_dir=CACHE_DIR, verbose=True):
+        self.steps = {}
+        for step in steps:
+            if step.name in self.steps or step.name == SOURCE:
+                raise ValueError(f"Duplicate step name: {step.name!r}")
+            unknown = [i for i in step.inputs if i != SOURCE and i not in self.steps]
+            if unknown:
+                raise ValueError(f"Step {step.name!r} has unknown inputs {unknown} "
+                                 f"(inputs must be declared before the step)")
+            self.steps[step.name] = step
+        self.cache_dir = cache_dir
+        self.verbose = verbose
+        self.last_run = {}
+
+    @property
+    def target(self):
+        """The last declared step (the default run target)."""
+        return next(reversed(self.steps))
+
+    def keys(self, source_key, params=None):
+        """
+        Cache key of every step for a source
+
+        Args:
+            source_key (str): Hash of the source frame
+            params (dict): Per-step parameter overrides {step: {param: value}}
+
+        Returns:
+            dict: step name -> hex key
+        """
+        params = params or {}
+        unknown = [name for name in params if name not in self.steps]
+        if unknown:
+            raise ValueError(f"Parameters for unknown steps: {unknown}")
+
+        keys = {SOURCE: source_key}
+        for name, step in self.steps.items():
+            h = hashlib.sha256(name.encode())
+            h.update(step.code_hash().encode())
+            h.update(_params_json({**step.params, **params.get(name, {})}).encode())
+            for input_name in step.inputs:
+                h.update(keys[input_name].encode())
+            keys[name] = h.hexdigest()
+        return keys
+
+    def _path(self, name, key):
+        return os.path.join(self.cache_dir, name, f'{key[:32]}.pkl')
+
+    def _load(self, name, key):
+        """(hit, value) for a cached output."""
+        if self.cache_dir is None:
+            return False, None
+        path = self._path(name, key)
+        if not os.path.exists(path):
+            return False, None
+        try:
+            value = pd.read_pickle(path)
+        except Exception:  # truncated/corrupt entry: recompute it
+            return False, None
+        os.utime(path)
+        return True, value
+
+    def _save(self, name, key, value):
+        if self.cache_dir is None:
+            return
+        path = self._path(name, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        pd.to_pickle(value, tmp_path)
+        os.replace(tmp_path, path)
+
+    def run(self, source, target=None, params=None):
+        """
+        Output of a step, recomputing only steps whose key isn't cached
+
+        Args:
+            source (pd.DataFrame): Input frame (hashed by content)
+            target (str): Step to produce (default: the last step)
+            params (dict): Per-step parameter overrides {step: {param: value}}
+
+        Returns:
+            Output of the target step
+
+        Example:
+            >>> features = dag.run(games, params={'differentials': {'variants': ['DIFF', 'RATIO']}})
+        """
+        target = target or self.target
+        if target not in self.steps:
+            raise ValueError(f"Unknown step: {target!r}")
+        params = params or {}
+        keys = self.keys(frame_hash(source), params)
+        outputs = {SOURCE: source}
+        self.last_run = {}
+
+        def get(name):
+            if name not in outputs:
+                step = self.steps[name]
+                hit, value = self._load(name, keys[name])
+                if hit:
+                    self.last_run[name] = 'cached'
+                else:
+                    inputs = [get(i) for i in step.inputs]
+                    inputs = [v.copy() if isinstance(v, pd.DataFrame) else v for v in inputs]
+                    value = step.func(*inputs, **{**step.params, **params.get(name, {})})
+                    self._save(name, keys[name], value)
+                    self.last_run[name] = 'computed'
+                if self.verbose:
+                    print(f"  {'✓' if self.last_run[name] == 'cached' else '→'} {name}: {self.last_run[name]}")
+                outputs[name] = value
+            return outputs[name]
+
+        return get(target)
+
+    def prune(self, keys=None, max_age_days=None):
+        """
+        Remove cached outputs that are stale or unused
+
+        Args:
+            keys (dict): Current keys (from keys()); every other entry of
+                those steps is removed
+            max_age_days (float): Remove entries not used for this long
+                (a cache hit refreshes the file's mtime)
+
+        Returns:
+            int: Number of files removed
+
+        Example:
+            >>> dag.prune(keys=dag.keys(frame_hash(games)))    # keep only the current outputs
+        """
+        if self.cache_dir is None or not os.path.isdir(self.cache_dir):
+            return 0
+        cutoff = time.time() - max_age_days * 86400 if max_age_days is not None else None
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            step_dir = os.path.join(self.cache_dir, name)
+            if not os.path.isdir(step_dir):
+                continue
+            current = f'{keys[name][:32]}.pkl' if keys and name in keys else None
+            for filename in os.listdir(step_dir):
+                path = os.path.join(step_dir, filename)
+                stale = current is not None and filename != current
+                unused = cutoff is not None and os.path.getmtime(path) < cutoff
+                if stale or unused:
+                    try:
+                        os.remove(path)
+                        removed += 1
+                    except FileNotFoundError:   # removed by a concurrent prune
+                        pass
+        return removed
+
+    def summary(self):
+        """One line: which steps the last run loaded vs computed."""
+        cached = [n for n, s in self.last_run.items() if s == 'cached']
+        computed = [n for n, s in self.last_run.items() if s == 'computed']
+        return (f"feature DAG: {len(computed)} computed ({', '.join(computed) or '-'}), "
+                f"{len(cached)} cached ({', '.join(cached) or '-'})")
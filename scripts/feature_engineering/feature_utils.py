@@ -0,0 +1,463 @@
+"""
+Feature Engineering Kernels
+============================
+
+Vectorized building blocks shared by the feature engineering scripts.
+Each kernel sorts the team-game frame once, works on a 2-D NumPy block
+of stat columns, and returns results aligned to the caller's index, so
+cost grows with the number of rows rather than with the number of
+stats × windows × groupby passes.
+
+USAGE:
+    from scripts.feature_engineering.feature_utils import build_differentials, grouped_shift, rolling_means
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+# GROUP ORDERING
+# ============================================================
+
+def _group_order(df, group_col, order_col=None):
+    """
+    Sort positions by (group, order) once.
+
+    Args:
+        df (pd.DataFrame): Team-game frame
+        group_col (str or list): Grouping column(s) (e.g., 'TEAM_ID')
+        order_col (str): Column defining order inside a group; None keeps row order
+
+    Returns:
+        tuple: (order, group_start) where order are row positions sorted
+               by group and group_start[i] is the sorted position of the
+               first row of the group containing sorted row i
+    """
+    group_cols = [group_col] if isinstance(group_col, str) else list(group_col)
+    codes = [pd.factorize(df[c])[0] for c in group_cols]
+    keys = [np.arange(len(df))]
+    if order_col is not None:
+        keys.append(pd.factorize(df[order_col], sort=True)[0])
+    order = np.lexsort(keys + codes[::-1])
+
+    sorted_codes = np.column_stack([c[order] for c in codes])
+    new_group = np.ones(len(order), dtype=bool)
+    new_group[1:] = (sorted_codes[1:] != sorted_codes[:-1]).any(axis=1)
+    group_start = np.maximum.accumulate(np.where(new_group, np.arange(len(order)), 0))
+    return order, group_start
+
+
+def _group_end(group_start):
+    """Sorted position of the last row of each row's group."""
+    n_rows = len(group_start)
+    last = np.ones(n_rows, dtype=bool)
+    last[:-1] = group_start[1:] != group_start[:-1]
+    ends = np.where(last, np.arange(n_rows), n_rows)
+    return np.minimum.accumulate(ends[::-1])[::-1]
+
+
+# ============================================================
+# SHIFTING
+# ============================================================
+
+def grouped_shift(df, cols, group_col='TEAM_ID', periods=1, fill_value=0):
+    """
+    Shift a whole block of columns within groups in one operation.
+
+    Equivalent to df.groupby(group_col)[col].shift(periods) for every
+    column, but the group indexer is built once and applied to each
+    dtype block with a single take.
+
+    Args:
+        df (pd.DataFrame): Team-game frame, already in game order per group
+        cols (list): Columns to shift
+        group_col (str): Grouping column (default: 'TEAM_ID')
+        periods (int): Rows to shift (positive = previous games)
+        fill_value: Value for rows with no source row; None keeps NaN
+
+    Returns:
+        pd.DataFrame: Shifted columns aligned to df.index. Dtypes are
+                      preserved when fill_value is given; integer and
+                      bool columns become float64 when fill_value is None.
+
+    Example:
+        >>> prior = grouped_shift(team_df, ['OFF_RATING', 'GP'], fill_value=None)
+    """
+    n_rows = len(df)
+    order, group_start = _group_order(df, group_col)
+    group_end = _group_end(group_start)
+
+    # Source row (original position) for every row, -1 when outside the group
+    source_sorted = np.arange(n_rows) - periods
+    in_group = (source_sorted >= group_start) & (source_sorted <= group_end)
+    source = np.full(n_rows, -1)
+    source[order] = np.where(in_group, order[np.clip(source_sorted, 0, max(n_rows - 1, 0))], -1)
+    missing = source < 0
+
+    block = df[cols]
+    shifted = {}
+    for dtype in block.dtypes.unique():
+        block_cols = [c for c in cols if block[c].dtype == dtype]
+        taken = block[block_cols].to_numpy()[np.maximum(source, 0)]
+        if missing.any():
+            if fill_value is not None:
+                taken[missing] = fill_value
+            elif taken.dtype.kind in 'mM':
+                taken[missing] = np.datetime64('NaT') if taken.dtype.kind == 'M' else np.timedelta64('NaT')
+            else:
+                if taken.dtype.kind in 'iub':
+                    taken = taken.astype(np.float64)
+                taken[missing] = np.nan
+        shifted.update(zip(block_cols, taken.T))
+
+    return pd.DataFrame(shifted, index=df.index, columns=cols)
+
+
+# ============================================================
+# ROLLING WINDOWS
+# ============================================================
+
+def rolling_means(df, stats, windows, group_col='TEAM_ID', order_col='GAME_DATE', min_periods=1):
+    """
+    Per-group rolling means for many stats and windows in one pass.
+
+    Equivalent to running, for every stat and window,
+    df.groupby(group_col)[stat].rolling(window, min_periods).mean()
+    (NaN values are skipped and do not count toward min_periods).
+
+    Args:
+        df (pd.DataFrame): Team-game frame
+        stats (list): Stat columns to roll
+        windows (list): Window lengths (e.g., [3, 5, 10, 20])
+        group_col (str): Grouping column (default: 'TEAM_ID')
+        order_col (str): Column defining game order (default: 'GAME_DATE')
+        min_periods (int): Minimum non-NaN values per window
+
+    Returns:
+        pd.DataFrame: Columns '{stat}_L{window}' aligned to df.index
+
+    Example:
+        >>> rolled = rolling_means(team_df, ['NET_RATING', 'PACE'], [5, 10])
+        >>> rolled.columns.tolist()
+        ['NET_RATING_L5', 'NET_RATING_L10', 'PACE_L5', 'PACE_L10']
+    """
+    n_rows = len(df)
+    order, group_start = _group_order(df, group_col, order_col)
+
+    values = df[stats].to_numpy(dtype=np.float64)[order]
+    valid = ~np.isnan(values)
+
+    # Center each column before summing to keep cumulative sums small
+    center = np.nanmean(values, axis=0) if n_rows else np.zeros(len(stats))
+    center = np.nan_to_num(center)
+    centered = np.where(valid, values - center, 0.0)
+
+    # One cumulative-sum pass over the whole block (row 0 = empty prefix)
+    csum = np.zeros((n_rows + 1, len(stats)))
+    ccount = np.zeros((n_rows + 1, len(stats)))
+    np.cumsum(centered, axis=0, out=csum[1:])
+    np.cumsum(valid, axis=0, out=ccount[1:])
+
+    positions = np.arange(n_rows)
+    out = np.empty((n_rows, len(stats), len(windows)))
+    for j, window in enumerate(windows):
+        lower = np.maximum(positions - window + 1, group_start)
+        counts = ccount[positions + 1] - ccount[lower]
+        sums = csum[positions + 1] - csum[lower]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts + center
+        out[order, :, j] = np.where(counts >= min_periods, means, np.nan)
+
+    columns = [f'{stat}_L{window}' for stat in stats for window in windows]
+    return pd.DataFrame(out.reshape(n_rows, -1), index=df.index, columns=columns)
+
+
+def exponential_weights(window):
+    """Weights exp(-1)..exp(0) from oldest to newest game in the window."""
+    return np.exp(np.linspace(-1, 0, window))
+
+
+def weighted_rolling_means(df, stats, windows, group_col='TEAM_ID', order_col=None,
+                           weights=exponential_weights, min_periods=1):
+    """
+    Per-group weighted rolling means for many stats and windows in one call.
+
+    NaN values are skipped and the newest weights are given to the valid
+    values that remain: in a window [a, NaN, c] with weights [w0, w1, w2],
+    c gets w2 and a gets w1. Windows never cross group boundaries.
+
+    Args:
+        df (pd.DataFrame): Team-game frame
+        stats (list): Stat columns to roll
+        windows (list): Window lengths (e.g., [3, 5, 10, 20])
+        group_col (str or list): Grouping column(s) (e.g., ['TEAM_ID', 'SEASON'])
+        order_col (str): Column defining game order; None keeps row order
+        weights (callable or None): window -> array of weights, oldest to
+                                    newest; None gives a plain mean
+        min_periods (int): Minimum non-NaN values per window
+
+    Returns:
+        pd.DataFrame: Columns '{stat}_R{window}' (window-major order)
+                      aligned to df.index
+
+    Example:
+        >>> rolled = weighted_rolling_means(df, ['HOME_PTS'], [3, 5], group_col=['HOME_TEAM_ID', 'SEASON'])
+    """
+    n_rows = len(df)
+    order, group_start = _group_order(df, group_col, order_col)
+
+    values = df[stats].to_numpy(dtype=np.float64)[order]
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+
+    # Valid-count prefix (row 0 = empty) to rank values from the newest one
+    cvalid = np.zeros((n_rows + 1, len(stats)), dtype=np.int64)
+    np.cumsum(valid, axis=0, out=cvalid[1:])
+
+    positions = np.arange(n_rows)
+    columns = {}
+    for window in windows:
+        w = np.ones(window) if weights is None else np.asarray(weights(window), dtype=np.float64)
+        numerator = np.zeros((n_rows, len(stats)))
+        denominator = np.zeros((n_rows, len(stats)))
+        counts = np.zeros((n_rows, len(stats)), dtype=np.int64)
+
+        # Walk back through the window one lag at a time over the whole block
+        for lag in range(window):
+            source = positions - lag
+            in_window = (source >= group_start)[:, None]
+            source = np.maximum(source, 0)
+            use = valid[source] & in_window
+            rank = cvalid[positions + 1] - cvalid[source]        # valid values in [source, current]
+            lag_weight = w[np.clip(window - rank, 0, window - 1)]
+            numerator += np.where(use, filled[source] * lag_weight, 0.0)
+            denominator += np.where(use, lag_weight, 0.0)
+            counts += use
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts >= min_periods, numerator / denominator, np.nan)
+        unsorted = np.empty_like(means)
+        unsorted[order] = means
+        for j, stat in enumerate(stats):
+            columns[f'{stat}_R{window}'] = unsorted[:, j]
+
+    return pd.DataFrame(columns, index=df.index)
+
+
+# ============================================================
+# STREAKS
+# ============================================================
+
+def run_length_streaks(df, cols, group_col='TEAM_ID', order_col=None):
+    """
+    Run-length streaks of binary indicators for all groups in one pass.
+
+    For each indicator column (1 = event, 0 = no event, NaN counted as 0),
+    e.g. a win flag, a back-to-back flag or a cover flag:
+    - {col}_STREAK: signed current run including this row
+                    (+3 = third 1 in a row, -2 = second 0 in a row)
+    - {col}_STREAK_PRIOR: signed run before this row (0 for a group's first row)
+    - {col}_LONGEST: longest run of 1s in the group up to and including this row
+
+    Args:
+        df (pd.DataFrame): Team-game frame
+        cols (list): Binary indicator columns
+        group_col (str or list): Grouping column(s) (default: 'TEAM_ID')
+        order_col (str): Column defining game order; None keeps row order
+
+    Returns:
+        pd.DataFrame: int64 streak columns aligned to df.index
+
+    Example:
+        >>> streaks = run_length_streaks(team_df, ['WIN_INDICATOR', 'B2B'])
+        >>> team_df['WIN_STREAK'] = streaks['WIN_INDICATOR_STREAK'].clip(lower=0)
+    """
+    n_rows = len(df)
+    order, group_start = _group_order(df, group_col, order_col)
+    positions = np.arange(n_rows)
+    first_in_group = (group_start == positions)[:, None]
+
+    values = np.nan_to_num(df[cols].to_numpy(dtype=np.float64)[order]) != 0
+
+    # A run starts at a group's first row or wherever the indicator flips
+    run_start = np.ones(values.shape, dtype=bool)
+    run_start[1:] = values[1:] != values[:-1]
+    run_start |= first_in_group
+    start_position = np.maximum.accumulate(np.where(run_start, positions[:, None], 0), axis=0)
+    run_length = positions[:, None] - start_position + 1
+    signed = np.where(values, run_length, -run_length)
+
+    prior = np.zeros_like(signed)
+    prior[1:] = signed[:-1]
+    prior[np.broadcast_to(first_in_group, prior.shape)] = 0
+
+    # Grouped running max: offset each group above the previous one
+    group_id = np.cumsum(first_in_group[:, 0]) - 1
+    offset = (group_id * (n_rows + 1))[:, None]
+    longest = np.maximum.accumulate(np.where(values, run_length, 0) + offset, axis=0) - offset
+
+    result = {}
+    for j, col in enumerate(cols):
+        for name, block in [('STREAK', signed), ('STREAK_PRIOR', prior), ('LONGEST', longest)]:
+            column = np.empty(n_rows, dtype=np.int64)
+            column[order] = block[:, j]
+            result[f'{col}_{name}'] = column
+    return pd.DataFrame(result, index=df.index)
+
+
+# ============================================================
+# HEAD-TO-HEAD
+# ============================================================
+
+def matchup_codes(home_ids, away_ids, registry=None):
+    """
+    Integer code per unordered team pair (same code for A@B and B@A).
+
+    Args:
+        home_ids, away_ids (array-like): Team ids per game
+        registry (TeamRegistry): Optional; when every id is registered its
+                                 dense codes are used instead of factorizing
+
+    Returns:
+        tuple: (pair_codes, home_is_low) where home_is_low marks rows whose
+               home team has the lower dense team code in the pair
+    """
+    all_ids = np.concatenate([np.asarray(home_ids), np.asarray(away_ids)])
+    team_codes = registry.codes(all_ids) if registry is not None else None
+    if team_codes is not None and (team_codes >= 0).all():
+        n_teams = len(registry)
+    else:
+        team_codes, _ = pd.factorize(all_ids)
+        n_teams = team_codes.max() + 1 if len(team_codes) else 1
+    home_codes, away_codes = np.split(team_codes.astype(np.int64), 2)
+    low = np.minimum(home_codes, away_codes)
+    high = np.maximum(home_codes, away_codes)
+    return low * n_teams + high, home_codes == low
+
+
+def h2h_features(df, last_n=None, last_seasons=None, home_col='HOME_TEAM_ID', away_col='AWAY_TEAM_ID',
+                 win_col='HOME_WIN', date_col='GAME_DATE', season_col='SEASON', prefix='H2H',
+                 registry=None):
+    """
+    Head-to-head history before each game, from integer pair codes.
+
+    Counts only earlier meetings of the same two teams (either venue).
+
+    Args:
+        df (pd.DataFrame): Matchup-format games
+        last_n (int): Only count the last N meetings (None = all)
+        last_seasons (int): Only count meetings from the current and
+                            previous last_seasons - 1 seasons (None = all)
+        home_col, away_col, win_col, date_col, season_col (str): Column names
+        prefix (str): Output column prefix
+        registry (TeamRegistry): Optional dense team codes (see matchup_codes)
+
+    Returns:
+        pd.DataFrame: {prefix}_GAMES, {prefix}_HOME_WINS (meetings won by
+                      tonight's home team), {prefix}_HOME_WIN_PCT (0.5 when
+                      no meetings), aligned to df.index
+
+    Example:
+        >>> recent = h2h_features(games, last_n=4, prefix='H2H_L4')
+    """
+    n_rows = len(df)
+    pair, home_is_low = matchup_codes(df[home_col].to_numpy(), df[away_col].to_numpy(), registry)
+    keys = pd.DataFrame({'PAIR': pair, 'DATE': df[date_col].to_numpy()})
+    order, group_start = _group_order(keys, 'PAIR', 'DATE')
+
+    # Wins by the lower-coded team of the pair, prefix-summed in meeting order
+    home_win = df[win_col].to_numpy(dtype=np.float64)
+    low_won = np.where(home_is_low, home_win, 1 - home_win)[order]
+    cwins = np.zeros(n_rows + 1)
+    np.cumsum(low_won, out=cwins[1:])
+
+    positions = np.arange(n_rows)
+    lower = group_start.copy()
+    if last_n is not None:
+        lower = np.maximum(lower, positions - last_n)
+    if last_seasons is not None:
+        season_rank = pd.factorize(df[season_col], sort=True)[0][order].astype(np.int64)
+        n_seasons = season_rank.max() + 2 if n_rows else 1
+        group_id = np.cumsum(group_start == positions) - 1    # ascending in sorted order
+        season_key = group_id * n_seasons + season_rank
+        first_kept = group_id * n_seasons + np.maximum(season_rank - last_seasons + 1, 0)
+        lower = np.maximum(lower, np.searchsorted(season_key, first_kept, side='left'))
+    lower = np.minimum(lower, positions)
+
+    games = positions - lower
+    low_wins = cwins[positions] - cwins[lower]
+    home_is_low_sorted = home_is_low[order]
+    home_wins = np.where(home_is_low_sorted, low_wins, games - low_wins)
+
+    result = pd.DataFrame(index=df.index)
+    result[f'{prefix}_GAMES'] = np.empty(n_rows, dtype=np.int64)
+    result[f'{prefix}_HOME_WINS'] = np.empty(n_rows)
+    result.iloc[order, 0] = games
+    result.iloc[order, 1] = home_wins
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result[f'{prefix}_HOME_WIN_PCT'] = np.where(
+            result[f'{prefix}_GAMES'] > 0,
+            result[f'{prefix}_HOME_WINS'] / result[f'{prefix}_GAMES'],
+            0.5,
+        )
+    return result
+
+
+# ============================================================
+# DIFFERENTIALS
+# ============================================================
+
+DIFFERENTIAL_OPS = {
+    'DIFF': np.subtract,
+    'RATIO': np.divide,
+    'SUM': np.add,
+}
+
+
+def build_differentials(df, features, variants=('DIFF',), home_prefix='HOME_', away_prefix='AWAY_', fill_value=0):
+    """
+    HOME vs AWAY differentials for many features as one block operation.
+
+    The HOME_ and AWAY_ columns are pulled into two aligned matrices and
+    each variant is a single NumPy operation over the whole block.
+
+    Args:
+        df (pd.DataFrame): Matchup-format frame
+        features (list): Feature stems present as HOME_{f} and AWAY_{f}
+        variants (tuple): Any of 'DIFF' (home - away), 'RATIO' (home / away)
+                          and 'SUM' (home + away)
+        home_prefix, away_prefix (str): Column prefixes
+        fill_value: Replacement for NaN/inf results; None keeps them
+
+    Returns:
+        pd.DataFrame: Columns '{f}_{variant}' (variant-major order) aligned to df.index
+
+    Example:
+        >>> diffs = build_differentials(df, ['NET_RATING', 'PACE'], variants=('DIFF', 'RATIO'))
+    """
+    unknown = [v for v in variants if v not in DIFFERENTIAL_OPS]
+    if unknown:
+        raise ValueError(f"Unknown differential variants: {unknown} (expected {list(DIFFERENTIAL_OPS)})")
+
+    n_rows, n_features = len(df), len(features)
+
+    # Two aligned matrices, filled column by column to avoid intermediate frames
+    home = np.empty((n_rows, n_features))
+    away = np.empty((n_rows, n_features))
+    for j, f in enumerate(features):
+        home[:, j] = df[f'{home_prefix}{f}'].to_numpy(dtype=np.float64)
+        away[:, j] = df[f'{away_prefix}{f}'].to_numpy(dtype=np.float64)
+
+    # Every variant written straight into one output block
+    values = np.empty((n_rows, n_features * len(variants)))
+    columns = []
+    for i, variant in enumerate(variants):
+        block = values[:, i * n_features:(i + 1) * n_features]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            DIFFERENTIAL_OPS[variant](home, away, out=block)
+        if fill_value is not None:
+            block[~np.isfinite(block)] = fill_value
+        columns.extend(f'{f}_{variant}' for f in features)
+
+    return pd.DataFrame(values, index=df.index, columns=columns)
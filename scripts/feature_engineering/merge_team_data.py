@@ -9,15 +9,69 @@ Output: nba_team_game_data.csv (7,880 rows - one per team per game)
 
 import pandas as pd
 import numpy as np
+import os
+import sys
 
-def merge_team_data(games_file, stats_file, output_file):
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scripts.data_collection.schema import flatten_columns, load_typed
+from scripts.data_collection.storage import dataset_columns
+
+# Useless columns (dropped at read time where possible, otherwise after the merge)
+COLUMNS_TO_DROP = [
+    # All rank columns (use actual values instead)
+    'GP_RANK', 'W_RANK', 'L_RANK', 'W_PCT_RANK', 'MIN_RANK',
+    'OFF_RATING_RANK', 'DEF_RATING_RANK', 'NET_RATING_RANK',
+    'AST_PCT_RANK', 'AST_TO_RANK', 'AST_RATIO_RANK',
+    'DREB_PCT_RANK', 'REB_PCT_RANK', 'TS_PCT_RANK',
+    'PACE_RANK', 'PIE_RANK',
+    'EFG_PCT_RANK_FF', 'FTA_RATE_RANK', 'TM_TOV_PCT_RANK_FF', 'OREB_PCT_RANK_FF',
+    'OPP_EFG_PCT_RANK', 'OPP_FTA_RATE_RANK', 'OPP_TOV_PCT_RANK', 'OPP_OREB_PCT_RANK',
+    
+    # Duplicates (will have _game and _stats suffixes after merge)
+    'SEASON_ID',  # Use SEASON instead
+    'MIN_game',   # Always 240, not useful
+]
+MERGE_KEYS = ['TEAM_ID', 'GAME_DATE']
+
+
+def stats_read_columns(stats_columns, games_columns, stat_columns=None):
+    """
+    Stats columns worth reading: merge keys plus everything that survives the merge
+    
+    Ranks, SEASON_ID and the stats copies of TEAM_NAME/SEASON (dropped in
+    favour of the games' copies) are never read. With a stat_columns
+    registry only the registered stats are kept.
+    
+    Args:
+        stats_columns: Columns of the stats dataset
+        games_columns: Columns of the games dataset
+        stat_columns: Optional registry (list or {group: [columns]}) of stats to keep
+    
+    Returns:
+        list: Columns to read, in dataset order
+    """
+    duplicates = {'TEAM_NAME', 'SEASON'} & set(games_columns)
+    keep = None if stat_columns is None else set(MERGE_KEYS + flatten_columns(stat_columns))
+    return [col for col in stats_columns
+            if col not in COLUMNS_TO_DROP and col not in duplicates
+            and not (col.endswith('_RANK') or col.endswith('_RANK_FF'))
+            and (keep is None or col in keep)]
+
+
+def merge_team_data(games_file, stats_file, output_file, stat_columns=None):
     """
     Merge games and lagged stats, drop useless columns.
     
+    Both files are read projected and typed: columns that would be
+    dropped after the merge are never parsed.
+    
     Args:
         games_file: Path to games CSV
         stats_file: Path to lagged stats CSV
         output_file: Path for merged output
+        stat_columns: Optional registry of stat columns to keep
+                      (e.g. 01_merge_stats.STAT_COLUMNS; default: all)
     """
     print("=" * 80)
     print("STEP 2: MERGING GAMES + LAGGED STATS")
@@ -25,27 +79,19 @@ def merge_team_data(games_file, stats_file, output_file):
     
     # Load data
     print("\n1. Loading data...")
-    games_df = pd.read_csv(games_file)
-    stats_df = pd.read_csv(stats_file)
+    stats_columns = stats_read_columns(dataset_columns(stats_file), dataset_columns(games_file), stat_columns)
+    # The games' MIN is dropped after the merge whenever the stats have one (MIN_game)
+    games_columns = [col for col in dataset_columns(games_file)
+                     if col != 'SEASON_ID' and not (col == 'MIN' and 'MIN' in stats_columns)]
+    registered = set(flatten_columns(stat_columns))
+    games_df = load_typed(games_file, columns=games_columns)
+    stats_df = load_typed(stats_file, columns=[col for col in stats_columns if col not in registered],
+                          stat_columns=[col for col in stats_columns if col in registered])
+    if 'MIN' in stats_columns:
+        stats_df = stats_df.rename(columns={'MIN': 'MIN_stats'})  # renamed to MIN_SEASON below
     print(f"   ✓ Games: {len(games_df):,} rows, {len(games_df.columns)} columns")
     print(f"   ✓ Stats: {len(stats_df):,} rows, {len(stats_df.columns)} columns")
     
-    # Define useless columns to drop AFTER merge
-    columns_to_drop = [
-        # All rank columns (use actual values instead)
-        'GP_RANK', 'W_RANK', 'L_RANK', 'W_PCT_RANK', 'MIN_RANK',
-        'OFF_RATING_RANK', 'DEF_RATING_RANK', 'NET_RATING_RANK',
-        'AST_PCT_RANK', 'AST_TO_RANK', 'AST_RATIO_RANK',
-        'DREB_PCT_RANK', 'REB_PCT_RANK', 'TS_PCT_RANK',
-        'PACE_RANK', 'PIE_RANK',
-        'EFG_PCT_RANK_FF', 'FTA_RATE_RANK', 'TM_TOV_PCT_RANK_FF', 'OREB_PCT_RANK_FF',
-        'OPP_EFG_PCT_RANK', 'OPP_FTA_RATE_RANK', 'OPP_TOV_PCT_RANK', 'OPP_OREB_PCT_RANK',
-        
-        # Duplicates (will have _game and _stats suffixes after merge)
-        'SEASON_ID',  # Use SEASON instead
-        'MIN_game',   # Always 240, not useful
-    ]
-    
     # Merge on TEAM_ID and GAME_DATE
     print("\n2. Merging on TEAM_ID + GAME_DATE...")
     merged_df = pd.merge(
@@ -62,7 +108,7 @@ def merge_team_data(games_file, stats_file, output_file):
     
     # Drop useless columns that exist
     print("\n3. Dropping useless columns...")
-    cols_to_drop_existing = [col for col in columns_to_drop if col in merged_df.columns]
+    cols_to_drop_existing = [col for col in COLUMNS_TO_DROP if col in merged_df.columns]
     
     # Also drop duplicate name/season columns, keep _game version
     if 'TEAM_NAME_stats' in merged_df.columns:
@@ -0,0 +1,375 @@
+"""
+Incremental Team-State Feature Store
+====================================
+
+Every feature 02_nba_feature_engineering.py builds for a game is a
+function of a small state per team and per matchup pair:
+
+    shifted stats      <- the team's last game (0 before its first)
+    L5/L10 rolling     <- ring buffer of the last max(window) - 1 shifted rows
+    DAYS_REST, B2B     <- last game date
+    B2B_IN_L5/L10,     <- ring buffers of the last 10 B2B flags / rest days
+    AVG_REST_L10
+    WIN_STREAK         <- last shifted W_PCT + streak counter
+    H2H                <- meetings of the pair (season, winner)
+
+TeamStateStore keeps that state on disk. advance(day_of_games) folds a
+day's completed games into it in O(games that day), and features(slate)
+emits the feature rows of upcoming games from the state alone - the
+same rows (minus the targets) the full batch rebuild would produce,
+without rereading any history.
+
+Matchup assembly (column layout, differentials, lowercase names) reuses
+the 02 script's own step functions on the slate, so the two paths can't
+drift apart. Slate rows include each team's first home game of a
+season, which the batch training frame filters out (filter_game_1).
+
+USAGE:
+    from scripts.feature_engineering.team_state import TeamStateStore
+
+    store = TeamStateStore.from_history(games_with_stats)     # once
+    store.save()
+
+    store = TeamStateStore.load()                             # each day
+    tonight = store.advance(yesterdays_games, next_slate=todays_schedule)
+    store.save()
+"""
+
+import importlib.util
+import os
+import sys
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+
+def _load_script(name, filename):
+    """Import a pipeline script whose filename starts with a digit."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(os.path.dirname(__file__), filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+feature_engineering = _load_script('nba_feature_engineering', '02_nba_feature_engineering.py')
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+STATE_FILE = 'data/processed/nba/team_state.pkl'
+
+REST_HISTORY = 10     # B2B_IN_L10 / AVG_REST_L10 look back 10 games
+FIRST_DAYS_REST = 3   # DAYS_REST of a team's first game
+FIRST_AVG_REST = 2.5  # AVG_REST_L10 before a team's first game
+
+TARGET_COLS = ['HOME_WIN', 'HOME_PTS', 'AWAY_PTS', 'SPREAD', 'TOTAL']
+
+# ============================================================
+# STATE
+# ============================================================
+
+class TeamState:
+    """
+    Rolling state of one team (everything its next game's features need)
+
+    Args:
+        roll_history (int): Shifted rows kept for the rolling windows
+    """
+
+    def __init__(self, roll_history):
+        self.last_values = None                   # last game's stats, NaN -> 0 (next game's shifted row)
+        self.last_date = None
+        self.roll = deque(maxlen=roll_history)    # shifted ROLL_STATS rows of past games
+        self.last_w_pct = None                    # shifted W_PCT of the last game
+        self.streak = 0                           # WIN_STREAK of the last game
+        self.rest = deque(maxlen=REST_HISTORY)    # DAYS_REST of past games
+        self.b2b = deque(maxlen=REST_HISTORY)     # B2B of past games
+
+
+class TeamStateStore:
+    """
+    Per-team and per-pair feature state, advanced one game day at a time
+
+    Args:
+        windows (list): Rolling windows (default: ROLLING_WINDOWS)
+        h2h_last_n (int): H2H over the last N meetings (default: H2H_LAST_N)
+        h2h_last_seasons (int): H2H over the last N seasons (default: H2H_LAST_SEASONS)
+        variants (list): Differential variants (default: DIFFERENTIAL_VARIANTS)
+
+    Example:
+        >>> store = TeamStateStore.from_history(history)
+        >>> rows = store.features(schedule)          # pre-game features, no state change
+        >>> store.advance(results)                   # results of those games
+    """
+
+    def __init__(self, windows=None, h2h_last_n=None, h2h_last_seasons=None, variants=None):
+        fe = feature_engineering
+        self.windows = list(windows or fe.ROLLING_WINDOWS)
+        self.h2h_last_n = fe.H2H_LAST_N if h2h_last_n is None else h2h_last_n
+        self.h2h_last_seasons = fe.H2H_LAST_SEASONS if h2h_last_seasons is None else h2h_last_seasons
+        self.variants = list(variants or fe.DIFFERENTIAL_VARIANTS)
+
+        self.teams = {}       # TEAM_ID -> TeamState
+        self.pairs = {}       # (low TEAM_ID, high TEAM_ID) -> [(SEASON, winner TEAM_ID), ...]
+        self.seasons = set()
+        self.last_date = None
+        self.n_games = 0
+
+        # Fixed by the first advance()
+        self.stat_cols = None
+        self.stat_dtypes = None
+        self.prior_mask = None
+        self.roll_stats = None
+
+    # ------------------------------------------------------------
+    # Construction / persistence
+    # ------------------------------------------------------------
+
+    @classmethod
+    def from_history(cls, games, **kwargs):
+        """
+        Store holding the state after every game in a games-with-stats frame
+
+        Args:
+            games (pd.DataFrame): Matchup-format games with stats (any number of dates)
+            **kwargs: TeamStateStore options
+
+        Returns:
+            TeamStateStore
+        """
+        store = cls(**kwargs)
+        store.advance(games)
+        return store
+
+    def save(self, path=STATE_FILE):
+        """Write the store (atomically) to a pickle file."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        pd.to_pickle(self, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=STATE_FILE):
+        """Read a store written by save()."""
+        store = pd.read_pickle(path)
+        if not isinstance(store, cls):
+            raise ValueError(f"{path} does not hold a {cls.__name__}")
+        return store
+
+    def summary(self):
+        """One line: teams, pairs and games folded in."""
+        last = self.last_date.date() if self.last_date is not None else '-'
+        return (f"team state: {len(self.teams)} teams, {len(self.pairs)} pairs, "
+                f"{self.n_games:,} games through {last}")
+
+    # ------------------------------------------------------------
+    # Per-team kernels
+    # ------------------------------------------------------------
+
+    def _team_view(self, games):
+        """Team rows of matchup games, stat columns named as in the rolling step."""
+        view, stat_cols, prior_cols = feature_engineering.team_view(games)
+        renames = feature_engineering.ROLL_RENAMES
+        view = view.rename(columns=renames)
+        stat_cols = [renames.get(c, c) for c in stat_cols]
+        prior_cols = [renames.get(c, c) for c in prior_cols]
+
+        if self.stat_cols is None:
+            self.stat_cols = stat_cols
+            self.stat_dtypes = view[stat_cols].dtypes.to_dict()
+            self.prior_mask = np.isin(stat_cols, prior_cols)
+            self.roll_stats = [s for s in feature_engineering.ROLL_STATS if s in stat_cols]
+            self._roll_idx = [stat_cols.index(s) for s in self.roll_stats]
+            self._w_pct_idx = stat_cols.index('W_PCT') if 'W_PCT' in stat_cols else None
+
+        # Upcoming games carry no box scores (only as-of stats, when merged as-of)
+        values = view.reindex(columns=self.stat_cols).to_numpy(dtype=np.float64)
+        return view, values
+
+    def _shifted(self, team, values):
+        """The shifted stat row of a team's next game (values: that game's own row)."""
+        shifted = team.last_values if team.last_values is not None else np.zeros(len(self.stat_cols))
+        if self.prior_mask.any():
+            shifted = np.where(self.prior_mask, np.nan_to_num(values, nan=0.0), shifted)
+        return shifted
+
+    def _next_game(self, team, date, shifted):
+        """
+        Rolling, rest and momentum features of a team's next game
+
+        Returns:
+            tuple: (rolling means [n_roll_stats x n_windows], rest tuple in
+                    REST_COLS order, WIN_INDICATOR, WIN_STREAK)
+        """
+        current = shifted[self._roll_idx]
+        past = list(team.roll)
+        rolled = np.empty((len(current), len(self.windows)))
+        for j, window in enumerate(self.windows):
+            rows = past[len(past) - min(window - 1, len(past)):] + [current]
+            rolled[:, j] = np.mean(rows, axis=0)
+
+        days_rest = float((date - team.last_date).days) if team.last_date is not None else float(FIRST_DAYS_REST)
+        b2b = list(team.b2b)
+        rest = (days_rest, int(days_rest == 1), int(2 <= days_rest <= 3), int(days_rest >= 4),
+                float(sum(b2b[-5:])), float(sum(b2b)),
+                float(np.mean(team.rest)) if team.rest else FIRST_AVG_REST)
+
+        indicator = streak = 0
+        if self._w_pct_idx is not None:
+            indicator = int(team.last_w_pct is not None and shifted[self._w_pct_idx] > team.last_w_pct)
+            streak = team.streak + 1 if indicator else 0
+        return rolled, rest, indicator, streak
+
+    # ------------------------------------------------------------
+    # Advance (completed games) / features (upcoming games)
+    # ------------------------------------------------------------
+
+    def advance(self, day_of_games, next_slate=None):
+        """
+        Fold completed games into the state
+
+        Work is proportional to the number of games passed in, not to the
+        history behind them. Games must be later than everything already
+        folded in (a game day is advanced once).
+
+        Args:
+            day_of_games (pd.DataFrame): Completed matchup games with stats
+                (one day, or several in date order - e.g. the whole history)
+            next_slate (pd.DataFrame): Optional upcoming games to featurize
+                after the update
+
+        Returns:
+            pd.DataFrame: features(next_slate), or None without a slate
+
+        Raises:
+            ValueError: If a game is on or before the last date advanced
+        """
+        if day_of_games.empty:
+            return self.features(next_slate) if next_slate is not None else None
+
+        games = day_of_games.assign(GAME_DATE=pd.to_datetime(day_of_games['GAME_DATE']))
+        games = games.sort_values('GAME_DATE', kind='stable')
+        if self.last_date is not None and games['GAME_DATE'].iloc[0] <= self.last_date:
+            raise ValueError(f"Games on {games['GAME_DATE'].iloc[0].date()} are not after the last "
+                             f"advanced date {self.last_date.date()}")
+
+        view, values = self._team_view(games)
+        order = np.lexsort((view['TEAM_ID'].to_numpy(), view['GAME_DATE'].to_numpy()))
+        team_ids = view['TEAM_ID'].to_numpy()[order]
+        dates = view['GAME_DATE'].to_numpy()[order]
+        values = values[order]
+        roll_history = max(self.windows) - 1
+
+        for team_id, date, row in zip(team_ids, pd.DatetimeIndex(dates), values):
+            team = self.teams.get(team_id)
+            if team is None:
+                team = self.teams[team_id] = TeamState(roll_history)
+            shifted = self._shifted(team, row)
+            _, rest, _, streak = self._next_game(team, date, shifted)
+
+            team.roll.append(shifted[self._roll_idx])
+            if self._w_pct_idx is not None:
+                team.last_w_pct = shifted[self._w_pct_idx]
+                team.streak = streak
+            team.rest.append(rest[0])
+            team.b2b.append(rest[1])
+            team.last_date = date
+            team.last_values = np.nan_to_num(row, nan=0.0)
+
+        # Head-to-head: one meeting per game
+        home, away = games['HOME_TEAM_ID'].to_numpy(), games['AWAY_TEAM_ID'].to_numpy()
+        winners = np.where(games['HOME_WIN'].to_numpy() == 1, home, away)
+        for h, a, season, winner in zip(home, away, games['SEASON'].astype(str), winners):
+            self.pairs.setdefault((min(h, a), max(h, a)), []).append((season, winner))
+
+        self.seasons.update(games['SEASON'].astype(str).unique())
+        self.last_date = games['GAME_DATE'].iloc[-1]
+        self.n_games += len(games)
+        return self.features(next_slate) if next_slate is not None else None
+
+    def _h2h(self, slate):
+        """H2H_GAMES / H2H_HOME_WINS / H2H_HOME_WIN_PCT of upcoming games from the pair state."""
+        seasons = sorted(self.seasons | set(slate['SEASON'].astype(str)))
+        rank = {season: i for i, season in enumerate(seasons)}
+
+        games, home_wins = [], []
+        for h, a, season in zip(slate['HOME_TEAM_ID'], slate['AWAY_TEAM_ID'], slate['SEASON'].astype(str)):
+            meetings = self.pairs.get((min(h, a), max(h, a)), [])
+            if self.h2h_last_seasons is not None:
+                first = rank[season] - self.h2h_last_seasons + 1
+                meetings = [m for m in meetings if rank[m[0]] >= first]
+            if self.h2h_last_n is not None:
+                meetings = meetings[len(meetings) - min(self.h2h_last_n, len(meetings)):]
+            games.append(len(meetings))
+            home_wins.append(float(sum(winner == h for _, winner in meetings)))
+
+        h2h = pd.DataFrame({'H2H_GAMES': np.array(games, dtype=np.int64),
+                            'H2H_HOME_WINS': np.array(home_wins)}, index=slate.index)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            h2h['H2H_HOME_WIN_PCT'] = np.where(h2h['H2H_GAMES'] > 0, h2h['H2H_HOME_WINS'] / h2h['H2H_GAMES'], 0.5)
+        return h2h
+
+    def features(self, slate):
+        """
+        Feature rows of upcoming games, from the state alone (no state change)
+
+        Args:
+            slate (pd.DataFrame): Upcoming matchup games (GAME_ID, GAME_DATE,
+                SEASON, HOME_/AWAY_ TEAM_ID/TEAM_ABBREVIATION/TEAM_NAME; as-of
+                merged stats if the store was built from an as-of merge)
+
+        Returns:
+            pd.DataFrame: One lowercase row per game - the batch feature
+                columns without the targets
+
+        Raises:
+            ValueError: Before the first advance(), or for games on or
+                before the last advanced date
+        """
+        fe = feature_engineering
+        if self.stat_cols is None:
+            raise ValueError("Empty store: advance() it with game history first")
+        slate = slate.assign(GAME_DATE=pd.to_datetime(slate['GAME_DATE'])).sort_values('GAME_DATE', kind='stable')
+        if not slate.empty and slate['GAME_DATE'].iloc[0] <= self.last_date:
+            raise ValueError(f"Slate games on {slate['GAME_DATE'].iloc[0].date()} are not after the last "
+                             f"advanced date {self.last_date.date()}")
+        if 'HOME_WIN' not in slate.columns:
+            slate = slate.assign(HOME_WIN=np.nan)   # rebuild_matchup_level keeps it as a base column
+
+        view, values = self._team_view(slate)
+        n_rows = len(view)
+        shifted = np.empty((n_rows, len(self.stat_cols)))
+        rolled = np.empty((n_rows, len(self.roll_stats), len(self.windows)))
+        rest = np.empty((n_rows, len(fe.REST_COLS)))
+        streaks = np.empty(n_rows, dtype=np.int64)
+        empty = TeamState(max(self.windows) - 1)
+        for i, (team_id, date) in enumerate(zip(view['TEAM_ID'], view['GAME_DATE'])):
+            team = self.teams.get(team_id, empty)
+            shifted[i] = self._shifted(team, values[i])
+            rolled[i], rest[i], _, streaks[i] = self._next_game(team, date, shifted[i])
+
+        # Team frame in the column layout of the batch momentum step
+        team_df = view[['GAME_ID', 'GAME_DATE', 'SEASON', 'TEAM_ID']].copy()
+        stats = pd.DataFrame(shifted, index=view.index, columns=self.stat_cols).astype(self.stat_dtypes)
+        roll_cols = [f'{stat}_L{window}' for stat in self.roll_stats for window in self.windows]
+        team_df = pd.concat([
+            team_df, stats, view[['IS_HOME']],
+            pd.DataFrame(rolled.reshape(n_rows, -1), index=view.index, columns=roll_cols),
+            pd.DataFrame(rest, index=view.index, columns=fe.REST_COLS).astype(
+                {c: np.int64 for c in ['B2B', 'OPTIMAL_REST', 'OVER_RESTED']}),
+        ], axis=1)
+        if 'W_PCT_L5' in team_df.columns and 'W_PCT_L10' in team_df.columns:
+            team_df['MOMENTUM'] = team_df['W_PCT_L5'] - team_df['W_PCT_L10']
+        if self._w_pct_idx is not None:
+            team_df['WIN_STREAK'] = streaks
+
+        # Matchup assembly: the batch step functions on the slate
+        matchup = fe.rebuild_matchup_level(team_df, slate, None)
+        matchup = matchup.sort_values('GAME_DATE', kind='stable').reset_index(drop=True)
+        matchup = pd.concat([matchup, self._h2h(matchup)], axis=1)
+        matchup = fe.create_differentials(matchup, variants=self.variants)
+        matchup = matchup.drop(columns=[c for c in TARGET_COLS if c in matchup.columns])
+        return fe.convert_to_lowercase(matchup)
@@ -3,13 +3,16 @@ Prediction-Optimized Feature Engineering & Evaluation
 (No betting/wagering code included)
 
 Usage:
-    df = pd.read_csv("data/processed/nba/final/nba_train_data_enhanced.csv", parse_dates=['GAME_DATE'])
+    df = load_dataset("data/processed/nba/final/nba_train_data_enhanced.csv")
     df_fe = build_prediction_features(df)
     train_df, val_df, test_df = temporal_split(df_fe)
     model, calibrator = train_and_calibrate(train_df, val_df, feature_cols, target_col='TARGET')
     evaluate_model(model, calibrator, test_df, feature_cols, target_col='TARGET')
 """
 
+import os
+import sys
+
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
@@ -22,6 +25,14 @@ from sklearn.metrics import (
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from models.nba.elo import EloRatings
+from scripts.data_collection.storage import load_dataset
+from scripts.feature_engineering.feature_utils import (
+    exponential_weights, grouped_shift, weighted_rolling_means
+)
+
 sns.set(style="darkgrid")
 plt.style.use("dark_background")
 
@@ -41,14 +52,24 @@ def weighted_rolling(series, window, weights=None, min_periods=1):
     if weights is None:
         return series.rolling(window, min_periods=min_periods).mean()
     w = np.array(weights[-window:])
-    def apply_roll(x):
-        valid = ~np.isnan(x)
-        if valid.sum() == 0:
-            return np.nan
-        vals = x[valid]
-        ww = w[-len(vals):]
-        return (vals * ww).sum() / ww.sum()
-    return series.rolling(window, min_periods=min_periods).apply(lambda x: apply_roll(x), raw=True)
+    frame = pd.DataFrame({'_GROUP': 0, '_VALUE': series.to_numpy(dtype=float)}, index=series.index)
+    rolled = weighted_rolling_means(frame, ['_VALUE'], [window], group_col='_GROUP',
+                                    weights=lambda _: w, min_periods=min_periods)
+    return rolled.iloc[:, 0].rename(series.name)
+
+
+def prior_weighted_rolling(df, team_id_col, stats, windows, prefix):
+    """
+    Exponentially weighted rolling means of `stats` per (team, SEASON),
+    shifted one game so each row only sees earlier games.
+    All windows and stats are computed in one vectorized call.
+    """
+    group_cols = [team_id_col, 'SEASON']
+    rolled = weighted_rolling_means(df, stats, windows, group_col=group_cols,
+                                    weights=exponential_weights, min_periods=1)
+    rolled = grouped_shift(pd.concat([df[group_cols], rolled], axis=1), list(rolled.columns),
+                           group_col=group_cols, periods=1, fill_value=None)
+    return rolled.rename(columns=lambda c: f"{prefix}_{c}")
 
 
 # ---------------------------
@@ -110,71 +131,21 @@ def build_prediction_features(df):
         'AWAY_TM_TOV_PCT_FF_PRIOR', 'AWAY_OREB_PCT_FF_PRIOR'
     ]
 
-    # Build HOME team rolling
-    home_rows = df.reset_index()
-    home_rows['TEAM_ID'] = home_rows['HOME_TEAM_ID']
-    home_rows_stats = home_rows[['TEAM_ID', 'SEASON', 'GAME_DATE'] + home_stats].copy()
-    home_out = pd.DataFrame(index=home_rows.index)
-    for w in windows:
-        weights = np.exp(np.linspace(-1, 0, w))
-        for col in home_stats:
-            series = (
-                home_rows.groupby(['HOME_TEAM_ID', 'SEASON'])[col]
-                .apply(lambda s: weighted_rolling(s, w, weights, min_periods=1))
-                .shift(1)
-            )
-            home_out[f"H_{col}_R{w}"] = series.values
-
-    # Build AWAY team rolling
-    away_rows = df.reset_index()
-    away_rows['TEAM_ID'] = away_rows['AWAY_TEAM_ID']
-    away_out = pd.DataFrame(index=away_rows.index)
-    for w in windows:
-        weights = np.exp(np.linspace(-1, 0, w))
-        for col in away_stats:
-            series = (
-                away_rows.groupby(['AWAY_TEAM_ID', 'SEASON'])[col]
-                .apply(lambda s: weighted_rolling(s, w, weights, min_periods=1))
-                .shift(1)
-            )
-            away_out[f"A_{col}_R{w}"] = series.values
+    # Build HOME and AWAY team rolling (aligned to df rows, no cross-group shift)
+    df = df.reset_index(drop=True)
+    home_out = prior_weighted_rolling(df, 'HOME_TEAM_ID', home_stats, windows, prefix='H')
+    away_out = prior_weighted_rolling(df, 'AWAY_TEAM_ID', away_stats, windows, prefix='A')
 
     # Merge rolling features back
-    df = df.reset_index(drop=True)
-    df = pd.concat([df, home_out.reset_index(drop=True), away_out.reset_index(drop=True)], axis=1)
+    df = pd.concat([df, home_out, away_out], axis=1)
 
     # ---------- 2) Elo-like ratings (team-level, season-reset) ----------
     # Simple Elo: initialize at 1500 per season, update by margin and K scaled by schedule importance
+    # Array-based engine (models/nba/elo.py): one vectorized update per game date
     def compute_elo(df, k=20):
         df = df.sort_values(['SEASON', 'GAME_DATE']).copy()
-        teams = pd.concat([df['HOME_TEAM_ID'], df['AWAY_TEAM_ID']]).unique()
-        elo = {}  # (team, season) -> elo
-        elo_home = []
-        elo_away = []
-        for _, row in df.iterrows():
-            season = row['SEASON']
-            h = row['HOME_TEAM_ID']
-            a = row['AWAY_TEAM_ID']
-            key_h = (h, season)
-            key_a = (a, season)
-            if key_h not in elo:
-                elo[key_h] = 1500.0
-            if key_a not in elo:
-                elo[key_a] = 1500.0
-            Eh = 1 / (1 + 10 ** ((elo[key_a] - elo[key_h]) / 400))
-            Ea = 1 - Eh
-            # Save pre-game elos
-            elo_home.append(elo[key_h])
-            elo_away.append(elo[key_a])
-            # Margin multiplier (caps)
-            margin = row['HOME_PTS'] - row['AWAY_PTS'] if 'HOME_PTS' in row else 0
-            mult = np.log(abs(margin) + 1) * (2.2 / ((row.get('HOME_POSS', 100) + 1) * 0.001 + 2.2))
-            # Update
-            S_h = 1.0 if row['HOME_WIN'] == 1 else 0.0
-            elo[key_h] += k * mult * (S_h - Eh)
-            elo[key_a] += k * mult * ((1 - S_h) - Ea)
-        df['ELO_HOME_PRE'] = elo_home
-        df['ELO_AWAY_PRE'] = elo_away
+        elo = EloRatings(k=k, margin_multiplier='possessions', season_carryover=0.0)
+        df[['ELO_HOME_PRE', 'ELO_AWAY_PRE']] = elo.update(df)
         return df
 
     df = compute_elo(df)
@@ -335,7 +306,7 @@ def evaluate_model(model, calibrator, test_df, feature_cols, target_col='TARGET'
 # ---------------------------
 if __name__ == "__main__":
     # Load
-    df = pd.read_csv("data/processed/nba/final/nba_train_data_enhanced.csv", parse_dates=['GAME_DATE'])
+    df = load_dataset("data/processed/nba/final/nba_train_data_enhanced.csv")
     # Build features
     df_fe = build_prediction_features(df)
     feature_cols = df_fe.attrs.get('feature_cols', [c for c in df_fe.columns if c not in ['GAME_DATE','SEASON','TARGET','HOME_TEAM_ID','AWAY_TEAM_ID']])
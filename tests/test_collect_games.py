@@ -0,0 +1,86 @@
+import importlib.util
+import os
+import sys
+import threading
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.data_collection.fetcher import TokenBucket
+from scripts.data_collection.storage import load_dataset
+from scripts.benchmarks.synthetic import make_synthetic_games, to_team_game_rows
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def load_collect_games():
+    path = os.path.join(REPO_ROOT, 'scripts', 'data_collection', '01_collect_nba_games.py')
+    spec = importlib.util.spec_from_file_location('collect_nba_games', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def fake_api(rows_by_season, latency, failing=()):
+    seasons = sorted(rows_by_season)
+    state = {'in_flight': 0, 'max_in_flight': 0}
+    lock = threading.Lock()
+
+    def fetch(season):
+        with lock:
+            state['in_flight'] += 1
+            state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+        try:
+            # Later seasons answer first, so completions arrive out of order
+            time.sleep(latency * (len(seasons) - seasons.index(season)))
+            if season in failing:
+                raise RuntimeError('boom')
+            return rows_by_season[season].assign(SEASON=season)
+        finally:
+            with lock:
+                state['in_flight'] -= 1
+
+    return fetch, state
+
+
+def test_seasons_stream_into_partitions_concurrently(tmp_path):
+    collect = load_collect_games()
+    collect.MAX_WORKERS = 3
+    games = make_synthetic_games(n_seasons=6, games_per_season=120)
+    seasons = sorted(games['SEASON'].unique())
+    rows_by_season = {s: to_team_game_rows(games[games['SEASON'] == s]) for s in seasons}
+
+    fetch, state = fake_api(rows_by_season, latency=0.05)
+    collect.fetch_season_games = fetch
+    output = str(tmp_path / 'games.csv')
+
+    start = time.perf_counter()
+    summaries, failed = collect.collect_seasons(seasons, output, limiter=TokenBucket(rate=100.0))
+    elapsed = time.perf_counter() - start
+
+    assert failed == []
+    assert state['max_in_flight'] == 3
+    assert elapsed < sum(0.05 * (i + 1) for i in range(len(seasons))) * 0.8
+    assert sum(s['games'] for s in summaries) == len(games)
+
+    team_games = pd.concat([rows.assign(SEASON=s) for s, rows in rows_by_season.items()], ignore_index=True)
+    expected = collect.convert_to_matchup_format(team_games)
+    key = ['GAME_DATE', 'GAME_ID']
+    loaded = load_dataset(output).sort_values(key).reset_index(drop=True)
+    pd.testing.assert_frame_equal(loaded, expected.sort_values(key).reset_index(drop=True)[loaded.columns])
+    assert sorted(os.listdir(tmp_path / 'games.parquet')) == [f'SEASON={s}' for s in seasons]
+
+    # CSV export comes out in season/date order even though seasons finished out of order
+    csv_dates = pd.read_csv(output, parse_dates=['GAME_DATE'])['GAME_DATE']
+    assert csv_dates.is_monotonic_increasing
+
+    # A failed season keeps its previously stored partition
+    fetch, _ = fake_api(rows_by_season, latency=0.0, failing={seasons[2]})
+    collect.fetch_season_games = fetch
+    collect.MAX_RETRIES = 1
+    summaries, failed = collect.collect_seasons(seasons, output, limiter=None)
+    assert [season for season, _ in failed] == [seasons[2]]
+    assert len(load_dataset(output, seasons=[seasons[2]])) == (games['SEASON'] == seasons[2]).sum()
+    assert len(load_dataset(output)) == len(games)
@@ -0,0 +1,81 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.nba.elo import EloRatings
+from scripts.benchmarks.bench_elo import compute_elo_iterrows
+from scripts.benchmarks.synthetic import make_synthetic_games
+
+
+def test_elo_matches_iterrows_implementation():
+    games = make_synthetic_games(n_seasons=2, games_per_season=300)
+    expected = compute_elo_iterrows(games)
+    result = EloRatings(k=20).update(games).loc[expected.index]
+    np.testing.assert_allclose(result['ELO_HOME_PRE'], expected['ELO_HOME_PRE'], rtol=0, atol=1e-9)
+    np.testing.assert_allclose(result['ELO_AWAY_PRE'], expected['ELO_AWAY_PRE'], rtol=0, atol=1e-9)
+
+
+def test_incremental_update_matches_full_replay(tmp_path):
+    games = make_synthetic_games(n_seasons=2, games_per_season=300)
+    params = dict(k=25, home_advantage=60, margin_multiplier='autocorrelation', season_carryover=0.75)
+    full = EloRatings(**params).update(games)
+    
+    cutoff = games['GAME_DATE'].iloc[450]
+    engine = EloRatings(**params)
+    history = engine.update(games[games['GAME_DATE'] < cutoff])
+    engine.save(tmp_path / 'elo_state.json')
+    nightly = EloRatings.load(tmp_path / 'elo_state.json').update(games[games['GAME_DATE'] >= cutoff])
+    
+    pd.testing.assert_frame_equal(pd.concat([history, nightly]).loc[full.index], full)
+
+
+def test_update_rejects_games_before_last_processed_date():
+    games = make_synthetic_games(n_seasons=1, games_per_season=100)
+    engine = EloRatings()
+    engine.update(games.iloc[50:])
+    with pytest.raises(ValueError):
+        engine.update(games.iloc[:10])
+
+
+def test_update_applies_each_game_of_the_last_date_once(tmp_path):
+    games = make_synthetic_games(n_seasons=1, games_per_season=100)
+    counts = games['GAME_DATE'].value_counts(sort=False)
+    last_night = games[games['GAME_DATE'] == counts[counts > 1].index[-1]]
+    engine = EloRatings()
+    engine.update(games[games['GAME_DATE'] < last_night['GAME_DATE'].iloc[0]])
+    engine.update(last_night.iloc[:1])
+    engine.save(tmp_path / 'elo_state.json')
+
+    # Re-running the night (after a restart) is rejected; its late games are not
+    engine = EloRatings.load(tmp_path / 'elo_state.json')
+    before = engine.ratings.copy()
+    with pytest.raises(ValueError):
+        engine.update(last_night)
+    np.testing.assert_array_equal(engine.ratings, before)
+    engine.update(last_night.iloc[1:])
+    with pytest.raises(ValueError):
+        engine.update(last_night.iloc[1:])
+    with pytest.raises(ValueError):
+        engine.update(last_night.drop(columns='GAME_ID').iloc[1:])
+
+
+def test_save_load_keeps_non_integer_ids(tmp_path):
+    games = make_synthetic_games(n_seasons=1, games_per_season=100)
+    for side in ['HOME', 'AWAY']:
+        games[f'{side}_TEAM_ID'] = 'T' + (games[f'{side}_TEAM_ID'] % 100).astype(str)
+    full = EloRatings().update(games)
+
+    cutoff = games['GAME_DATE'].iloc[60]
+    engine = EloRatings()
+    history = engine.update(games[games['GAME_DATE'] < cutoff])
+    engine.save(tmp_path / 'elo_state.json')
+    engine = EloRatings.load(tmp_path / 'elo_state.json')
+    nightly = engine.update(games[games['GAME_DATE'] >= cutoff])
+
+    assert all(isinstance(t, str) for t in engine.team_ids)
+    pd.testing.assert_frame_equal(pd.concat([history, nightly]).loc[full.index], full)
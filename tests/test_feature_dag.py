@@ -0,0 +1,177 @@
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.data_collection.local_team_stats import build_asof_team_stats
+from scripts.feature_engineering.feature_dag import SOURCE, FeatureDAG, FeatureStep, frame_hash
+from scripts.benchmarks.synthetic import add_synthetic_box_scores, make_synthetic_games
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def load_script(name, filename):
+    path = os.path.join(REPO_ROOT, 'scripts', 'feature_engineering', filename)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope='module')
+def pipeline():
+    merge_stats = load_script('merge_stats', '01_merge_stats.py')
+    features = load_script('nba_feature_engineering', '02_nba_feature_engineering.py')
+    games = add_synthetic_box_scores(make_synthetic_games(n_seasons=2, games_per_season=300))
+    for side in ['HOME', 'AWAY']:
+        games[f'{side}_TEAM_ABBREVIATION'] = 'T' + (games[f'{side}_TEAM_ID'] % 100).astype(str)
+        games[f'{side}_TEAM_NAME'] = 'Team ' + (games[f'{side}_TEAM_ID'] % 100).astype(str)
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = merge_stats.clean_stats_dataframe(build_asof_team_stats(games, verbose=False))
+        merged = merge_stats.organize_columns(merge_stats.merge_team_stats(games, stats))
+    return features, merged
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def test_dag_matches_the_linear_pipeline(pipeline):
+    features, merged = pipeline
+
+    def linear():
+        original_df, team_df, pts_data = features.load_and_shift_stats(merged)
+        team_df = features.calculate_rolling_features(team_df)
+        team_df = features.calculate_rest_features(team_df)
+        team_df = features.calculate_momentum(team_df)
+        matchup_df = features.rebuild_matchup_level(team_df, original_df, pts_data)
+        matchup_df = features.calculate_h2h(matchup_df)
+        return features.finalize_features(features.create_differentials(matchup_df))
+
+    pd.testing.assert_frame_equal(quiet(features.build_feature_frame, merged), quiet(linear))
+
+
+def test_reruns_recompute_only_the_invalidated_suffix(pipeline, tmp_path):
+    features, merged = pipeline
+    dag = features.feature_dag(cache_dir=str(tmp_path), verbose=False)
+
+    first = quiet(dag.run, merged)
+    assert set(dag.last_run.values()) == {'computed'} and len(dag.last_run) == len(dag.steps)
+
+    # Nothing changed: one cached frame, no step runs
+    again = quiet(dag.run, merged)
+    assert dag.last_run == {'final': 'cached'}
+    pd.testing.assert_frame_equal(again, first)
+
+    # New rolling windows: shift and rest come from the cache
+    params = {'rolling': {'windows': [3, 5]}}
+    rolled = quiet(dag.run, merged, params=params)
+    computed = {n for n, s in dag.last_run.items() if s == 'computed'}
+    assert computed == {'rolling', 'team_features', 'momentum', 'matchup', 'h2h', 'differentials', 'final'}
+    assert {dag.last_run[n] for n in ('shifted', 'rest', 'games', 'pts')} == {'cached'}
+    assert 'home_net_rating_l3' in rolled.columns
+    uncached = features.feature_dag(cache_dir=None, verbose=False)
+    pd.testing.assert_frame_equal(rolled, quiet(uncached.run, merged, params=params))
+
+    # Only the differentials changed
+    quiet(dag.run, merged, params={**params, 'differentials': {'variants': ['DIFF', 'RATIO']}})
+    assert dag.last_run == {'h2h': 'cached', 'differentials': 'computed', 'final': 'computed'}
+
+    # Different source data: everything reruns
+    quiet(dag.run, merged.iloc[:-10])
+    assert set(dag.last_run.values()) == {'computed'}
+
+
+def test_cache_keys_follow_code_params_and_inputs():
+    def double(df, factor=2):
+        return df * factor
+
+    def plus_one(df):
+        return df + 1
+
+    source = pd.DataFrame({'x': [1.0, 2.0]})
+    dag = FeatureDAG([FeatureStep('double', double, [SOURCE], params={'factor': 2}),
+                      FeatureStep('plus_one', plus_one, ['double'])], cache_dir=None, verbose=False)
+    keys = dag.keys(frame_hash(source))
+
+    assert dag.keys(frame_hash(source.copy())) == keys
+    changed = dag.keys(frame_hash(source), params={'double': {'factor': 3}})
+    assert changed['double'] != keys['double'] and changed['plus_one'] != keys['plus_one']
+    assert frame_hash(source.astype('float32')) != frame_hash(source)
+
+    bumped = FeatureDAG([FeatureStep('double', double, [SOURCE], params={'factor': 2}),
+                         FeatureStep('plus_one', plus_one, ['double'], version=2)], cache_dir=None)
+    assert bumped.keys(frame_hash(source))['double'] == keys['double']
+    assert bumped.keys(frame_hash(source))['plus_one'] != keys['plus_one']
+
+    # Module-level values a step reads are part of its key through consts=
+    with_consts = FeatureDAG([FeatureStep('double', double, [SOURCE], params={'factor': 2},
+                                          consts={'COLS': ['x']})], cache_dir=None)
+    edited = FeatureDAG([FeatureStep('double', double, [SOURCE], params={'factor': 2},
+                                     consts={'COLS': ['x', 'y']})], cache_dir=None)
+    assert with_consts.keys(frame_hash(source))['double'] != keys['double']
+    assert edited.keys(frame_hash(source))['double'] != with_consts.keys(frame_hash(source))['double']
+
+    assert dag.run(source)['x'].tolist() == [3.0, 5.0]
+    with pytest.raises(ValueError):
+        FeatureDAG([FeatureStep('plus_one', plus_one, ['double'])])
+    with pytest.raises(ValueError):
+        dag.run(source, params={'triple': {}})
+
+
+def test_module_constants_invalidate_their_steps(pipeline):
+    features, merged = pipeline
+    keys = features.feature_dag(verbose=False).keys('source')
+    rest_cols = features.REST_COLS
+    try:
+        features.REST_COLS = rest_cols[:-1]
+        edited = features.feature_dag(verbose=False).keys('source')
+    finally:
+        features.REST_COLS = rest_cols
+    assert edited['team_features'] != keys['team_features'] and edited['final'] != keys['final']
+    assert edited['rest'] == keys['rest'] and edited['rolling'] == keys['rolling']
+
+
+def test_prune_removes_stale_and_unused_entries(tmp_path):
+    source = pd.DataFrame({'x': [1.0, 2.0]})
+
+    def scale(df, factor=2):
+        return df * factor
+
+    dag = FeatureDAG([FeatureStep('scale', scale, [SOURCE])], cache_dir=str(tmp_path), verbose=False)
+    for factor in [2, 3, 4]:
+        dag.run(source, params={'scale': {'factor': factor}})
+    step_dir = tmp_path / 'scale'
+    assert len(os.listdir(step_dir)) == 3
+
+    # By key: only the current entry of each step survives
+    current = dag.keys(frame_hash(source), params={'scale': {'factor': 4}})
+    assert dag.prune(keys=current) == 2
+    assert os.listdir(step_dir) == [f"{current['scale'][:32]}.pkl"]
+
+    # By age: a cache hit refreshes the entry, old entries go
+    path = step_dir / os.listdir(step_dir)[0]
+    os.utime(path, (0, 0))
+    assert dag.prune(max_age_days=1) == 1 and not os.listdir(step_dir)
+    assert dag.prune(max_age_days=1) == 0
+
+
+def test_roll_stats_edit_is_not_served_from_cache(pipeline, tmp_path):
+    features, merged = pipeline
+    quiet(features.feature_dag(cache_dir=str(tmp_path), verbose=False).run, merged)
+    roll_stats = features.ROLL_STATS
+    try:
+        features.ROLL_STATS = [s for s in roll_stats if s != 'PACE']
+        dag = features.feature_dag(cache_dir=str(tmp_path), verbose=False)
+        edited = quiet(dag.run, merged)
+    finally:
+        features.ROLL_STATS = roll_stats
+    assert dag.last_run['rolling'] == 'computed' and dag.last_run['shifted'] == 'cached'
+    assert 'home_pace_l5' not in edited.columns
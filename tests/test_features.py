@@ -0,0 +1,173 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.nba.features import calculate_rest_days
+from scripts.feature_engineering.feature_utils import (
+    build_differentials, exponential_weights, grouped_shift, h2h_features, rolling_means, run_length_streaks,
+    weighted_rolling_means,
+)
+from scripts.benchmarks.bench_rest_days import calculate_rest_days_loop
+from scripts.benchmarks.synthetic import make_synthetic_games
+
+
+def make_team_games(n_rows=400, n_teams=5, seed=0):
+    rng = np.random.default_rng(seed)
+    team_df = pd.DataFrame({
+        'TEAM_ID': rng.integers(0, n_teams, n_rows),
+        'GAME_DATE': pd.Timestamp('2023-10-24') + pd.to_timedelta(rng.permutation(n_rows), unit='D'),
+        'NET_RATING': rng.normal(0, 10, n_rows),
+        'PACE': rng.normal(100, 3, n_rows),
+    })
+    team_df.loc[rng.choice(n_rows, 40, replace=False), 'PACE'] = np.nan
+    return team_df
+
+
+def test_rest_days_matches_loop_implementation():
+    games = make_synthetic_games(n_seasons=3, games_per_season=200)
+    expected = calculate_rest_days_loop(games)
+    result = calculate_rest_days(games, verbose=False)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_rest_days_resets_each_season():
+    games = pd.DataFrame({
+        'GAME_DATE': ['2023-04-09', '2023-10-24', '2023-10-26'],
+        'SEASON': ['2022-23', '2023-24', '2023-24'],
+        'HOME_TEAM_ID': [1, 1, 2],
+        'AWAY_TEAM_ID': [2, 3, 1],
+    })
+    result = calculate_rest_days(games, verbose=False)
+    assert np.isnan(result.loc[1, 'HOME_DAYS_REST'])
+    assert result.loc[2, 'AWAY_DAYS_REST'] == 2
+    assert np.isnan(result.loc[2, 'HOME_DAYS_REST'])
+
+
+def test_rolling_means_matches_groupby_rolling():
+    team_df = make_team_games()
+    result = rolling_means(team_df, ['NET_RATING', 'PACE'], [3, 5, 10])
+    
+    ordered = team_df.sort_values(['TEAM_ID', 'GAME_DATE'])
+    for stat in ['NET_RATING', 'PACE']:
+        for window in [3, 5, 10]:
+            expected = (
+                ordered.groupby('TEAM_ID')[stat]
+                .rolling(window, min_periods=1)
+                .mean()
+                .reset_index(level=0, drop=True)
+            )
+            pd.testing.assert_series_equal(
+                result[f'{stat}_L{window}'], expected.reindex(team_df.index),
+                check_names=False, rtol=1e-9,
+            )
+
+
+def test_grouped_shift_matches_per_column_shift():
+    team_df = make_team_games().sort_values(['TEAM_ID', 'GAME_DATE']).reset_index(drop=True)
+    team_df['GP'] = team_df.groupby('TEAM_ID').cumcount() + 1
+    cols = ['NET_RATING', 'PACE', 'GP']
+    
+    kept_nan = grouped_shift(team_df, cols, fill_value=None)
+    filled = grouped_shift(team_df, cols, fill_value=0)
+    
+    for col in cols:
+        expected = team_df.groupby('TEAM_ID')[col].shift(1)
+        pd.testing.assert_series_equal(kept_nan[col], expected.astype(float), check_names=False)
+        pd.testing.assert_series_equal(
+            filled[col], team_df.groupby('TEAM_ID')[col].shift(1, fill_value=0), check_names=False
+        )
+    assert filled['GP'].dtype == team_df['GP'].dtype
+
+
+def test_weighted_rolling_means_matches_rolling_apply():
+    team_df = make_team_games()
+    team_df['SEASON'] = np.where(team_df['GAME_DATE'] < '2024-06-01', '2023-24', '2024-25')
+    team_df = team_df.sort_values('GAME_DATE').reset_index(drop=True)
+    result = weighted_rolling_means(team_df, ['NET_RATING', 'PACE'], [3, 5], group_col=['TEAM_ID', 'SEASON'])
+    
+    def apply_roll(x, w):
+        vals = x[~np.isnan(x)]
+        ww = w[-len(vals):]
+        return (vals * ww).sum() / ww.sum()
+    
+    for window in [3, 5]:
+        w = exponential_weights(window)
+        for stat in ['NET_RATING', 'PACE']:
+            expected = team_df.groupby(['TEAM_ID', 'SEASON'])[stat].transform(
+                lambda s: s.rolling(window, min_periods=1).apply(lambda x: apply_roll(x, w), raw=True)
+            )
+            pd.testing.assert_series_equal(
+                result[f'{stat}_R{window}'], expected, check_names=False, rtol=1e-12
+            )
+
+
+def h2h_reference(games, last_n=None, last_seasons=None):
+    """Brute-force H2H: scan every earlier meeting of the same two teams."""
+    seasons = sorted(games['SEASON'].unique())
+    rows = []
+    for i, game in games.iterrows():
+        teams = {game['HOME_TEAM_ID'], game['AWAY_TEAM_ID']}
+        prior = games.loc[:i - 1]
+        prior = prior[prior['HOME_TEAM_ID'].isin(teams) & prior['AWAY_TEAM_ID'].isin(teams)]
+        if last_seasons is not None:
+            first = seasons[max(seasons.index(game['SEASON']) - last_seasons + 1, 0)]
+            prior = prior[prior['SEASON'] >= first]
+        if last_n is not None:
+            prior = prior.tail(last_n)
+        home_won = np.where(prior['HOME_TEAM_ID'] == game['HOME_TEAM_ID'], prior['HOME_WIN'], 1 - prior['HOME_WIN'])
+        rows.append((len(prior), float(home_won.sum())))
+    return pd.DataFrame(rows, columns=['H2H_GAMES', 'H2H_HOME_WINS'], index=games.index)
+
+
+def test_h2h_features_match_brute_force():
+    games = make_synthetic_games(n_seasons=3, games_per_season=80, n_teams=6)
+    for last_n, last_seasons in [(None, None), (3, None), (None, 2), (2, 1)]:
+        expected = h2h_reference(games, last_n, last_seasons)
+        result = h2h_features(games, last_n=last_n, last_seasons=last_seasons)
+        pd.testing.assert_frame_equal(result[['H2H_GAMES', 'H2H_HOME_WINS']], expected)
+        pct = np.where(expected['H2H_GAMES'] > 0, expected['H2H_HOME_WINS'] / expected['H2H_GAMES'].clip(lower=1), 0.5)
+        np.testing.assert_allclose(result['H2H_HOME_WIN_PCT'], pct)
+
+
+def test_run_length_streaks_match_loop():
+    rng = np.random.default_rng(1)
+    team_df = pd.DataFrame({
+        'TEAM_ID': rng.integers(0, 4, 200),
+        'WIN': rng.integers(0, 2, 200).astype(float),
+    })
+    team_df.loc[::17, 'WIN'] = np.nan
+    result = run_length_streaks(team_df, ['WIN'])
+    
+    for _, games in team_df.groupby('TEAM_ID'):
+        streak, longest = 0, 0
+        for idx, win in games['WIN'].fillna(0).items():
+            assert result.loc[idx, 'WIN_STREAK_PRIOR'] == streak
+            if win == 1:
+                streak = streak + 1 if streak > 0 else 1
+            else:
+                streak = streak - 1 if streak < 0 else -1
+            longest = max(longest, streak)
+            assert result.loc[idx, 'WIN_STREAK'] == streak
+            assert result.loc[idx, 'WIN_LONGEST'] == longest
+
+
+def test_build_differentials_matches_column_arithmetic():
+    df = pd.DataFrame({
+        'HOME_PTS': [110.0, 98.0, np.nan, 104.0],
+        'AWAY_PTS': [101.0, 0.0, 95.0, 104.0],
+        'HOME_PACE': [99.0, 101.5, 97.0, 100.0],
+        'AWAY_PACE': [100.0, 98.0, 96.5, 0.0],
+    })
+    result = build_differentials(df, ['PTS', 'PACE'], variants=('DIFF', 'RATIO', 'SUM'))
+    
+    assert list(result.columns) == ['PTS_DIFF', 'PACE_DIFF', 'PTS_RATIO', 'PACE_RATIO',
+                                    'PTS_SUM', 'PACE_SUM']
+    for f in ['PTS', 'PACE']:
+        home, away = df[f'HOME_{f}'], df[f'AWAY_{f}']
+        for variant, expected in [('DIFF', home - away), ('RATIO', home / away), ('SUM', home + away)]:
+            expected = expected.replace([np.inf, -np.inf], np.nan).fillna(0)
+            pd.testing.assert_series_equal(result[f'{f}_{variant}'], expected, check_names=False)
@@ -0,0 +1,115 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.benchmarks.stub_odds_server import BOOKMAKERS, StubOddsServer
+from scripts.benchmarks.synthetic import make_synthetic_games
+from scripts.data_collection import fetch_odds_api as odds
+from scripts.data_collection.fetcher import TokenBucket
+
+START = pd.Timestamp('2000-11-01 12:00', tz='UTC')
+
+
+def poll(server, client, history, n_polls, minutes=5):
+    snapshots = []
+    for _ in range(n_polls):
+        events, fetched_at = client.get_odds(BOOKMAKERS)
+        snapshot = odds.events_to_frame(events, fetched_at)
+        snapshots.append(snapshot)
+        history.record(snapshot)
+        server.now += pd.Timedelta(minutes=minutes)
+    return snapshots
+
+
+def test_polling_reuses_connections_and_stores_only_line_changes(tmp_path):
+    games = make_synthetic_games(n_seasons=1, games_per_season=300)
+    path = str(tmp_path / 'odds.csv')
+
+    with StubOddsServer(games, latency=0.0, now=START) as server:
+        with odds.OddsClient(api_key='test', base_url=server.base_url) as client:
+            history = odds.OddsHistory(path, games_df=games)
+            snapshots = poll(server, client, history, n_polls=12)
+
+    # 12 books in batches of 10: two requests per poll, all over one kept-alive connection
+    assert len(server.status_codes) == 12 * 2
+    assert len(server.connections) == 1
+
+    stored = odds.load_odds_history(path)
+    every_poll = pd.concat(snapshots, ignore_index=True)
+    lines = every_poll[odds.LINE_COLS].astype('float64').fillna(-1)
+    previous = lines.groupby([every_poll[c] for c in odds.KEY_COLS]).shift(1)
+    moved = (lines != previous).any(axis=1)
+    assert len(stored) == moved.sum() < len(every_poll)
+    assert stored['GAME_ID'].notna().all()
+    assert stored['HOME_ML'].dtype == 'Int16' and stored['TOTAL'].dtype == 'float32'
+    assert stored['BOOKMAKER'].dtype == 'category'
+
+    # Joined games match on date and teams
+    games_by_id = games.assign(GAME_ID=games['GAME_ID'].astype(str)).set_index('GAME_ID')
+    matched = games_by_id.loc[stored['GAME_ID'].astype(str)]
+    assert (matched['HOME_TEAM_ID'].to_numpy() == stored['HOME_TEAM_ID'].to_numpy()).all()
+
+    # Latest stored line per book is the latest polled line
+    last_polled = snapshots[-1].set_index(odds.KEY_COLS)[odds.LINE_COLS].sort_index()
+    latest = history.last_lines.loc[last_polled.index].sort_index()
+    pd.testing.assert_frame_equal(latest, last_polled)
+
+    # A restarted collector picks up the stored lines and writes nothing new
+    restarted = odds.OddsHistory(path, games_df=games)
+    assert restarted.record(snapshots[-1]) == 0
+
+
+def test_historical_backfill_matches_sequential_snapshots(tmp_path):
+    games = make_synthetic_games(n_seasons=1, games_per_season=200)
+    start, end = '2000-11-02 00:00', '2000-11-02 12:00'
+
+    with StubOddsServer(games, latency=0.01, now=START) as server:
+        with odds.OddsClient(api_key='test', base_url=server.base_url) as client:
+            concurrent = odds.OddsHistory(str(tmp_path / 'concurrent.csv'))
+            written, failed = odds.backfill_historical(client, concurrent, start, end, interval_minutes=30,
+                                                       bookmakers=BOOKMAKERS[:4],
+                                                       limiter=TokenBucket(rate=200.0))
+
+            sequential = odds.OddsHistory(str(tmp_path / 'sequential.csv'))
+            for ts in pd.date_range(pd.Timestamp(start, tz='UTC'), pd.Timestamp(end, tz='UTC'), freq='30min'):
+                sequential.record(odds.events_to_frame(*client.get_historical_odds(ts, BOOKMAKERS[:4])))
+
+    assert failed == []
+    key = odds.KEY_COLS + ['SNAPSHOT_TIME']
+    a = odds.load_odds_history(str(tmp_path / 'concurrent.csv')).sort_values(key).reset_index(drop=True)
+    b = odds.load_odds_history(str(tmp_path / 'sequential.csv')).sort_values(key).reset_index(drop=True)
+    assert written == len(a)
+    pd.testing.assert_frame_equal(a, b, check_categorical=False)
+    assert len(server.connections) <= odds.MAX_WORKERS + 1
+
+    # GAME_ID is joined after the fact when games arrive later
+    joined = odds.load_odds_history(str(tmp_path / 'concurrent.csv'), games_df=games)
+    assert joined['GAME_ID'].notna().all()
+
+    closing = odds.closing_lines(joined)
+    assert len(closing) == len(joined.drop_duplicates(odds.KEY_COLS))
+    assert (closing['SNAPSHOT_TIME'] <= closing['COMMENCE_TIME']).all()
+
+
+def test_events_to_frame_parses_markets():
+    events = [{
+        'id': 'e1', 'commence_time': '2024-11-02T02:30:00Z',
+        'home_team': 'Los Angeles Lakers', 'away_team': 'Golden State Warriors',
+        'bookmakers': [{'key': 'draftkings', 'last_update': '2024-11-01T20:00:00Z', 'markets': [
+            {'key': 'h2h', 'outcomes': [{'name': 'Golden State Warriors', 'price': 120},
+                                        {'name': 'Los Angeles Lakers', 'price': -140}]},
+            {'key': 'spreads', 'outcomes': [{'name': 'Los Angeles Lakers', 'price': -108, 'point': -2.5},
+                                            {'name': 'Golden State Warriors', 'price': -112, 'point': 2.5}]},
+        ]}],
+    }]
+    row = odds.events_to_frame(events, pd.Timestamp('2024-11-01 21:00', tz='UTC')).iloc[0]
+
+    # 9:30pm ET tip-off is the previous day in Eastern time
+    assert row['GAME_DATE'] == pd.Timestamp('2024-11-01') and row['SEASON'] == '2024-25'
+    assert (row['HOME_TEAM_ID'], row['AWAY_TEAM_ID']) == (1610612747, 1610612744)
+    assert (row['HOME_ML'], row['AWAY_ML'], row['HOME_SPREAD']) == (-140, 120, -2.5)
+    assert pd.isna(row['TOTAL']) and pd.isna(row['OVER_PRICE'])
+    assert odds.bookmaker_batches(BOOKMAKERS) == [','.join(BOOKMAKERS[:10]), ','.join(BOOKMAKERS[10:])]
@@ -0,0 +1,61 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.nba.elo import EloRatings
+from scripts.data_collection.helpers import (
+    TeamRegistry, get_all_team_ids, get_team_id, get_team_info, get_team_registry, validate_team_abbr,
+)
+from scripts.feature_engineering.feature_utils import h2h_features
+from scripts.benchmarks.synthetic import make_synthetic_games
+
+
+def test_registry_lookups_and_codes():
+    registry = get_team_registry()
+    assert registry is get_team_registry()
+    assert len(registry) == 30
+
+    lakers = registry.by_id(1610612747)
+    assert registry.by_abbreviation('LAL') is lakers
+    assert registry.by_nickname('lakers') is lakers
+    assert registry.lookup('Los Angeles Lakers') is lakers
+    assert registry.lookup(np.int64(1610612747)) is lakers
+    assert registry.lookup('XXX') is None
+
+    codes = registry.codes([1610612766, 1610612737, 42])
+    assert codes.tolist() == [29, 0, -1]
+    assert registry.code(1610612747) == int(np.flatnonzero(registry.ids == 1610612747)[0])
+    assert registry.ids_for_codes(codes[:2]).tolist() == [1610612766, 1610612737]
+
+    ids = pd.Series([1610612747, 1610612744]).astype(registry.id_dtype)
+    assert ids.cat.codes.tolist() == registry.codes([1610612747, 1610612744]).tolist()
+    assert list(registry.abbreviation_dtype.categories) == registry.abbreviations
+
+
+def test_helper_functions_use_registry():
+    assert get_team_id('GSW') == 1610612744
+    assert get_team_info('GSW')['full_name'] == 'Golden State Warriors'
+    assert get_team_id('XXX') is None
+    assert validate_team_abbr('BOS') and not validate_team_abbr('XXX')
+    assert len(get_all_team_ids()) == 30
+
+    small = TeamRegistry([{'id': 2, 'abbreviation': 'BBB', 'nickname': 'Bees', 'full_name': 'B Bees'},
+                          {'id': 1, 'abbreviation': 'AAA', 'nickname': 'Ants', 'full_name': 'A Ants'}])
+    assert small.codes([1, 2]).tolist() == [0, 1]
+
+
+def test_registry_codes_in_elo_and_h2h():
+    registry = get_team_registry()
+    games = make_synthetic_games(n_seasons=2, games_per_season=300)
+
+    elo = EloRatings(k=20, registry=registry)
+    with_registry = elo.update(games)
+    without = EloRatings(k=20).update(games)
+    pd.testing.assert_frame_equal(with_registry, without)
+    assert [elo._team_codes[t] for t in registry.ids] == list(range(len(registry)))
+
+    pd.testing.assert_frame_equal(h2h_features(games, registry=registry), h2h_features(games))
@@ -0,0 +1,95 @@
+import importlib.util
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.data_collection.http_cache import (
+    CacheMissError, ResponseCache, cache_key, install_response_cache, season_ttl,
+    uninstall_response_cache,
+)
+from scripts.benchmarks.stub_stats_server import StubStatsServer
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def load_collect_team_stats():
+    path = os.path.join(REPO_ROOT, 'scripts', 'data_collection', '02_collect_team_stats.py')
+    spec = importlib.util.spec_from_file_location('collect_team_stats', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_keys_ignore_parameter_order_and_ttl_follows_season():
+    assert cache_key('LeagueDashTeamStats', {'Season': '2023-24', 'DateTo': None}) == \
+        cache_key('leaguedashteamstats', [('DateTo', ''), ('Season', '2023-24')])
+    assert cache_key('x', {'Season': '2023-24'}) != cache_key('x', {'Season': '2024-25'})
+
+    now = datetime(2025, 1, 15)
+    assert season_ttl({'Season': '2023-24'}, now=now) is None
+    assert season_ttl({'SeasonNullable': '2024-25'}, now=now, current_ttl=60) == 60
+    assert season_ttl({'LeagueID': '00'}, now=now, current_ttl=60) == 60
+
+
+def test_expiry_offline_and_lru_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_mb=1)
+    cache.put('ep', {'Season': '2024-25'}, '{"a": 1}', ttl=-1)
+    assert cache.get('ep', {'Season': '2024-25'}) is None
+    assert ResponseCache(str(tmp_path), offline=True).get('ep', {'Season': '2024-25'}) == '{"a": 1}'
+
+    # Random hex compresses ~2x: ~0.3 MB on disk each, only three fit under 1 MB
+    payload = lambda i: os.urandom(300_000).hex() + str(i)
+    cache = ResponseCache(str(tmp_path / 'lru'), max_mb=1)
+    for i in range(3):
+        cache.put('ep', {'i': i}, payload(i))
+        os.utime(cache._path(cache_key('ep', {'i': i})), (i, i))
+    assert cache.get('ep', {'i': 0}) is not None   # 0 becomes most recently used
+    cache.put('ep', {'i': 3}, payload(3))
+
+    assert cache.evictions >= 1
+    assert cache.get('ep', {'i': 0}) is not None
+    assert cache.get('ep', {'i': 1}) is None
+    assert cache.size_mb <= 1
+
+
+def test_hit_survives_eviction_after_the_read(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path))
+    cache.put('ep', {'Season': '2024-25'}, '{"a": 1}')
+
+    # Another thread's _evict removes the entry between the read and the LRU touch
+    def evicted(path, *args, **kwargs):
+        os.remove(path)
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(os, 'utime', evicted)
+    assert cache.get('ep', {'Season': '2024-25'}) == '{"a": 1}'
+    assert cache.get('ep', {'Season': '2024-25'}) is None
+
+
+def test_nba_api_requests_are_served_from_cache(tmp_path):
+    collect = load_collect_team_stats()
+    original = collect.NBAStatsHTTP.base_url
+    try:
+        with StubStatsServer(latency=0.0) as server:
+            collect.set_stats_base_url(server.base_url)
+            cache = install_response_cache(cache_dir=str(tmp_path))
+            first = collect.request_team_stats('2020-21', '2021-01-05', 'Advanced')
+            second = collect.request_team_stats('2020-21', '2021-01-05', 'Advanced')
+            network_calls = len(server.request_times)
+
+            uninstall_response_cache()
+            install_response_cache(cache_dir=str(tmp_path), offline=True)
+            offline = collect.request_team_stats('2020-21', '2021-01-05', 'Advanced')
+            with pytest.raises(CacheMissError):
+                collect.request_team_stats('2020-21', '2021-01-06', 'Advanced')
+    finally:
+        uninstall_response_cache()
+        collect.set_stats_base_url(original)
+
+    assert network_calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert first.equals(second) and first.equals(offline)
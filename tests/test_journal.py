@@ -0,0 +1,53 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.data_collection.journal import CollectionJournal
+
+
+def stats_rows(date_str, measure, n=3):
+    return pd.DataFrame({
+        'TEAM_ID': range(n),
+        'GAME_DATE': date_str,
+        'SEASON': '2023-24',
+        'STAT_TYPE': measure,
+        'VALUE': [float(i) for i in range(n)],
+    })
+
+
+def test_journal_resumes_and_compacts(tmp_path):
+    journal = CollectionJournal(str(tmp_path / 'journal'))
+    dates = [f'2023-11-{d:02d}' for d in range(1, 6)]
+    for date_str in dates:
+        journal.record('2023-24', date_str, 'Advanced', stats_rows(date_str, 'Advanced'))
+
+    # Torn last line from an interrupted append is ignored
+    with open(journal.index_path, 'a') as f:
+        f.write('{"season": "2023-24", "da')
+
+    resumed = CollectionJournal(str(tmp_path / 'journal'))
+    assert resumed.completed_keys() == {('2023-24', d, 'Advanced') for d in dates}
+    dates.append('2023-11-06')
+    resumed.record('2023-24', dates[-1], 'Advanced', stats_rows(dates[-1], 'Advanced'))
+    assert resumed.completed_keys() == {('2023-24', d, 'Advanced') for d in dates}
+    before = resumed.load()
+    assert len(before) == 18
+
+    assert resumed.compact() == 6
+    assert resumed.n_segments == 1
+    assert resumed.completed_keys() == {('2023-24', d, 'Advanced') for d in dates}
+    pd.testing.assert_frame_equal(resumed.load(), before)
+
+    # Appends after compaction land in new segments
+    resumed.record('2023-24', '2023-11-07', 'Four Factors', stats_rows('2023-11-07', 'Four Factors'))
+    assert len(resumed.load()) == 21
+    assert resumed.n_segments == 2
+
+    # Repeated compactions never overwrite the segment they replace
+    assert resumed.compact() == 2
+    resumed.record('2023-24', '2023-11-08', 'Advanced', stats_rows('2023-11-08', 'Advanced'))
+    assert resumed.compact() == 2
+    assert len(resumed.load()) == 24
@@ -0,0 +1,68 @@
+import importlib.util
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.data_collection.local_team_stats import (
+    LOCAL_STAT_COLS, build_asof_team_stats, compare_team_stats, team_game_box_scores,
+)
+from scripts.benchmarks.synthetic import add_synthetic_box_scores, make_synthetic_games
+
+
+def test_asof_stats_match_per_date_aggregation():
+    games = add_synthetic_box_scores(make_synthetic_games(n_seasons=2, games_per_season=300))
+    stats = build_asof_team_stats(games, verbose=False)
+    team_games = team_game_box_scores(games)
+    
+    assert len(stats) == len(team_games)
+    assert list(stats.columns) == ['TEAM_ID', 'TEAM_NAME', 'GAME_DATE', 'SEASON'] + LOCAL_STAT_COLS
+    
+    for _, row in stats.sample(40, random_state=0).iterrows():
+        played = team_games[(team_games['TEAM_ID'] == row['TEAM_ID'])
+                            & (team_games['SEASON'] == row['SEASON'])
+                            & (team_games['GAME_DATE'] <= row['GAME_DATE'])]
+        t = played.sum(numeric_only=True)
+        poss = t['FGA'] + 0.44 * t['FTA'] - t['OREB'] + t['TOV']
+        opp_poss = t['OPP_FGA'] + 0.44 * t['OPP_FTA'] - t['OPP_OREB'] + t['OPP_TOV']
+        
+        assert row['GP'] == len(played)
+        assert row['W'] == played['WIN'].sum()
+        assert np.isclose(row['OFF_RATING'], 100 * t['PTS'] / poss)
+        assert np.isclose(row['DEF_RATING'], 100 * t['OPP_PTS'] / opp_poss)
+        assert np.isclose(row['PACE'], 48 * (poss + opp_poss) / 2 / (t['MIN'] / 5))
+        assert np.isclose(row['OREB_PCT'], t['OREB'] / (t['OREB'] + t['OPP_DREB']))
+        assert np.isclose(row['OPP_EFG_PCT'], (t['OPP_FGM'] + 0.5 * t['OPP_FG3M']) / t['OPP_FGA'])
+        assert np.isclose(row['PLUS_MINUS'], (t['PTS'] - t['OPP_PTS']) / len(played))
+        pie, opp_pie = [t[f'{p}PTS'] + t[f'{p}FGM'] + t[f'{p}FTM'] - t[f'{p}FGA'] - t[f'{p}FTA']
+                        + t[f'{p}DREB'] + t[f'{p}OREB'] / 2 + t[f'{p}AST'] + t[f'{p}STL']
+                        + t[f'{p}BLK'] / 2 - t[f'{p}PF'] - t[f'{p}TOV'] for p in ('', 'OPP_')]
+        assert np.isclose(row['PIE'], pie / (pie + opp_pie))
+        assert np.isclose(row['PACE_PER40'], row['PACE'] * 40 / 48)
+
+
+def test_local_stats_cover_every_merged_stat():
+    path = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'feature_engineering', '01_merge_stats.py')
+    spec = importlib.util.spec_from_file_location('merge_stats', path)
+    merge_stats = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(merge_stats)
+
+    assert set(merge_stats.ALL_STAT_COLS) <= set(LOCAL_STAT_COLS)
+    games = add_synthetic_box_scores(make_synthetic_games(n_seasons=1, games_per_season=100))
+    stats = build_asof_team_stats(games, verbose=False)
+    assert stats[merge_stats.ALL_STAT_COLS].notna().all().all()
+
+
+def test_compare_team_stats_flags_disagreement():
+    games = add_synthetic_box_scores(make_synthetic_games(n_seasons=1, games_per_season=200))
+    local = build_asof_team_stats(games, verbose=False)
+    api = local[['TEAM_ID', 'GAME_DATE', 'OFF_RATING', 'PACE']].copy()
+    api['GAME_DATE'] = api['GAME_DATE'].dt.strftime('%Y-%m-%d')
+    api['PACE'] *= 1.1
+    
+    report = compare_team_stats(local, api).set_index('STAT')
+    assert report.loc['OFF_RATING', 'OK']
+    assert not report.loc['PACE', 'OK']
+    assert report.loc['PACE', 'ROWS'] == len(local)
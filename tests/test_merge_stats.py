@@ -0,0 +1,154 @@
+import importlib.util
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.data_collection.local_team_stats import build_asof_team_stats
+from scripts.benchmarks.synthetic import add_synthetic_box_scores, make_synthetic_games
+from scripts.data_collection.schema import load_typed
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def load_merge_stats():
+    path = os.path.join(REPO_ROOT, 'scripts', 'feature_engineering', '01_merge_stats.py')
+    spec = importlib.util.spec_from_file_location('merge_stats', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def merge_one_side(games_df, stats_df, team_prefix, stat_cols):
+    """Reference: the left merge + per-column copy the stacked join replaces."""
+    merged = games_df.merge(stats_df, left_on=[f'{team_prefix}_TEAM_ID', 'GAME_DATE', 'SEASON'],
+                            right_on=['TEAM_ID', 'GAME_DATE', 'SEASON'], how='left', suffixes=('', '_DROP'))
+    for col in stat_cols:
+        merged[f'{team_prefix}_{col}'] = merged[col]
+    return merged.drop(columns=['TEAM_ID', 'TEAM_NAME'] + stat_cols
+                       + [c for c in merged.columns if c.endswith('_DROP')])
+
+
+def test_stacked_join_matches_two_merges():
+    merge_stats = load_merge_stats()
+    games = add_synthetic_box_scores(make_synthetic_games(n_seasons=2, games_per_season=300))
+    stats = merge_stats.clean_stats_dataframe(build_asof_team_stats(games, verbose=False))
+    # Some games without stats on one side, and a team the stats never saw
+    stats = stats.drop(stats.sample(frac=0.1, random_state=0).index)
+    games.loc[games.index[:3], 'AWAY_TEAM_ID'] = 99
+
+    merged = merge_stats.merge_team_stats(games, stats)
+    stat_cols = [c for c in merge_stats.ALL_STAT_COLS if c in stats.columns]
+    expected = merge_one_side(merge_one_side(games, stats, 'HOME', stat_cols), stats, 'AWAY', stat_cols)
+
+    assert len(merged) == len(games)
+    assert sorted(merged.columns) == sorted(expected.columns)
+    # HOME_PLUS_MINUS/HOME_MIN come from the stats, as before
+    assert merged['HOME_MIN'].dtype == 'float32'
+    pd.testing.assert_frame_equal(merged[expected.columns], expected, check_dtype=False, rtol=1e-6)
+    assert merged.loc[games.index[:3], 'AWAY_OFF_RATING'].isna().all()
+
+    # One side only still works
+    home_only = merge_stats.merge_team_stats(games, stats, 'HOME')
+    assert 'AWAY_OFF_RATING' not in home_only and home_only['HOME_OFF_RATING'].notna().any()
+
+
+
+def load_feature_engineering():
+    path = os.path.join(REPO_ROOT, 'scripts', 'feature_engineering', '02_nba_feature_engineering.py')
+    spec = importlib.util.spec_from_file_location('nba_feature_engineering', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_asof_join_replaces_the_shift_pass():
+    merge_stats, features = load_merge_stats(), load_feature_engineering()
+    games = add_synthetic_box_scores(make_synthetic_games(n_seasons=2, games_per_season=300))
+    stats = merge_stats.clean_stats_dataframe(build_asof_team_stats(games, verbose=False))
+
+    exact = merge_stats.merge_team_stats(games, stats)
+    asof = merge_stats.merge_team_stats(games, stats, mode='asof')
+    assert (asof['HOME_STATS_DATE'].dropna() < asof.loc[asof['HOME_STATS_DATE'].notna(), 'GAME_DATE']).all()
+
+    _, shifted, _ = features.load_and_shift_stats(exact)
+    _, prior, _ = features.load_and_shift_stats(asof)
+    key = ['TEAM_ID', 'GAME_ID']
+    pd.testing.assert_frame_equal(prior.sort_values(key).reset_index(drop=True),
+                                  shifted.sort_values(key).reset_index(drop=True), check_dtype=False)
+
+
+def test_asof_join_falls_back_to_latest_earlier_snapshot():
+    merge_stats = load_merge_stats()
+    games = add_synthetic_box_scores(make_synthetic_games(n_seasons=1, games_per_season=300))
+    stats = merge_stats.clean_stats_dataframe(build_asof_team_stats(games, verbose=False))
+    # Weekly collection: keep one snapshot date in seven
+    dates = pd.Series(sorted(stats['GAME_DATE'].unique()))
+    sparse = stats[stats['GAME_DATE'].isin(dates.iloc[::7])]
+
+    exact = merge_stats.merge_team_stats(games, sparse)
+    asof = merge_stats.merge_team_stats(games, sparse, mode='asof')
+    assert asof['HOME_OFF_RATING'].notna().sum() > 3 * exact['HOME_OFF_RATING'].notna().sum()
+
+    for _, game in asof.sample(50, random_state=0).iterrows():
+        earlier = sparse[(sparse['TEAM_ID'] == game['AWAY_TEAM_ID']) & (sparse['GAME_DATE'] < game['GAME_DATE'])]
+        if earlier.empty:
+            assert pd.isna(game['AWAY_OFF_RATING']) and pd.isna(game['AWAY_STATS_DATE'])
+        else:
+            latest = earlier.loc[earlier['GAME_DATE'].idxmax()]
+            assert game['AWAY_STATS_DATE'] == latest['GAME_DATE']
+            assert game['AWAY_OFF_RATING'] == latest['OFF_RATING']
+
+
+def api_like_stats(games):
+    """Local stats widened like a LeagueDashTeamStats response (ranks, STAT_TYPE)."""
+    stats = build_asof_team_stats(games, verbose=False)
+    ranks = stats.groupby('GAME_DATE')[['GP', 'W', 'OFF_RATING', 'DEF_RATING', 'PACE']].rank()
+    return pd.concat([stats, ranks.add_suffix('_RANK')], axis=1).assign(STAT_TYPE='Advanced')
+
+
+def test_projected_stats_load_reads_only_registry_columns(tmp_path):
+    merge_stats = load_merge_stats()
+    games = add_synthetic_box_scores(make_synthetic_games(n_seasons=2, games_per_season=300))
+    path = str(tmp_path / 'stats.csv')
+    api_like_stats(games).to_csv(path, index=False)
+
+    projected = merge_stats.load_stats(path)
+    full = merge_stats.clean_stats_dataframe(load_typed(path))
+
+    assert not [c for c in projected.columns if c.endswith('_RANK') or c == 'STAT_TYPE']
+    assert projected['OFF_RATING'].dtype == 'float32' and projected['GP'].dtype == 'int16'
+    assert projected['GAME_DATE'].dtype == 'datetime64[ns]'
+    pd.testing.assert_frame_equal(projected[full.columns], full, check_dtype=False,
+                                  check_categorical=False, rtol=1e-6)
+
+    # A smaller registry reads less
+    subset = merge_stats.load_stats(path, stat_columns={'advanced': ['OFF_RATING', 'DEF_RATING']})
+    assert list(subset.columns) == merge_stats.STATS_KEY_COLS + ['OFF_RATING', 'DEF_RATING']
+
+
+def test_merge_team_data_drops_ranks_at_read(tmp_path):
+    from scripts.benchmarks.synthetic import to_team_game_rows
+    from scripts.feature_engineering.merge_team_data import merge_team_data
+
+    games = add_synthetic_box_scores(make_synthetic_games(n_seasons=1, games_per_season=300))
+    team_games = to_team_game_rows(games).assign(SEASON_ID='22000')
+    stats = api_like_stats(games)
+    team_games.to_csv(tmp_path / 'games.csv', index=False)
+    stats.to_csv(tmp_path / 'stats.csv', index=False)
+
+    merged = merge_team_data(str(tmp_path / 'games.csv'), str(tmp_path / 'stats.csv'),
+                             str(tmp_path / 'out.csv'))
+    assert len(merged) == len(team_games)
+    assert not [c for c in merged.columns if '_RANK' in c or c in ('SEASON_ID', 'MIN_game', 'TEAM_NAME_stats')]
+    assert {'TEAM_NAME', 'MIN_SEASON', 'OFF_RATING', 'STAT_TYPE'} <= set(merged.columns)
+
+    by_key = stats.set_index(['TEAM_ID', 'GAME_DATE'])
+    expected = by_key.loc[list(zip(merged['TEAM_ID'], merged['GAME_DATE'])), 'OFF_RATING'].to_numpy()
+    assert ((merged['OFF_RATING'].to_numpy() - expected) ** 2).max() < 1e-6
+
+    registry = merge_team_data(str(tmp_path / 'games.csv'), str(tmp_path / 'stats.csv'),
+                               str(tmp_path / 'out2.csv'), stat_columns={'advanced': ['OFF_RATING']})
+    assert 'DEF_RATING' not in registry and registry['OFF_RATING'].dtype == 'float32'
@@ -0,0 +1,176 @@
+import importlib.util
+import os
+import sys
+
+import pandas as pd
+from nba_api.stats.library.http import NBAStatsHTTP
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.data_collection.planner import MEASURE_TYPES, plan_collection, teams_by_date
+from scripts.data_collection.storage import load_dataset, save_dataset
+from scripts.benchmarks.stub_stats_server import StubStatsServer
+from scripts.benchmarks.synthetic import make_synthetic_games
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def load_collect_team_stats():
+    path = os.path.join(REPO_ROOT, 'scripts', 'data_collection', '02_collect_team_stats.py')
+    spec = importlib.util.spec_from_file_location('collect_team_stats', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_teams_by_date_matches_per_date_filtering():
+    games = make_synthetic_games(n_seasons=2, games_per_season=200)
+    index = teams_by_date(games)
+
+    pairs = games[['GAME_DATE', 'SEASON']].drop_duplicates()
+    assert len(index) == len(pairs)
+    for date, season in pairs.itertuples(index=False):
+        day = games[(games['GAME_DATE'] == date) & (games['SEASON'] == season)]
+        expected = sorted(set(day['HOME_TEAM_ID']) | set(day['AWAY_TEAM_ID']))
+        assert index[(season, date.strftime('%Y-%m-%d'))] == expected
+    assert [date for _, date in index] == sorted(date for _, date in index)
+
+
+def test_plan_skips_journaled_and_stored_requests():
+    games = make_synthetic_games(n_seasons=1, games_per_season=120)
+    index = teams_by_date(games)
+    keys = list(index)
+
+    journaled = {(keys[0][0], keys[0][1], 'Advanced')}
+    season, date_str = keys[1]
+    stored = pd.DataFrame({'SEASON': season, 'GAME_DATE': pd.Timestamp(date_str),
+                           'TEAM_ID': index[keys[1]], 'OFF_RATING': 110.0, 'EFG_PCT': 0.5, 'OPP_EFG_PCT': 0.5})
+    # Partially stored date (one team missing) is still planned
+    season2, date_str2 = keys[2]
+    stored = pd.concat([stored, pd.DataFrame({'SEASON': season2, 'GAME_DATE': pd.Timestamp(date_str2),
+                                              'TEAM_ID': index[keys[2]][1:],
+                                              'OFF_RATING': 110.0, 'EFG_PCT': 0.5, 'OPP_EFG_PCT': 0.5})])
+    # Four Factors failed on this date: rows exist for every team, and the Advanced
+    # payload filled EFG_PCT, but OPP_EFG_PCT is NaN
+    season3, date_str3 = keys[3]
+    stored = pd.concat([stored, pd.DataFrame({'SEASON': season3, 'GAME_DATE': pd.Timestamp(date_str3),
+                                              'TEAM_ID': index[keys[3]], 'OFF_RATING': 110.0,
+                                              'EFG_PCT': 0.5, 'OPP_EFG_PCT': float('nan')})])
+
+    plan = plan_collection(games, journaled=journaled, stored=stored)
+
+    assert plan.n_dates == len(index)
+    assert plan.skipped_journal == 1
+    assert plan.skipped_stored == len(MEASURE_TYPES) + 1
+    assert len(plan) == len(index) * len(MEASURE_TYPES) - 1 - len(MEASURE_TYPES) - 1
+    planned = {(s, d, m) for s, d, m, _ in plan.tasks}
+    assert (keys[0][0], keys[0][1], 'Four Factors') in planned
+    assert (season2, date_str2, 'Advanced') in planned
+    assert (season3, date_str3, 'Four Factors') in planned
+    assert (season3, date_str3, 'Advanced') not in planned
+    assert plan.estimated_seconds(rate=0.5) == len(plan) * 2
+
+
+def test_dry_run_prints_plan_without_requests(tmp_path, capsys):
+    collect = load_collect_team_stats()
+    games = make_synthetic_games(n_seasons=1, games_per_season=60)
+    collect.INPUT_FILE = str(tmp_path / 'games.csv')
+    collect.OUTPUT_DIR = str(tmp_path)
+    collect.STATS_SOURCE = 'api'
+    save_dataset(games, collect.INPUT_FILE, verbose=False)
+
+    def no_requests(*args, **kwargs):
+        raise AssertionError("dry run made a request")
+
+    collect.request_team_stats = no_requests
+    collect.main(use_cache=False, dry_run=True)
+
+    out = capsys.readouterr().out
+    n_requests = games['GAME_DATE'].nunique() * len(MEASURE_TYPES)
+    assert f"To fetch:          {n_requests:,} requests" in out
+    assert f"{n_requests * collect.RATE_LIMIT_DELAY / 60:.1f} minutes" in out
+
+
+def test_failed_measure_is_retried_without_duplicating_rows(tmp_path):
+    collect = load_collect_team_stats()
+    games = make_synthetic_games(n_seasons=1, games_per_season=40, n_teams=8)
+    collect.INPUT_FILE = str(tmp_path / 'games.csv')
+    collect.OUTPUT_DIR = str(tmp_path)
+    collect.STATS_SOURCE = 'api'
+    collect.EXPORT_CSV = False
+    collect.RATE_LIMIT_DELAY = 0.001
+    collect.MAX_RETRIES = 1
+    save_dataset(games, collect.INPUT_FILE, verbose=False)
+    failing_date = teams_by_date(games)
+    failing_date = list(failing_date)[3][1]
+    calls = []
+
+    def fake_request(season, date_str, stat_type='Advanced', team_ids=None):
+        calls.append((date_str, stat_type))
+        if stat_type == 'Four Factors' and date_str == failing_date and fail:
+            raise ValueError("injected failure")
+        # Both payloads carry EFG_PCT, as the real endpoint's do
+        columns = ['OFF_RATING', 'EFG_PCT'] if stat_type == 'Advanced' else ['EFG_PCT', 'OPP_EFG_PCT']
+        return pd.DataFrame({'TEAM_ID': team_ids, 'TEAM_NAME': [f'Team {t}' for t in team_ids],
+                             **dict.fromkeys(columns, 1.0),
+                             'GAME_DATE': date_str, 'SEASON': season, 'STAT_TYPE': stat_type})
+
+    collect.request_team_stats = fake_request
+    output = os.path.join(str(tmp_path), collect.OUTPUT_FILE)
+    fail = True
+    collect.main(use_cache=False)
+    first = load_dataset(output)
+    failed_rows = first['GAME_DATE'] == pd.Timestamp(failing_date)
+    assert first.loc[failed_rows, 'OPP_EFG_PCT'].isna().all() and first.loc[failed_rows, 'EFG_PCT'].notna().all()
+
+    # Rerun: only the failed request, no duplicated rows, the gap filled
+    fail, calls[:] = False, []
+    collect.main(use_cache=False)
+    second = load_dataset(output)
+    assert calls == [(failing_date, 'Four Factors')]
+    assert len(second) == len(first)
+    assert not second.duplicated(['SEASON', 'GAME_DATE', 'TEAM_ID']).any()
+    assert second['OPP_EFG_PCT'].notna().all() and second['OFF_RATING'].notna().all()
+
+
+def test_only_four_factors_failing_is_retried_against_stub(tmp_path):
+    collect = load_collect_team_stats()
+    games = make_synthetic_games(n_seasons=1, games_per_season=40, n_teams=8)
+    collect.INPUT_FILE = str(tmp_path / 'games.csv')
+    collect.OUTPUT_DIR = str(tmp_path)
+    collect.STATS_SOURCE = 'api'
+    collect.EXPORT_CSV = False
+    collect.RATE_LIMIT_DELAY = 0.001
+    collect.MAX_RETRIES = 1
+    save_dataset(games, collect.INPUT_FILE, verbose=False)
+    failing_date = list(teams_by_date(games))[3][1]
+    request_team_stats, calls = collect.request_team_stats, []
+
+    def flaky_request(season, date_str, stat_type='Advanced', team_ids=None):
+        calls.append((date_str, stat_type))
+        if stat_type == 'Four Factors' and date_str == failing_date and fail:
+            raise ValueError("injected failure")
+        return request_team_stats(season, date_str, stat_type, team_ids)
+
+    collect.request_team_stats = flaky_request
+    output = os.path.join(str(tmp_path), collect.OUTPUT_FILE)
+    original = NBAStatsHTTP.base_url
+    try:
+        with StubStatsServer(latency=0.0) as server:
+            collect.STATS_BASE_URL = server.base_url
+            fail = True
+            collect.main(use_cache=False)
+            first = load_dataset(output)
+            fail, calls[:] = False, []
+            collect.main(use_cache=False)
+            second = load_dataset(output)
+    finally:
+        NBAStatsHTTP.base_url = original
+
+    # The Advanced payload filled EFG_PCT of the failed date; the Four Factors retry still ran
+    failed_rows = first['GAME_DATE'] == pd.Timestamp(failing_date)
+    assert first.loc[failed_rows, 'EFG_PCT'].notna().all() and first.loc[failed_rows, 'OPP_EFG_PCT'].isna().all()
+    assert calls == [(failing_date, 'Four Factors')]
+    assert len(second) == len(first)
+    assert not second.duplicated(['SEASON', 'GAME_DATE', 'TEAM_ID']).any()
+    assert second['OPP_EFG_PCT'].notna().all()
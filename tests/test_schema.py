@@ -0,0 +1,98 @@
+import importlib.util
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.data_collection.local_team_stats import build_asof_team_stats
+from scripts.data_collection.schema import apply_schema, load_typed
+from scripts.data_collection.storage import append_dataset, load_dataset, save_dataset
+from scripts.benchmarks.synthetic import make_synthetic_games, to_team_game_rows
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def load_collect_games():
+    path = os.path.join(REPO_ROOT, 'scripts', 'data_collection', '01_collect_nba_games.py')
+    spec = importlib.util.spec_from_file_location('collect_nba_games', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def team_game_rows(n_seasons=2, games_per_season=300):
+    games = make_synthetic_games(n_seasons=n_seasons, games_per_season=games_per_season)
+    rows = to_team_game_rows(games)
+    rows['SEASON'] = rows['GAME_ID'].map(dict(zip(games['GAME_ID'], games['SEASON'])))
+    return rows
+
+
+def test_matchup_frame_is_typed_and_compact():
+    collect = load_collect_games()
+    rows = team_game_rows()
+
+    typed = collect.convert_to_matchup_format(rows.copy())
+    collect.apply_schema = lambda df: df
+    untyped = collect.convert_to_matchup_format(rows.copy())
+
+    assert typed['HOME_TEAM_NAME'].dtype == 'category' and typed['AWAY_WL'].dtype == 'category'
+    assert typed['HOME_PTS'].dtype == 'int16' and typed['HOME_TEAM_ID'].dtype == 'int32'
+    assert typed['HOME_FG_PCT'].dtype == 'float32' and typed['HOME_WIN'].dtype == 'int8'
+    assert typed.memory_usage(deep=True).sum() < 0.4 * untyped.memory_usage(deep=True).sum()
+
+    # Same values, only narrower types
+    pd.testing.assert_frame_equal(typed, untyped[typed.columns], check_dtype=False,
+                                  check_categorical=False, atol=1e-6)
+
+
+def test_schema_never_truncates_or_fails_on_missing_values():
+    df = pd.DataFrame({
+        'MIN': [48.5, 47.0],                  # per-game average: stays float
+        'HOME_PTS': [101.0, np.nan],          # count with a gap: float32
+        'AWAY_PTS': [99.0, 120.0],            # integral floats: int16
+        'GP_RANK': [1, 30],
+        'W': [70000, 1],                      # out of int16 range
+        'GAME_DATE': ['2024-11-01', '2024-11-02'],
+        'SEASON': ['2024-25', '2024-25'],
+    })
+    typed = apply_schema(df)
+    assert typed['MIN'].dtype == 'float32' and typed['MIN'].iloc[0] == 48.5
+    assert typed['HOME_PTS'].dtype == 'float32' and typed['HOME_PTS'].isna().iloc[1]
+    assert typed['AWAY_PTS'].dtype == 'int16' and typed['GP_RANK'].dtype == 'int16'
+    assert typed['W'].dtype == 'int32'
+    assert typed['GAME_DATE'].dtype == 'datetime64[ns]' and typed['SEASON'].dtype == object
+    assert apply_schema(typed) is typed
+
+
+def test_typed_datasets_round_trip_and_feed_downstream(tmp_path):
+    collect = load_collect_games()
+    rows = team_game_rows(n_seasons=3, games_per_season=200)
+    games = collect.convert_to_matchup_format(rows)
+    path = str(tmp_path / 'games.csv')
+
+    # Seasons hold different category sets; appended parts add new ones
+    first, last = games[games['SEASON'] != '2002-03'], games[games['SEASON'] == '2002-03']
+    save_dataset(first, path, export_csv=True, verbose=False)
+    append_dataset(last.assign(HOME_TEAM_NAME=last['HOME_TEAM_NAME'].astype(str) + ' (new)'),
+                   path, export_csv=True, verbose=False)
+    loaded = load_dataset(path)
+    assert loaded['HOME_TEAM_NAME'].dtype == 'category'
+    assert loaded['HOME_PTS'].dtype == 'int16'
+    assert loaded['HOME_TEAM_NAME'].str.endswith('(new)').sum() == len(last)
+
+    # CSV-only datasets get the same dtypes through load_typed
+    csv_path = str(tmp_path / 'csv_only.csv')
+    first.to_csv(csv_path, index=False)
+    from_csv = load_typed(csv_path).drop(columns='GAME_ID')   # CSV stores ids as numbers
+    assert (from_csv.dtypes.astype(str) == first.dtypes.astype(str)[from_csv.columns]).all()
+
+    # Downstream stats are unchanged within float32 precision
+    typed_stats = build_asof_team_stats(games, verbose=False)
+    wide = games.astype({c: 'float64' for c in games.columns if games[c].dtype.kind in 'if'})
+    wide_stats = build_asof_team_stats(wide, verbose=False)
+    assert typed_stats['OFF_RATING'].dtype == 'float32'
+    pd.testing.assert_frame_equal(typed_stats, wide_stats, check_dtype=False,
+                                  check_categorical=False, rtol=1e-5)
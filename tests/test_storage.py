@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.data_collection import storage
+from scripts.benchmarks.synthetic import make_synthetic_games
+
+
+@pytest.mark.skipif(not storage.HAS_PYARROW, reason="pyarrow not installed")
+def test_parquet_round_trip_keeps_dtypes(tmp_path):
+    games = make_synthetic_games(n_seasons=3)
+    path = str(tmp_path / 'games.csv')
+    storage.save_dataset(games, path, verbose=False)
+
+    assert os.path.isdir(tmp_path / 'games.parquet')
+    assert not os.path.exists(path)
+
+    loaded = storage.load_dataset(path)
+    expected = games.sort_values(['SEASON', 'GAME_DATE'], kind='stable').reset_index(drop=True)
+    pd.testing.assert_frame_equal(loaded, expected)
+
+
+@pytest.mark.parametrize('use_parquet', [True, False])
+def test_projection_and_filters_match_between_formats(tmp_path, monkeypatch, use_parquet):
+    if use_parquet and not storage.HAS_PYARROW:
+        pytest.skip("pyarrow not installed")
+    if not use_parquet:
+        monkeypatch.setattr(storage, 'HAS_PYARROW', False)
+
+    games = make_synthetic_games(n_seasons=4)
+    path = str(tmp_path / 'games.csv')
+    storage.save_dataset(games, path, verbose=False)
+
+    seasons = sorted(games['SEASON'].unique())[1:3]
+    start, end = pd.Timestamp(f'{seasons[0][:4]}-12-01'), pd.Timestamp(f'{seasons[1][:4]}-01-31')
+    loaded = storage.load_dataset(path, columns=['game_date', 'HOME_PTS'],
+                                  seasons=seasons, date_range=(start, end))
+
+    mask = games['SEASON'].isin(seasons) & games['GAME_DATE'].between(start, end)
+    expected = games.loc[mask, ['GAME_DATE', 'HOME_PTS']]
+
+    assert list(loaded.columns) == ['GAME_DATE', 'HOME_PTS']
+    assert pd.api.types.is_datetime64_any_dtype(loaded['GAME_DATE'])
+    assert sorted(loaded['HOME_PTS']) == sorted(expected['HOME_PTS'])
+    assert storage.load_dataset(path, seasons=['1900-01']).empty
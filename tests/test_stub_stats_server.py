@@ -0,0 +1,79 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+import requests
+from nba_api.stats.endpoints import leaguegamefinder
+from nba_api.stats.library.http import NBAStatsHTTP
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.benchmarks.bench_collection import run_benchmark
+from scripts.benchmarks.stub_stats_server import StubStatsServer
+from scripts.data_collection.http_cache import ResponseCache
+
+
+@pytest.fixture
+def stats_base_url():
+    original = NBAStatsHTTP.base_url
+    yield lambda url: setattr(NBAStatsHTTP, 'base_url', url)
+    NBAStatsHTTP.base_url = original
+
+
+def find_games(**kwargs):
+    return leaguegamefinder.LeagueGameFinder(league_id_nullable='00', season_type_nullable='Regular Season',
+                                             **kwargs).get_data_frames()[0]
+
+
+def test_game_finder_filters_synthetic_season(stats_base_url):
+    with StubStatsServer(latency=0.0, games_per_season=200) as server:
+        stats_base_url(server.base_url)
+        season = find_games(season_nullable='2023-24')
+        window = find_games(season_nullable='2023-24', date_from_nullable='11/01/2023',
+                            date_to_nullable='11/30/2023')
+
+    assert len(season) == 400
+    assert (season['SEASON_ID'] == '22023').all()
+    assert season.groupby('GAME_ID').size().eq(2).all()
+    dates = pd.to_datetime(window['GAME_DATE'])
+    assert dates.between('2023-11-01', '2023-11-30').all()
+    assert 0 < len(window) < len(season)
+    assert server.endpoints == ['leaguegamefinder', 'leaguegamefinder']
+
+
+def test_replay_serves_recorded_responses(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    params = {'Season': '2023-24', 'MeasureType': 'Advanced', 'DateTo': '11/01/2023'}
+    cache.put('leaguedashteamstats', params, '{"recorded": true}')
+
+    with StubStatsServer(latency=0.0, replay_dir=str(tmp_path), fallback=False) as server:
+        url = server.base_url.format(endpoint='leaguedashteamstats')
+        hit = requests.get(url, params={**params, 'TeamID': ''})
+        miss = requests.get(url, params={**params, 'DateTo': '11/02/2023'})
+
+    assert hit.status_code == 200 and hit.json() == {'recorded': True}
+    assert miss.status_code == 404
+    assert server.replayed == 1
+
+
+def test_injected_errors_and_latency():
+    with StubStatsServer(latency=0.01, jitter=0.005, error_rate=0.2, server_error_rate=0.2, seed=1) as server:
+        url = server.base_url.format(endpoint='leaguedashteamstats')
+        codes = [requests.get(url, params={'Season': '2023-24'}).status_code for _ in range(40)]
+
+    assert codes == server.status_codes
+    assert {200, 429, 500} == set(codes)
+
+
+def test_benchmark_harness_reports_each_strategy(stats_base_url):
+    with StubStatsServer(latency=0.01, games_per_season=120) as server:
+        results = run_benchmark(server, n_dates=3, n_seasons=2, rate=200.0, verbose=False)
+
+    for workload, n_tasks in [('team_stats', 6), ('games', 2)]:
+        rows = {r['strategy']: r for r in results[workload]}
+        assert list(rows) == ['sequential', 'concurrent', 'cache (cold)', 'cache (warm)']
+        assert all(r['tasks'] == n_tasks and r['failed'] == 0 for r in rows.values())
+        assert rows['sequential']['requests'] == n_tasks
+        assert rows['cache (warm)']['requests'] == 0
+        assert rows['sequential']['p50'] >= 0.01
@@ -0,0 +1,115 @@
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.data_collection.local_team_stats import build_asof_team_stats
+from scripts.benchmarks.synthetic import add_synthetic_box_scores, make_synthetic_games
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+TARGETS = ['home_win', 'home_pts', 'away_pts', 'spread', 'total']
+SLATE_COLS = ['GAME_ID', 'GAME_DATE', 'SEASON', 'HOME_TEAM_ID', 'HOME_TEAM_ABBREVIATION', 'HOME_TEAM_NAME',
+              'AWAY_TEAM_ID', 'AWAY_TEAM_ABBREVIATION', 'AWAY_TEAM_NAME']
+
+
+def load_script(name, filename):
+    path = os.path.join(REPO_ROOT, 'scripts', 'feature_engineering', filename)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+@pytest.fixture(scope='module')
+def league():
+    merge_stats = load_script('merge_stats', '01_merge_stats.py')
+    games = add_synthetic_box_scores(make_synthetic_games(n_seasons=2, games_per_season=240, n_teams=10))
+    for side in ['HOME', 'AWAY']:
+        games[f'{side}_TEAM_ABBREVIATION'] = 'T' + (games[f'{side}_TEAM_ID'] % 100).astype(str)
+        games[f'{side}_TEAM_NAME'] = 'Team ' + (games[f'{side}_TEAM_ID'] % 100).astype(str)
+    stats = quiet(merge_stats.clean_stats_dataframe, build_asof_team_stats(games, verbose=False))
+    merged = quiet(merge_stats.organize_columns, merge_stats.merge_team_stats(games, stats))
+    return merge_stats, games, stats, merged.sort_values('GAME_DATE').reset_index(drop=True)
+
+
+def replay(store, merged, start):
+    """Feature rows of every game from `start` on, one slate per day, advancing after each."""
+    rows = []
+    for _, day in merged[merged['GAME_DATE'] >= start].groupby('GAME_DATE'):
+        rows.append(quiet(store.features, day[SLATE_COLS]))
+        store.advance(day)
+    return pd.concat(rows, ignore_index=True)
+
+
+def assert_matches_batch(rows, batch):
+    batch = batch.drop(columns=TARGETS).set_index('game_id')
+    rows = rows.set_index('game_id')
+    assert list(rows.columns) == list(batch.columns)
+    common = batch.index.intersection(rows.index)
+    assert len(common) > 100
+    pd.testing.assert_frame_equal(rows.loc[common], batch.loc[common], check_dtype=False,
+                                  check_categorical=False, rtol=1e-9)
+
+
+def test_daily_advance_matches_batch_rebuild(league):
+    from scripts.feature_engineering.team_state import TeamStateStore, feature_engineering
+    _, _, _, merged = league
+
+    # Half the history in one call, then one game day at a time
+    start = merged['GAME_DATE'].iloc[len(merged) // 2]
+    store = TeamStateStore.from_history(merged[merged['GAME_DATE'] < start])
+    rows = replay(store, merged, start)
+
+    assert len(rows) == (merged['GAME_DATE'] >= start).sum()
+    assert store.n_games == len(merged) and store.last_date == merged['GAME_DATE'].max()
+    assert_matches_batch(rows, quiet(feature_engineering.build_feature_frame, merged))
+
+
+def test_store_options_and_asof_merge_match_batch(league, tmp_path):
+    from scripts.feature_engineering.team_state import TeamStateStore, feature_engineering
+    merge_stats, games, stats, _ = league
+    asof = quiet(merge_stats.organize_columns, merge_stats.merge_team_stats(games, stats, mode='asof'))
+    asof = asof.sort_values('GAME_DATE').reset_index(drop=True)
+
+    options = {'windows': [3, 5, 10], 'h2h_last_n': 3, 'h2h_last_seasons': 1, 'variants': ['DIFF', 'SUM']}
+    start = asof['GAME_DATE'].iloc[len(asof) // 3]
+    TeamStateStore.from_history(asof[asof['GAME_DATE'] < start], **options).save(str(tmp_path / 'state.pkl'))
+    store = TeamStateStore.load(str(tmp_path / 'state.pkl'))
+
+    # As-of stats of the slate are known before tip-off, so they travel with it
+    prior_cols = [c for c in asof.columns if c.startswith(('HOME_', 'AWAY_'))
+                  and c[5:] in merge_stats.ALL_STAT_COLS]
+    rows = []
+    for _, day in asof[asof['GAME_DATE'] >= start].groupby('GAME_DATE'):
+        rows.append(quiet(store.features, day[SLATE_COLS + prior_cols]))
+        store.advance(day)
+    rows = pd.concat(rows, ignore_index=True)
+
+    params = {'rolling': {'windows': options['windows']},
+              'h2h': {'last_n': 3, 'last_seasons': 1},
+              'differentials': {'variants': options['variants']}}
+    assert_matches_batch(rows, quiet(feature_engineering.build_feature_frame, asof, params=params))
+
+
+def test_advance_rejects_days_already_folded_in(league):
+    from scripts.feature_engineering.team_state import TeamStateStore
+    _, _, _, merged = league
+    store = TeamStateStore.from_history(merged.iloc[:100])
+
+    with pytest.raises(ValueError):
+        store.advance(merged.iloc[90:110])
+    with pytest.raises(ValueError):
+        TeamStateStore().features(merged[SLATE_COLS].iloc[:5])
+    assert store.n_games == 100 and 'team state: ' in store.summary()
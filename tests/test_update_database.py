@@ -0,0 +1,123 @@
+import importlib.util
+import os
+import sys
+
+import pandas as pd
+from nba_api.stats.library.http import NBAStatsHTTP
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.benchmarks.stub_stats_server import StubStatsServer
+from scripts.data_collection.storage import append_dataset, load_dataset, save_dataset
+from scripts.benchmarks.synthetic import add_synthetic_box_scores, make_synthetic_games
+from scripts.feature_engineering.team_state import TeamStateStore
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def load_update_database(data_dir):
+    path = os.path.join(REPO_ROOT, 'scripts', 'data_collection', 'update_database.py')
+    spec = importlib.util.spec_from_file_location('update_database', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    for name in ['GAMES_FILE', 'STATS_FILE', 'MERGED_FILE', 'FEATURES_FILE', 'TEAM_STATE_FILE']:
+        setattr(module, name, os.path.join(data_dir, os.path.basename(getattr(module, name))))
+    module.WATERMARK_FILE = os.path.join(data_dir, 'watermarks.json')
+    module.EXPORT_CSV = False
+    return module
+
+
+def synthetic_league():
+    games = add_synthetic_box_scores(make_synthetic_games(n_seasons=2, games_per_season=240, n_teams=10))
+    for side in ['HOME', 'AWAY']:
+        games[f'{side}_TEAM_ABBREVIATION'] = 'T' + (games[f'{side}_TEAM_ID'] % 100).astype(str)
+        games[f'{side}_TEAM_NAME'] = 'Team ' + (games[f'{side}_TEAM_ID'] % 100).astype(str)
+    return games
+
+
+def make_fetcher(games, calls):
+    def fetch(season, after, until):
+        calls.append((season, after))
+        rows = games[(games['SEASON'] == season) & (games['GAME_DATE'] < until)]
+        if after is not None:
+            rows = rows[rows['GAME_DATE'] > pd.Timestamp(after)]
+        return rows.copy()
+    return fetch
+
+
+def test_append_dataset_adds_part_files_and_compacts(tmp_path):
+    games = make_synthetic_games(n_seasons=2, games_per_season=100)
+    path = str(tmp_path / 'games.csv')
+    first, rest = games.iloc[:120], games.iloc[120:]
+    save_dataset(first, path, verbose=False)
+
+    for chunk in [rest.iloc[:30], rest.iloc[30:50], rest.iloc[50:]]:
+        append_dataset(chunk, path, max_parts=2, verbose=False)
+
+    loaded = load_dataset(path).sort_values('GAME_ID').reset_index(drop=True)
+    expected = games.sort_values('GAME_ID').reset_index(drop=True)
+    pd.testing.assert_frame_equal(loaded, expected[loaded.columns], check_dtype=False)
+    parts = os.listdir(tmp_path / 'games.parquet' / 'SEASON=2001-02')
+    assert len(parts) <= 3
+
+
+def test_nightly_updates_match_full_rebuild(tmp_path):
+    games = synthetic_league()
+    season = '2001-02'
+    dates = sorted(games.loc[games['SEASON'] == season, 'GAME_DATE'].unique())
+    seasons = ['2000-01', season]
+
+    # Batch: everything in one run from empty storage
+    batch = load_update_database(str(tmp_path / 'batch'))
+    batch.run_update(seasons, fetch_fn=make_fetcher(games, []), until=dates[-1] + pd.Timedelta(days=1))
+    expected = load_dataset(batch.FEATURES_FILE)
+
+    # Incremental: initial load up to mid-season, then one run per game day
+    incremental = load_update_database(str(tmp_path / 'incremental'))
+    calls = []
+    fetch = make_fetcher(games, calls)
+    incremental.run_update(seasons, fetch_fn=fetch, until=dates[-5])
+    for day in dates[-5:]:
+        added = incremental.run_update([season], fetch_fn=fetch, until=day + pd.Timedelta(days=1))
+        n_games = (games['GAME_DATE'] == day).sum()
+        assert added['games'] == n_games
+        assert added['team_stats'] == 2 * n_games
+        assert added['features'] == n_games
+
+    assert calls[-1] == (season, str(dates[-2].date()))
+    assert TeamStateStore.load(incremental.TEAM_STATE_FILE).last_date == dates[-1]
+    result = load_dataset(incremental.FEATURES_FILE)
+    key = ['game_date', 'game_id']
+    result = result.sort_values(key).reset_index(drop=True)
+    expected = expected.sort_values(key).reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, expected[result.columns])
+
+    # Nothing new: every stage is a no-op
+    added = incremental.run_update([season], fetch_fn=fetch, until=dates[-1] + pd.Timedelta(days=1))
+    assert set(added.values()) == {0}
+
+
+def test_api_nightly_updates_append_each_date_once(tmp_path):
+    games = synthetic_league()
+    season = '2001-02'
+    dates = sorted(games.loc[games['SEASON'] == season, 'GAME_DATE'].unique())
+    update = load_update_database(str(tmp_path))
+    fetch = make_fetcher(games, [])
+
+    original = NBAStatsHTTP.base_url
+    try:
+        with StubStatsServer(latency=0.0) as server:
+            NBAStatsHTTP.base_url = server.base_url
+            update.run_update([season], fetch_fn=fetch, until=dates[-3], stats_source='api', rate_limited=False)
+            for day in dates[-3:-1]:
+                added = update.run_update([season], fetch_fn=fetch, until=day + pd.Timedelta(days=1),
+                                          stats_source='api', rate_limited=False)
+                assert added['team_stats'] == 2 * (games['GAME_DATE'] == day).sum()
+    finally:
+        NBAStatsHTTP.base_url = original
+
+    stats = load_dataset(update.STATS_FILE)
+    played = games[(games['SEASON'] == season) & (games['GAME_DATE'] <= dates[-2])]
+    assert not stats.duplicated(['SEASON', 'GAME_DATE', 'TEAM_ID']).any()
+    assert len(stats) == 2 * len(played)
+    assert not os.path.exists(tmp_path / 'nba_team_stats_journal')